@@ -0,0 +1,102 @@
+"""
+Benchmark run_session event capture levels.
+
+Replays synthetic ADK events (text, tool call and tool response parts, like a
+triage turn) through EventCapture at each level and reports per-event record
+cost, export cost and retained memory.
+
+Usage:
+    python -m benchmarks.bench_event_capture --events 20000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from google.adk.events import Event
+from google.genai import types
+from src.utils.event_capture import CAPTURE_LEVELS, EventCapture
+
+
+def make_events(count: int):
+    events = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            part = types.Part(text="Triage JSON " + "x" * 400)
+        elif kind == 1:
+            part = types.Part(function_call=types.FunctionCall(
+                name="select_best_vendor", args={"issue_type": "PLUMBING", "property_zip": "95054"}
+            ))
+        else:
+            part = types.Part(function_response=types.FunctionResponse(
+                name="select_best_vendor", response={"vendor_id": "V_PLUMB_FAST", "score": 0.91}
+            ))
+        events.append(Event(
+            author="maintenance_triage_agent",
+            invocation_id=f"inv-{i // 6}",
+            content=types.Content(role="model", parts=[part]),
+        ))
+    return events
+
+
+def bench_legacy(events):
+    """Previous behaviour: an eagerly built dict per event in an unbounded list."""
+    captured = []
+    tracemalloc.start()
+    started = time.perf_counter()
+    for event in events:
+        captured.append({
+            "type": event.__class__.__name__,
+            "content": str(event.content),
+            "metadata": getattr(event, "metadata", {}),
+            "timestamp": event.timestamp,
+            "role": event.content.role,
+        })
+    record_s = time.perf_counter() - started
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return record_s, 0.0, retained, len(captured)
+
+
+def bench(level: str, events, max_events: int, spill_path: str = ""):
+    capture = EventCapture(level=level, max_events=max_events, spill_path=spill_path)
+    tracemalloc.start()
+    started = time.perf_counter()
+    for event in events:
+        capture.record(event)
+    record_s = time.perf_counter() - started
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    started = time.perf_counter()
+    exported = capture.export()
+    export_s = time.perf_counter() - started
+    return record_s, export_s, retained, len(exported)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--max-events", type=int, default=256)
+    args = parser.parse_args()
+    events = make_events(args.events)
+
+    print(f"{args.events} events, ring buffer {args.max_events}")
+    print(f"{'level':<12}{'record us/event':>18}{'export ms':>12}{'retained KiB':>14}{'exported':>10}")
+    record_s, export_s, retained, exported = bench_legacy(events)
+    print(f"{'legacy':<12}{1e6 * record_s / len(events):>18.2f}{'-':>12}{retained / 1024:>14.1f}{exported:>10}")
+    runs = [(level, "") for level in CAPTURE_LEVELS]
+    with tempfile.TemporaryDirectory() as tmp:
+        runs.append(("full+spill", os.path.join(tmp, "events.jsonl")))
+        for label, spill_path in runs:
+            level = label.split("+")[0]
+            record_s, export_s, retained, exported = bench(level, events, args.max_events, spill_path)
+            print(
+                f"{label:<12}{1e6 * record_s / len(events):>18.2f}{1000 * export_s:>12.2f}"
+                f"{retained / 1024:>14.1f}{exported:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark bulk KB lookup: one search per ticket vs the batched TF-IDF matrix product.
+
+Scores synthetic historical tickets against a synthetic KB (same generator
+as bench_kb_index), first with a Python loop of BM25 index searches, the
+way a backfill calls the lookup tool today, then with
+lookup_troubleshooting_articles_batch-style scoring through KbTfidfMatrix.
+Reports whether SciPy or the NumPy fallback did the product.
+
+Usage:
+    python -m benchmarks.bench_kb_batch --articles 2000 --tickets 100000 --k 3
+"""
+
+import argparse
+import random
+import time
+from benchmarks.bench_kb_index import make_corpus, make_queries
+from src.tools import kb_tools
+from src.tools.kb_tools import KbIndex, KbTfidfMatrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--tickets", type=int, default=100000)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+    rng = random.Random(11)
+    corpus = make_corpus(args.articles, rng)
+    texts = [f"{title}\n{description}" for title, description in make_queries(args.tickets, args.articles, rng)]
+    print(f"{args.tickets} tickets x {args.articles} articles, k={args.k}, "
+          f"product via {'scipy.sparse' if kb_tools.sparse is not None else 'numpy postings'}")
+
+    index = KbIndex(corpus)
+    started = time.perf_counter()
+    for text in texts:
+        index.search(text, top_k=args.k)
+    loop_s = time.perf_counter() - started
+    print(f"{'per-ticket loop':<18}{loop_s:>8.2f}s{args.tickets / loop_s:>12.0f} tickets/s")
+
+    started = time.perf_counter()
+    matrix = KbTfidfMatrix(corpus)
+    build_s = time.perf_counter() - started
+    started = time.perf_counter()
+    matrix.top_k(texts, args.k)
+    batch_s = time.perf_counter() - started
+    print(f"{'batched tf-idf':<18}{batch_s:>8.2f}s{args.tickets / batch_s:>12.0f} tickets/s"
+          f"  (build {1000 * build_s:.0f} ms, {loop_s / batch_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark KB lookup: previous linear keyword scan vs the BM25 inverted index vs the FTS5 store.
+
+Builds synthetic corpora (the real articles plus generated ones with a
+maintenance-flavoured vocabulary) and times index build and per-query
+lookup for tenant-style queries. The FTS5 columns index the same corpus
+written as a KB_CORPUS_PATH JSONL file.
+
+Usage:
+    python -m benchmarks.bench_kb_index --sizes 10000 100000 --queries 200
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from src.tools.kb_store import FtsKbStore, write_kb_jsonl
+from src.tools.kb_tools import KbIndex, kb_articles
+
+WORDS = (
+    "leak drip pipe sink faucet toilet clog drain shower tub heater boiler furnace thermostat filter vent duct "
+    "fan ac cooling heating breaker outlet switch light bulb wire spark smoke detector alarm battery door lock "
+    "window screen blind garage opener fridge freezer oven stove dishwasher washer dryer lint hose valve pump "
+    "mold ceiling wall floor tile grout roof gutter pest ant mouse noise rattle smell odor water pressure"
+).split()
+
+
+def legacy_lookup(articles, text):
+    """The previous implementation: substring test of every keyword of every article."""
+    text_l = text.lower()
+    best, best_score = None, 0
+    for art in articles:
+        score = sum(1 for kw in art["keywords"] if kw in text_l)
+        if score > best_score:
+            best, best_score = art, score
+    return best
+
+
+def long_tail(rng: random.Random, size: int) -> str:
+    """Rare terms (brands, models, parts): most of a real KB's vocabulary."""
+    return f"{rng.choice(('acme', 'zeno', 'kelvo', 'rheem', 'delta', 'moen'))}{rng.randrange(size // 4)}"
+
+
+def make_corpus(size: int, rng: random.Random):
+    articles = list(kb_articles)
+    for i in range(size - len(articles)):
+        words = rng.sample(WORDS, 2) + [long_tail(rng, size) for _ in range(4)]
+        articles.append({
+            "id": f"kb_gen_{i}",
+            "title": " ".join(words[:3]),
+            "keywords": words[2:],
+            "steps": ["Step one.", "Step two."],
+        })
+    return articles
+
+
+def make_queries(count: int, size: int, rng: random.Random):
+    return [
+        (
+            " ".join(rng.sample(WORDS, 2)),
+            f"Tenant says the {long_tail(rng, size)} " + " ".join(rng.sample(WORDS, 3)) + " since yesterday.",
+        )
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    print(
+        f"{'articles':>10}{'build ms':>11}{'legacy us/query':>17}{'bm25 us/query':>15}{'speedup':>9}"
+        f"{'fts build ms':>14}{'fts us/query':>14}"
+    )
+    tmp = tempfile.TemporaryDirectory()
+    for size in args.sizes:
+        corpus = make_corpus(size, rng)
+        queries = make_queries(args.queries, size, rng)
+        started = time.perf_counter()
+        index = KbIndex(corpus)
+        build_ms = 1000 * (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for title, description in queries:
+            legacy_lookup(corpus, f"{title}\n{description}")
+        legacy_us = 1e6 * (time.perf_counter() - started) / len(queries)
+
+        started = time.perf_counter()
+        for title, description in queries:
+            index.search(f"{title}\n{description}", top_k=3)
+        bm25_us = 1e6 * (time.perf_counter() - started) / len(queries)
+
+        corpus_path = os.path.join(tmp.name, f"kb-{size}.jsonl")
+        write_kb_jsonl(corpus, corpus_path)
+        store = FtsKbStore(corpus_path, db_path=os.path.join(tmp.name, f"kb-{size}.db"), reload_check_seconds=60)
+        started = time.perf_counter()
+        store.refresh()
+        fts_build_ms = 1000 * (time.perf_counter() - started)
+        started = time.perf_counter()
+        for title, description in queries:
+            store.search(f"{title}\n{description}", top_k=3)
+        fts_us = 1e6 * (time.perf_counter() - started) / len(queries)
+        store.close()
+        print(
+            f"{size:>10}{build_ms:>11.0f}{legacy_us:>17.0f}{bm25_us:>15.0f}{legacy_us / bm25_us:>8.1f}x"
+            f"{fts_build_ms:>14.0f}{fts_us:>14.0f}"
+        )
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
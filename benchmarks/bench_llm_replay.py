@@ -0,0 +1,90 @@
+"""
+Benchmark ADK orchestration overhead with the replay LLM backend.
+
+Records one tool-calling triage turn per synthetic ticket (a scripted
+stand-in plays the model), then replays every ticket through a Runner with
+in-memory sessions, first with zero model latency (pure orchestration cost)
+and then with --latency-ms per model call. Set ADK_VERBOSE=false to keep
+event printing out of the numbers.
+
+Usage:
+    ADK_VERBOSE=false python -m benchmarks.bench_llm_replay --tickets 2000 --concurrency 64 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from google.adk.agents.llm_agent import Agent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from src.utils.adk_backend import RecordingLlm, ReplayLlm
+from src.utils.session_manager import run_session
+
+
+def select_best_vendor(issue_type: str, property_zip: str) -> dict:
+    """Pick the best vendor for an issue type in a ZIP."""
+    return {"vendor_id": f"V_{issue_type}", "property_zip": property_zip}
+
+
+class ScriptedTriageLlm(BaseLlm):
+    """Calls select_best_vendor, then answers with triage JSON."""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        last = llm_request.contents[-1].parts[0]
+        if last.function_response is None:
+            call = types.FunctionCall(name="select_best_vendor", args={"issue_type": "PLUMBING", "property_zip": "95054"})
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(function_call=call)]))
+        else:
+            answer = {"triage_label": "VENDOR_REQUIRED", "vendor_selection": last.function_response.response}
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=json.dumps(answer))]))
+
+
+def build_runner(model: BaseLlm) -> Runner:
+    agent = Agent(name="bench_triage", model=model, instruction="Triage the ticket.", tools=[select_best_vendor])
+    return Runner(agent=agent, app_name="bench_replay", session_service=InMemorySessionService())
+
+
+async def run_tickets(runner: Runner, tickets: int, concurrency: int) -> float:
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with gate:
+            await run_session(runner, runner.session_service, f"Ticket {i}: sink leaking",
+                              session_name=f"ticket-{i}", logs={})
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(tickets)))
+    return time.perf_counter() - started
+
+
+async def main_async(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "recordings.jsonl")
+        recorder = build_runner(RecordingLlm(model="scripted", inner=ScriptedTriageLlm(model="scripted"), recordings_path=path))
+        elapsed = await run_tickets(recorder, args.tickets, args.concurrency)
+        print(f"recorded {args.tickets} tickets (2 model calls each) in {elapsed:.2f}s")
+
+        print(f"{'latency ms':>12}{'concurrency':>13}{'tickets/s':>12}{'ms/ticket':>12}")
+        # Serial zero-latency run = orchestration cost per ticket (runner, sessions, tools, callbacks)
+        for latency_ms, concurrency in ((0.0, 1), (0.0, args.concurrency), (args.latency_ms, args.concurrency)):
+            runner = build_runner(ReplayLlm(model="scripted", recordings_path=path, latency_ms=latency_ms))
+            elapsed = await run_tickets(runner, args.tickets, concurrency)
+            print(f"{latency_ms:>12.0f}{concurrency:>13}{args.tickets / elapsed:>12.1f}{1000 * elapsed / args.tickets:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
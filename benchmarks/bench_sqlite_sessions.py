@@ -0,0 +1,103 @@
+"""
+Benchmark SQLite session backends under concurrent flows.
+
+Each simulated flow creates a session, appends a triage-sized turn of
+events (user message, tool call, tool response, model answer) and reads the
+session back, the way run_session drives the runner. Reports sessions/sec
+for ADK's default DatabaseSessionService and TunedSqliteSessionService.
+
+Usage:
+    python -m benchmarks.bench_sqlite_sessions --flows 256 --concurrency 1 8 64
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from google.adk.events import Event, EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.genai import types
+from src.utils.sqlite_sessions import TunedSqliteSessionService
+
+APP = "bench_app"
+USER = "bench_user"
+
+
+def turn_events(session_id: str):
+    invocation_id = f"inv-{session_id}"
+    parts = [
+        ("user", types.Part(text="Kitchen sink leaking under the cabinet " + "x" * 200)),
+        ("model", types.Part(function_call=types.FunctionCall(
+            name="select_best_vendor", args={"issue_type": "PLUMBING", "property_zip": "95054"}
+        ))),
+        ("user", types.Part(function_response=types.FunctionResponse(
+            name="select_best_vendor", response={"vendor_id": "V_PLUMB_FAST", "score": 0.91}
+        ))),
+        ("model", types.Part(text='{"triage_label": "VENDOR_REQUIRED"} ' + "y" * 300)),
+    ]
+    return [
+        Event(
+            author="user" if role == "user" else "maintenance_triage_agent",
+            invocation_id=invocation_id,
+            content=types.Content(role=role, parts=[part]),
+            actions=EventActions(state_delta={"last_step": i}),
+        )
+        for i, (role, part) in enumerate(parts)
+    ]
+
+
+async def one_flow(service) -> None:
+    session_id = f"triage-{uuid.uuid4().hex[:12]}"
+    session = await service.create_session(app_name=APP, user_id=USER, session_id=session_id)
+    for event in turn_events(session_id):
+        await service.append_event(session, event)
+    await service.get_session(app_name=APP, user_id=USER, session_id=session_id)
+
+
+async def bench(service, flows: int, concurrency: int):
+    gate = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def guarded():
+        nonlocal errors
+        async with gate:
+            try:
+                await one_flow(service)
+            except Exception:
+                errors += 1
+
+    await one_flow(service)  # create tables / warm the pool
+    started = time.perf_counter()
+    await asyncio.gather(*(guarded() for _ in range(flows)))
+    return flows / (time.perf_counter() - started), errors
+
+
+async def main_async(args):
+    print(f"{args.flows} flows per run, 4 events per flow")
+    print(f"{'backend':<10}{'concurrency':>12}{'sessions/s':>12}{'errors':>8}{'events/batch':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for concurrency in args.concurrency:
+            default_path = os.path.join(tmp, f"default-{concurrency}.db")
+            default = DatabaseSessionService(db_url=f"sqlite+aiosqlite:///{default_path}")
+            rate, errors = await bench(default, args.flows, concurrency)
+            await default.db_engine.dispose()
+            print(f"{'default':<10}{concurrency:>12}{rate:>12.1f}{errors:>8}{'1.00':>14}")
+
+            tuned = TunedSqliteSessionService(db_path=os.path.join(tmp, f"tuned-{concurrency}.db"))
+            rate, errors = await bench(tuned, args.flows, concurrency)
+            per_batch = tuned.stats()["events_per_batch"]
+            await tuned.close()
+            print(f"{'tuned':<10}{concurrency:>12}{rate:>12.1f}{errors:>8}{per_batch:>14.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--flows", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64])
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
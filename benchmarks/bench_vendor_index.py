@@ -0,0 +1,95 @@
+"""
+Benchmark vendor selection: per-call pandas filter/score/sort vs the precomputed VendorRankingIndex.
+
+Generates a synthetic vendor table (make_vendors: same columns as
+src/data/vendors.py, coarse score grids so ties are common) and runs the
+same random (issue_type, zip, severity) requests through the pandas path
+select_best_vendor used to take (pandas_best_vendor) and through
+VendorRankingIndex.best, checking that both pick the same vendor.
+Reports index build time and per-call latency for each table size.
+
+Usage:
+    python -m benchmarks.bench_vendor_index --vendors 10000 100000 --calls 2000
+"""
+
+import argparse
+import random
+import time
+from typing import Optional
+import pandas as pd
+from src.tools.vendor_tools import ISSUE_TO_SERVICE_TYPE, VendorRankingIndex
+
+VENDOR_ISSUE_TYPES = [issue for issue, service in ISSUE_TO_SERVICE_TYPE.items() if service]
+VENDOR_SEVERITIES = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+VENDOR_ZIPS = list(range(94100, 94200))
+
+
+def make_vendors(n: int, rng: random.Random) -> pd.DataFrame:
+    """Synthetic vendor table with src/data/vendors.py's columns; coarse score grids make ties common."""
+    services = [ISSUE_TO_SERVICE_TYPE[issue] for issue in VENDOR_ISSUE_TYPES]
+    return pd.DataFrame({
+        "vendor_id": [f"V_{i}" for i in range(n)],
+        "name": [f"Vendor {i}" for i in range(n)],
+        "service_type": [rng.choice(services) for _ in range(n)],
+        "zip": [rng.choice(VENDOR_ZIPS) for _ in range(n)],
+        "radius_km": [rng.choice([10, 15, 20, 25]) for _ in range(n)],
+        "rating": [rng.choice([3.5, 4.0, 4.2, 4.5, 4.8, 5.0]) for _ in range(n)],
+        "price_band": [rng.randint(1, 3) for _ in range(n)],
+        "speed_score": [rng.randint(1, 5) for _ in range(n)],
+        "base_fee": [rng.choice([60, 80, 100]) for _ in range(n)],
+        "hourly_rate": [rng.choice([70, 90, 110]) for _ in range(n)],
+    })
+
+
+def pandas_best_vendor(vendors_df: pd.DataFrame, issue_type: str, property_zip: str, severity: str) -> Optional[str]:
+    """Reference for VendorRankingIndex: the per-call filter/copy/score/sort select_best_vendor used to do."""
+    service_type = ISSUE_TO_SERVICE_TYPE.get(issue_type.upper())
+    candidates = vendors_df[vendors_df["service_type"] == service_type].copy()
+    if candidates.empty:
+        return None
+    candidates["zip_match"] = (candidates["zip"].astype(int) == int(property_zip)).astype(int)
+    if severity.upper() == "CRITICAL":
+        candidates["utility_score"] = (
+            2.5 * candidates["rating"] + 2.0 * candidates["speed_score"] - 0.5 * candidates["price_band"]
+        )
+    else:
+        candidates["utility_score"] = (
+            2.0 * candidates["rating"] + 1.5 * candidates["speed_score"] - 1.0 * candidates["price_band"]
+        )
+    candidates = candidates.sort_values(by=["zip_match", "utility_score"], ascending=[False, False])
+    return candidates.iloc[0]["vendor_id"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--vendors", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(25)
+    requests = [
+        (rng.choice(VENDOR_ISSUE_TYPES), str(rng.choice(VENDOR_ZIPS + [10001])), rng.choice(VENDOR_SEVERITIES))
+        for _ in range(args.calls)
+    ]
+
+    print(f"{'vendors':>8}{'pandas/call':>14}{'index/call':>14}{'speedup':>10}{'build':>10}")
+    for n in args.vendors:
+        vendors_df = make_vendors(n, rng)
+
+        started = time.perf_counter()
+        expected = [pandas_best_vendor(vendors_df, *request) for request in requests]
+        pandas_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = VendorRankingIndex(vendors_df)
+        build_s = time.perf_counter() - started
+        started = time.perf_counter()
+        picked = [index.best(ISSUE_TO_SERVICE_TYPE[issue], int(zip_code), severity) for issue, zip_code, severity in requests]
+        index_s = time.perf_counter() - started
+
+        assert [selection[0]["vendor_id"] if selection else None for selection in picked] == expected
+        print(f"{n:>8}{1e3 * pandas_s / args.calls:>12.3f}ms{1e6 * index_s / args.calls:>12.2f}us"
+              f"{pandas_s / index_s:>9.0f}x{1e3 * build_s:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
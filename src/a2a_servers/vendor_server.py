@@ -2,11 +2,23 @@
 
 import os
 from google.adk.a2a.utils.agent_to_a2a import to_a2a
+from starlette.responses import JSONResponse, PlainTextResponse
 from src.adk_agents.vendor.agent import root_agent as vendor_root_agent
+from src.utils.metrics import get_metrics
 
 # Create A2A application
 app = to_a2a(vendor_root_agent, port=8001)
 
+
+async def metrics_endpoint(request):
+    """Vendor tool / model metrics: Prometheus text, or JSON with ?format=json."""
+    if request.query_params.get("format") == "json":
+        return JSONResponse(get_metrics().snapshot())
+    return PlainTextResponse(get_metrics().to_prometheus())
+
+
+app.add_route("/metrics", metrics_endpoint, methods=["GET"])
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="localhost", port=8001)
\ No newline at end of file
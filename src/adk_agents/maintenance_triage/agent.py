@@ -1,21 +1,26 @@
 from google.adk.agents.llm_agent import Agent
 from google.adk.agents.remote_a2a_agent import RemoteA2aAgent, AGENT_CARD_WELL_KNOWN_PATH
-from google.adk.models.google_llm import Gemini
+import httpx
+from src.prompts.response_schemas import TriageResult
 from src.prompts.system_prompts import MAINTENANCE_TRIAGE_PROMPT
 from src.tools.kb_tools import lookup_troubleshooting_article
 from src.tools.vendor_tools import select_best_vendor
-from src.utils.retry_config import retry_config
 from src.utils.constants import MODEL_NAME
+from src.utils.adk_backend import build_llm
+from src.utils.metrics import httpx_event_hooks
+from src.utils.session_history import history_window_callback
 
 # Create remote vendor agent as a sub-agent
 remote_vendor_agent = RemoteA2aAgent(
     name="vendor_service_agent",
     description="Remote vendor agent for maintenance service operations including quotes, availability, and booking",
-    agent_card=f"http://localhost:8001{AGENT_CARD_WELL_KNOWN_PATH}"
+    agent_card=f"http://localhost:8001{AGENT_CARD_WELL_KNOWN_PATH}",
+    # A2A HTTP time per stage (a2a_http_ms)
+    httpx_client=httpx.AsyncClient(timeout=httpx.Timeout(600.0), event_hooks=httpx_event_hooks("a2a")),
 )
 
 root_agent = Agent(
-    model=Gemini(model=MODEL_NAME, retry_options=retry_config),
+    model=build_llm(MODEL_NAME),
     name="maintenance_triage_agent",
     description=(
         "Triage and suggest self-help steps for rental maintenance issues such as leaks, "
@@ -24,4 +29,19 @@ root_agent = Agent(
     instruction=MAINTENANCE_TRIAGE_PROMPT,
     tools=[lookup_troubleshooting_article, select_best_vendor],
     sub_agents=[remote_vendor_agent],  # Add vendor agent as sub-agent
-)
\ No newline at end of file
+    before_model_callback=history_window_callback,  # Cap history sent per model call
+)
+
+# Triage-only twin of root_agent constrained to the TriageResult schema, used by
+# MaintenanceTriageAgent.triage_issue. ADK adds a set_model_response tool when the
+# backend cannot combine a response schema with function calling. No vendor
+# sub-agent: agents with an output_schema cannot transfer.
+structured_triage_agent = Agent(
+    model=build_llm(MODEL_NAME),
+    name="maintenance_triage_structured",
+    description="Triage of rental maintenance issues returning TriageResult JSON.",
+    instruction=MAINTENANCE_TRIAGE_PROMPT,
+    tools=[lookup_troubleshooting_article, select_best_vendor],
+    output_schema=TriageResult,
+    before_model_callback=history_window_callback,
+)
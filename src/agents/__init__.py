@@ -1,4 +1,13 @@
 from .base_agent import BaseAgent
 from .maintenance_triage_agent import MaintenanceTriageAgent
+from .agent_pool import MaintenanceTriageAgentPool, get_agent_pool
+from .vendor_agent import VendorAgent, VendorCallError
 
-__all__ = ["BaseAgent", "MaintenanceTriageAgent"]
\ No newline at end of file
+__all__ = [
+    "BaseAgent",
+    "MaintenanceTriageAgent",
+    "MaintenanceTriageAgentPool",
+    "get_agent_pool",
+    "VendorAgent",
+    "VendorCallError",
+]
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""Process-level pool of warm MaintenanceTriageAgent instances."""
+
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+from google.adk.sessions import BaseSessionService
+from src.agents.maintenance_triage_agent import MaintenanceTriageAgent
+from src.utils.session_manager import build_session_service
+
+# Warm instances kept around between borrows (override via .env)
+AGENT_POOL_MAX_IDLE = int(os.getenv("AGENT_POOL_MAX_IDLE", "8"))
+
+
+@dataclass
+class AgentPoolStats:
+    """Construction cost vs reuse counters for an agent pool."""
+    constructed: int = 0
+    construction_seconds: float = 0.0
+    acquisitions: int = 0
+    reuses: int = 0
+    discarded: int = 0
+
+    @property
+    def avg_construction_ms(self) -> float:
+        if not self.constructed:
+            return 0.0
+        return 1000.0 * self.construction_seconds / self.constructed
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reuses / self.acquisitions if self.acquisitions else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["avg_construction_ms"] = round(self.avg_construction_ms, 3)
+        data["reuse_ratio"] = round(self.reuse_ratio, 3)
+        return data
+
+
+class MaintenanceTriageAgentPool:
+    """
+    Borrow/return pool of MaintenanceTriageAgent instances.
+
+    All pooled agents share a single session service, so the SQLite engine
+    (USE_SHARED_SQLITE) is opened once per process instead of once per ticket.
+    The pool grows on demand to the peak number of concurrent borrowers and
+    keeps at most `max_idle` warm instances between borrows.
+    """
+
+    def __init__(
+        self,
+        max_idle: int = AGENT_POOL_MAX_IDLE,
+        factory: Optional[Callable[[BaseSessionService], Any]] = None,
+        session_service: Optional[BaseSessionService] = None,
+    ):
+        self.max_idle = max_idle
+        self._factory = factory or (lambda service: MaintenanceTriageAgent(session_service=service))
+        self._session_service = session_service
+        self._idle: Deque[Any] = deque()
+        self.stats = AgentPoolStats()
+
+    @property
+    def session_service(self) -> BaseSessionService:
+        if self._session_service is None:
+            self._session_service = build_session_service()
+        return self._session_service
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    def _construct(self) -> Any:
+        started = time.perf_counter()
+        agent = self._factory(self.session_service)
+        elapsed = time.perf_counter() - started
+        self.stats.constructed += 1
+        self.stats.construction_seconds += elapsed
+        print(f"[AGENT_POOL] Constructed agent #{self.stats.constructed} in {elapsed * 1000:.1f} ms")
+        return agent
+
+    def warm(self, count: int) -> None:
+        """Pre-construct agents so the first `count` borrows skip setup."""
+        while len(self._idle) < min(count, self.max_idle):
+            self._idle.append(self._construct())
+
+    def borrow(self) -> Any:
+        self.stats.acquisitions += 1
+        if self._idle:
+            self.stats.reuses += 1
+            return self._idle.pop()
+        return self._construct()
+
+    def give_back(self, agent: Any) -> None:
+        if len(self._idle) < self.max_idle:
+            self._idle.append(agent)
+        else:
+            self.stats.discarded += 1
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """Borrow an agent for the duration of a `with` block."""
+        agent = self.borrow()
+        try:
+            yield agent
+        finally:
+            self.give_back(agent)
+
+
+_agent_pool: Optional[MaintenanceTriageAgentPool] = None
+
+
+def get_agent_pool() -> MaintenanceTriageAgentPool:
+    """Return the process-wide agent pool, creating it on first use."""
+    global _agent_pool
+    if _agent_pool is None:
+        _agent_pool = MaintenanceTriageAgentPool()
+    return _agent_pool
@@ -1,38 +1,99 @@
 """Maintenance triage agent using Google ADK and Gemini."""
-from typing import Dict, Any
+import os
+from typing import Dict, Any, Optional, Type
+from pydantic import BaseModel
 from google.adk.sessions import BaseSessionService
 from google.adk.runners import Runner
 from src.adk_agents.maintenance_triage.agent import root_agent as TRIAGE_ADK_AGENT
-from src.utils.json_utils import extract_json_from_llm_output
-from src.utils.session_manager import build_session_service, run_session
+from src.adk_agents.maintenance_triage.agent import structured_triage_agent as STRUCTURED_TRIAGE_ADK_AGENT
+from src.agents.vendor_agent import VendorAgent, VendorCallError
+from src.prompts.response_schemas import (
+    TriageResult,
+    VendorAvailability,
+    VendorBooking,
+    VendorQuote,
+    VendorQuoteWithAvailability,
+)
+from src.utils.json_utils import parse_llm_json
+from src.utils.metrics import instrument_agent_call
+from src.utils.session_manager import build_session_service, run_session, ticket_session_id
 from src.prompts.system_prompts import (
     format_triage_request,
     format_vendor_quote_request,
+    format_vendor_quote_with_availability_request,
     format_vendor_availability_request,
     format_vendor_booking_request
 )
 from src.utils.constants import APP_NAME
-import json
+from src.utils.triage_cache import USE_TRIAGE_CACHE, TriageCache, get_triage_cache
+
+# "agent": vendor calls are delegated by the Gemini root agent to its A2A sub-agent.
+# "direct": structured A2A messages go straight to the vendor server (no orchestrator LLM hop).
+VENDOR_CALL_MODE = os.getenv("VENDOR_CALL_MODE", "agent").lower()
+# Triage through the schema-constrained ADK agent (TriageResult JSON) instead of the free-text root agent
+USE_STRUCTURED_OUTPUT = os.getenv("USE_STRUCTURED_OUTPUT", "true").lower() == "true"
+
+FALLBACK_TRIAGE = {
+    "triage_label": "VENDOR_REQUIRED",
+    "explanation": "Failed to parse triage response",
+    "self_help_steps": [],
+    "kb_article_id": None,
+    "kb_article_title": None,
+    "vendor_selection": None
+}
 
 
 class MaintenanceTriageAgent:
-    def __init__(self):
-        """Initialize the maintenance triage agent."""
+    def __init__(
+        self,
+        session_service: Optional[BaseSessionService] = None,
+        vendor_mode: Optional[str] = None,
+        vendor_client: Optional[VendorAgent] = None,
+        triage_cache: Optional[TriageCache] = None,
+    ):
+        """
+        Initialize the maintenance triage agent.
+
+        Args:
+            session_service: Session service to reuse (e.g. shared by an agent pool).
+                Defaults to a new one from build_session_service().
+            vendor_mode: "agent" or "direct" (defaults to VENDOR_CALL_MODE).
+            vendor_client: VendorAgent used in direct mode (created if omitted).
+            triage_cache: Cache consulted before Gemini triage (defaults to the
+                shared cache when USE_TRIAGE_CACHE is enabled).
+        """
         # Use the ADK agent from adk_agents
         self.agent = TRIAGE_ADK_AGENT
         # Shared session service (same DB as adk web)
-        self.session_service: BaseSessionService = build_session_service()
+        self.session_service: BaseSessionService = session_service or build_session_service()
         self.runner = Runner(
             agent=self.agent,
             app_name=APP_NAME,
             session_service=self.session_service,
         )
+        # Triage calls get typed JSON from the structured twin; vendor calls still need the sub-agent
+        self.triage_runner = self.runner
+        if USE_STRUCTURED_OUTPUT:
+            self.triage_runner = Runner(
+                agent=STRUCTURED_TRIAGE_ADK_AGENT,
+                app_name=APP_NAME,
+                session_service=self.session_service,
+            )
         print(f"✅ Maintenance Triage Agent initialized!")
         print(f"   - Application: {APP_NAME}")
         print(f"   - Model: {self.agent.model.model}")
         print(f"   - Session Service: {self.runner.session_service.__class__.__name__}")
         print(f"   - Sub-agents: {len(self.agent.sub_agents)} (Vendor Agent via A2A)")
+        self.vendor_mode = (vendor_mode or VENDOR_CALL_MODE).lower()
+        self.vendor_client: Optional[VendorAgent] = vendor_client
+        if self.vendor_mode == "direct" and self.vendor_client is None:
+            self.vendor_client = VendorAgent()
+        print(f"   - Vendor call mode: {self.vendor_mode}")
+        self.triage_cache: Optional[TriageCache] = triage_cache
+        if self.triage_cache is None and USE_TRIAGE_CACHE:
+            self.triage_cache = get_triage_cache()
 
+    @instrument_agent_call("triage")
     async def triage_issue(
         self,
         request: Dict[str, Any],
@@ -44,6 +105,14 @@ class MaintenanceTriageAgent:
         title = request.get("title", "")
         description = request.get("description", "")
 
+        if self.triage_cache is not None:
+            cached = self.triage_cache.get(request)
+            if cached is not None:
+                print(f"[TRIAGE_CACHE] Hit for ticket {request.get('ticket_id')}")
+                logs["triage_cache"] = "hit"
+                return cached
+            logs["triage_cache"] = "miss"
+
         query = format_triage_request(
             property_id=property_id,
             priority=priority,
@@ -53,38 +122,39 @@ class MaintenanceTriageAgent:
         )
 
         response = await run_session(
-            runner_instance=self.runner,
-            session_service=self.runner.session_service,
+            runner_instance=self.triage_runner,
+            session_service=self.triage_runner.session_service,
             user_queries=[query],
-            session_name="triage_session",
+            session_name=ticket_session_id(logs, "triage", request.get("ticket_id")),
             logs=logs,
         )
 
-        # Parse JSON response
+        # The final answer alone; the full response may include intermediate model text
         try:
-            # Remove markdown code blocks if present
-            response_text = response.strip()
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            
-            triage_result = json.loads(response_text.strip())
-            return triage_result
-        except json.JSONDecodeError as e:
-            print(f"⚠️  Failed to parse triage response as JSON: {e}")
+            triage_result = parse_llm_json(logs.get("adk_final_response") or response, TriageResult)
+        except ValueError as e:
+            print(f"⚠️  Triage response does not match TriageResult: {e}")
             print(f"Raw response: {response}")
-            return {
-                "triage_label": "VENDOR_REQUIRED",
-                "explanation": "Failed to parse triage response",
-                "self_help_steps": [],
-                "kb_article_id": None,
-                "kb_article_title": None,
-                "vendor_selection": None
-            }
-    
+            logs["triage_parse_error"] = str(e)
+            return dict(FALLBACK_TRIAGE)
+        if self.triage_cache is not None:
+            self.triage_cache.put(request, triage_result)
+        return triage_result
+
+    @staticmethod
+    def _parse_vendor_response(
+        operation: str,
+        response: str,
+        schema: Type[BaseModel],
+        logs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Validate the sub-agent's JSON like the direct client does; malformed output fails the call."""
+        try:
+            return parse_llm_json(logs.get("adk_final_response") or response, schema)
+        except ValueError as e:
+            raise VendorCallError(f"Vendor '{operation}' response does not match {schema.__name__}: {e}") from e
+
+    @instrument_agent_call("vendor_quote")
     async def request_vendor_quote(
         self,
         service_type: str,
@@ -94,6 +164,14 @@ class MaintenanceTriageAgent:
         logs: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Request a quote from vendor via A2A sub-agent."""
+        if self.vendor_mode == "direct":
+            return await self.vendor_client.request_quote(
+                service_type=service_type,
+                issue_description=issue_description,
+                property_zip=property_zip,
+                severity=severity,
+                logs=logs
+            )
         query = format_vendor_quote_request(
             service_type=service_type,
             issue_description=issue_description,
@@ -105,17 +183,51 @@ class MaintenanceTriageAgent:
             runner_instance=self.runner,
             session_service=self.runner.session_service,
             user_queries=[query],
-            session_name="vendor_quote_session",
+            session_name=ticket_session_id(logs, "vendor"),
             logs=logs,
         )
         
-        # Parse response
-        try:
-            return extract_json_from_llm_output(response.strip())
-            # return json.loads(response.strip())
-        except json.JSONDecodeError:
-            return {"response": response}
+        return self._parse_vendor_response("request_quote", response, VendorQuote, logs)
     
+    @instrument_agent_call("vendor_quote_availability")
+    async def request_vendor_quote_with_availability(
+        self,
+        service_type: str,
+        issue_description: str,
+        property_zip: str,
+        severity: str,
+        logs: Dict[str, Any],
+        max_slots: int = 3
+    ) -> Dict[str, Any]:
+        """Request a quote plus the first `max_slots` slots via one A2A sub-agent call."""
+        if self.vendor_mode == "direct":
+            return await self.vendor_client.request_quote_with_availability(
+                service_type=service_type,
+                issue_description=issue_description,
+                property_zip=property_zip,
+                severity=severity,
+                max_slots=max_slots,
+                logs=logs
+            )
+        query = format_vendor_quote_with_availability_request(
+            service_type=service_type,
+            issue_description=issue_description,
+            property_zip=property_zip,
+            severity=severity,
+            max_slots=max_slots
+        )
+        
+        response = await run_session(
+            runner_instance=self.runner,
+            session_service=self.runner.session_service,
+            user_queries=[query],
+            session_name=ticket_session_id(logs, "vendor"),
+            logs=logs,
+        )
+        
+        return self._parse_vendor_response("request_quote_with_availability", response, VendorQuoteWithAvailability, logs)
+    
+    @instrument_agent_call("vendor_availability")
     async def check_vendor_availability(
         self,
         service_type: str,
@@ -123,6 +235,12 @@ class MaintenanceTriageAgent:
         logs: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Check vendor availability via A2A sub-agent."""
+        if self.vendor_mode == "direct":
+            return await self.vendor_client.get_availability(
+                service_type=service_type,
+                quote_id=quote_id,
+                logs=logs
+            )
         query = format_vendor_availability_request(
             service_type=service_type,
             quote_id=quote_id
@@ -132,15 +250,13 @@ class MaintenanceTriageAgent:
             runner_instance=self.runner,
             session_service=self.runner.session_service,
             user_queries=[query],
-            session_name="vendor_availability_session",
+            session_name=ticket_session_id(logs, "vendor"),
             logs=logs,
         )
         
-        try:
-            return extract_json_from_llm_output(response.strip())
-        except json.JSONDecodeError:
-            return {"response": response}
+        return self._parse_vendor_response("get_availability", response, VendorAvailability, logs)
     
+    @instrument_agent_call("vendor_booking")
     async def book_vendor_slot(
         self,
         quote_id: str,
@@ -151,6 +267,15 @@ class MaintenanceTriageAgent:
         logs: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Book a vendor slot via A2A sub-agent."""
+        if self.vendor_mode == "direct":
+            return await self.vendor_client.book_slot(
+                quote_id=quote_id,
+                slot_id=slot_id,
+                tenant_name=tenant_name,
+                tenant_phone=tenant_phone,
+                special_instructions=special_instructions,
+                logs=logs
+            )
         query = format_vendor_booking_request(
             quote_id=quote_id,
             slot_id=slot_id,
@@ -163,11 +288,8 @@ class MaintenanceTriageAgent:
             runner_instance=self.runner,
             session_service=self.runner.session_service,
             user_queries=[query],
-            session_name="vendor_booking_session",
+            session_name=ticket_session_id(logs, "vendor"),
             logs=logs,
         )
         
-        try:
-            return extract_json_from_llm_output(response.strip())
-        except json.JSONDecodeError:
-            return {"response": response}
\ No newline at end of file
+        return self._parse_vendor_response("book_slot", response, VendorBooking, logs)
\ No newline at end of file
@@ -1,59 +1,222 @@
-"""Vendor agent wrapper for A2A communication."""
+"""Vendor agent client for direct, structured A2A communication."""
+
+import json
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
+import httpx
+from a2a.client import A2ACardResolver, ClientConfig, ClientFactory
+from a2a.types import DataPart, Message, Part, Role, TextPart
+from pydantic import BaseModel, ValidationError
+from src.prompts.response_schemas import (
+    VendorAvailability,
+    VendorBooking,
+    VendorQuote,
+    VendorQuoteWithAvailability,
+)
+from src.utils.json_utils import PARSE_FAILURES, extract_json_from_llm_output
+from src.utils.metrics import current_stage, get_metrics, httpx_event_hooks
+
+
+class VendorCallError(RuntimeError):
+    """Raised when a direct vendor call fails or returns an invalid payload."""
 
-from typing import Dict, Any
-from google.adk.agents.remote_a2a_agent import RemoteA2aAgent, AGENT_CARD_WELL_KNOWN_PATH
 
 class VendorAgent:
-    """Client wrapper for remote vendor agent via A2A."""
-    
-    def __init__(self, vendor_url: str = "http://localhost:8001"):
+    """
+    Client for the remote vendor agent that bypasses the orchestrating LLM.
+
+    Each call sends one structured A2A message (a DataPart naming the vendor
+    tool and its arguments) straight to the vendor server. The result is read
+    from the vendor tool's function_response part when present, otherwise from
+    the vendor agent's final JSON text, and validated against the typed schemas
+    in response_schemas.py.
+    """
+
+    def __init__(self, vendor_url: str = "http://localhost:8001", timeout: float = 60.0):
         """
         Initialize vendor agent client.
-        
+
         Args:
             vendor_url: Base URL of vendor agent server
+            timeout: HTTP timeout in seconds for A2A calls
         """
         self.vendor_url = vendor_url
-        self.remote_agent = RemoteA2aAgent(
-            name="vendor_service_agent",
-            description="Remote vendor agent for maintenance services",
-            agent_card=f"{vendor_url}{AGENT_CARD_WELL_KNOWN_PATH}"
-        )
-        print(f"✅ Vendor Agent client initialized")
+        self.timeout = timeout
+        self._httpx_client: Optional[httpx.AsyncClient] = None
+        self._client = None
+        print(f"✅ Vendor Agent client initialized (direct A2A)")
         print(f"   Vendor URL: {vendor_url}")
-        print(f"   Agent card: {vendor_url}{AGENT_CARD_WELL_KNOWN_PATH}")
-    
-    async def request_quote(self, vendor_choice: Dict[str, Any], scenario: Dict[str, Any]) -> Dict[str, Any]:
-        """Request a quote from vendor via A2A."""
-        # This will be called by maintenance triage agent via A2A
-        return await self.remote_agent.run({
-            "action": "request_quote",
-            "service_type": vendor_choice.get("service_type", "HVAC"),
-            "issue_description": scenario["tenant_input"]["description"],
-            "property_zip": scenario["property"]["zip"],
-            "severity": scenario.get("ground_truth", {}).get("severity", "MEDIUM")
-        })
-    
-    async def get_availability(self, vendor_choice: Dict[str, Any], quote: Dict[str, Any]) -> Dict[str, Any]:
-        """Get availability from vendor via A2A."""
-        return await self.remote_agent.run({
-            "action": "get_availability",
-            "service_type": vendor_choice.get("service_type", "HVAC"),
-            "quote_id": quote.get("quote_id", "")
-        })
-    
+
+    async def _ensure_client(self):
+        if self._client is None:
+            self._httpx_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout), event_hooks=httpx_event_hooks("a2a")
+            )
+            card = await A2ACardResolver(self._httpx_client, self.vendor_url).get_agent_card()
+            factory = ClientFactory(ClientConfig(httpx_client=self._httpx_client))
+            self._client = factory.create(card)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._httpx_client is not None:
+            await self._httpx_client.aclose()
+        self._httpx_client = None
+        self._client = None
+
+    async def _stream_parts(self, message: Message) -> AsyncIterator[Any]:
+        """Yield every A2A part (text or data) the vendor server emits for a message."""
+        client = await self._ensure_client()
+        final_task = None
+        streamed = False
+        async for event in client.send_message(message):
+            if isinstance(event, Message):
+                for part in event.parts:
+                    streamed = True
+                    yield part.root
+                continue
+            task, update = event
+            final_task = task
+            if update is None:
+                continue
+            parts: List[Part] = []
+            if getattr(update, "artifact", None) is not None:
+                parts = update.artifact.parts
+            elif getattr(update, "status", None) is not None and update.status.message is not None:
+                parts = update.status.message.parts
+            for part in parts:
+                streamed = True
+                yield part.root
+        # Non-streaming servers only return the final task; its history also echoes our own request
+        if final_task is not None and not streamed:
+            for history_message in final_task.history or []:
+                if history_message.role != Role.agent:
+                    continue
+                for part in history_message.parts:
+                    yield part.root
+            for artifact in final_task.artifacts or []:
+                for part in artifact.parts:
+                    yield part.root
+
+    async def _call(
+        self,
+        operation: str,
+        arguments: Dict[str, Any],
+        schema: Type[BaseModel],
+        logs: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        message = Message(
+            message_id=uuid.uuid4().hex,
+            role=Role.user,
+            parts=[
+                Part(root=DataPart(data={"operation": operation, "arguments": arguments})),
+                Part(root=TextPart(text=(
+                    f"Call the `{operation}` tool exactly once with the arguments above "
+                    f"and return its output as JSON only."
+                ))),
+            ],
+        )
+
+        started = time.perf_counter()
+        tool_output: Optional[Dict[str, Any]] = None
+        text = ""
+        try:
+            async for part in self._stream_parts(message):
+                if isinstance(part, DataPart):
+                    data = part.data or {}
+                    if data.get("name") == operation and isinstance(data.get("response"), dict):
+                        tool_output = data["response"]
+                elif isinstance(part, TextPart) and part.text:
+                    text += part.text
+        except Exception as e:
+            raise VendorCallError(f"A2A call '{operation}' to {self.vendor_url} failed: {e!r}") from e
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        get_metrics().observe("a2a_call_ms", elapsed_ms, operation=operation, stage=current_stage())
+
+        source = "function_response"
+        payload = tool_output
+        if payload is None:
+            source = "text"
+            try:
+                payload = extract_json_from_llm_output(text)
+            except json.JSONDecodeError as e:
+                PARSE_FAILURES[schema.__name__] += 1
+                raise VendorCallError(f"Vendor '{operation}' returned no parseable JSON: {text[:200]!r}") from e
+
+        try:
+            result = schema.model_validate(payload).model_dump(by_alias=True)
+        except ValidationError as e:
+            PARSE_FAILURES[schema.__name__] += 1
+            raise VendorCallError(f"Vendor '{operation}' response does not match {schema.__name__}: {e}") from e
+
+        if logs is not None:
+            logs.setdefault("a2a_calls", []).append({
+                "operation": operation,
+                "source": source,
+                "elapsed_ms": round(elapsed_ms, 1),
+            })
+        return result
+
+    async def request_quote(
+        self,
+        service_type: str,
+        issue_description: str,
+        property_zip: str,
+        severity: str,
+        logs: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Request a quote from the vendor via direct A2A."""
+        return await self._call("request_quote", {
+            "service_type": service_type,
+            "issue_description": issue_description,
+            "property_zip": property_zip,
+            "severity": severity,
+        }, VendorQuote, logs)
+
+    async def request_quote_with_availability(
+        self,
+        service_type: str,
+        issue_description: str,
+        property_zip: str,
+        severity: str,
+        max_slots: int = 3,
+        logs: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Request a quote plus the first slots via one direct A2A call."""
+        return await self._call("request_quote_with_availability", {
+            "service_type": service_type,
+            "issue_description": issue_description,
+            "property_zip": property_zip,
+            "severity": severity,
+            "max_slots": max_slots,
+        }, VendorQuoteWithAvailability, logs)
+
+    async def get_availability(
+        self,
+        service_type: str,
+        quote_id: str,
+        logs: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Get availability from the vendor via direct A2A."""
+        return await self._call("get_availability", {
+            "service_type": service_type,
+            "quote_id": quote_id,
+        }, VendorAvailability, logs)
+
     async def book_slot(
         self,
-        vendor_choice: Dict[str, Any],
-        quote: Dict[str, Any],
-        slot: Dict[str, Any],
-        tenant_contact: Dict[str, Any]
+        quote_id: str,
+        slot_id: str,
+        tenant_name: str,
+        tenant_phone: str,
+        special_instructions: str = "",
+        logs: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        """Book a slot with vendor via A2A."""
-        return await self.remote_agent.run({
-            "action": "book_slot",
-            "quote_id": quote.get("quote_id", ""),
-            "slot_id": slot.get("slot_id", ""),
-            "tenant_name": tenant_contact.get("name", ""),
-            "tenant_phone": tenant_contact.get("phone", "")
-        })
\ No newline at end of file
+        """Book a slot with the vendor via direct A2A."""
+        return await self._call("book_slot", {
+            "quote_id": quote_id,
+            "slot_id": slot_id,
+            "tenant_name": tenant_name,
+            "tenant_phone": tenant_phone,
+            "special_instructions": special_instructions,
+        }, VendorBooking, logs)
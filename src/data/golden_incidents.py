@@ -1,4 +1,5 @@
 import json
+from typing import Any, Dict, Iterable, Iterator
 
 golden_incidents_jsonl = """
 {"scenario_id":"S1_TRIPPED_BREAKER","tenant_input":{"title":"Bedroom lights not working","description":"Lights in the second bedroom suddenly went off but the rest of the house is fine.","priority_hint":"MEDIUM","photo_tags":["breaker_panel","switches"]},"property":{"property_id":"P1","zip":"95054","type":"APARTMENT","floor":3},"ground_truth":{"issue_type":"ELECTRICAL","severity":"MEDIUM","self_help_allowed":true,"self_help_should_succeed":true,"must_escalate_immediately":false,"expected_vendor_service_type":null,"acceptable_vendors":[],"max_budget":0,"expected_state_sequence":["REPORTED","TRIAGED","SELF_HELP_PROPOSED","SELF_HELP_SUCCEEDED","CLOSED"]}}
@@ -8,5 +9,12 @@ golden_incidents_jsonl = """
 {"scenario_id":"S5_AC_NOT_COOLING_HEAT_WAVE","tenant_input":{"title":"AC not cooling and it is very hot","description":"The central AC is blowing air but it is not cold. Tenant is an elderly couple and it is 40C outside.","priority_hint":"HIGH","photo_tags":["thermostat_display"]},"property":{"property_id":"P4","zip":"95054","type":"SINGLE_FAMILY","floor":1},"ground_truth":{"issue_type":"HVAC","severity":"CRITICAL","self_help_allowed":false,"self_help_should_succeed":false,"must_escalate_immediately":true,"expected_vendor_service_type":"HVAC","acceptable_vendors":["V_HVAC_FAST"],"max_budget":500,"expected_state_sequence":["REPORTED","TRIAGED","ESCALATED","VENDOR_SELECTED","QUOTE_RECEIVED","QUOTE_APPROVED","SCHEDULED","WORK_DONE","PAID","CLOSED"]}}
 """.strip()
 
+def iter_incidents_jsonl(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Parse incidents one JSONL line at a time, skipping blank lines."""
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
 def load_golden_incidents():
-    return [json.loads(line) for line in golden_incidents_jsonl.splitlines()]
\ No newline at end of file
+    return list(iter_incidents_jsonl(golden_incidents_jsonl.splitlines()))
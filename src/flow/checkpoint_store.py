@@ -0,0 +1,164 @@
+"""SQLite checkpoints for resumable scenario execution."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from src.flow.logs_recorder import json_default
+
+# Checkpoint after every state transition when enabled (read from .env)
+USE_FLOW_CHECKPOINTS = os.getenv("USE_FLOW_CHECKPOINTS", "false").lower() == "true"
+FLOW_CHECKPOINT_DB = os.getenv("FLOW_CHECKPOINT_DB", "flow_checkpoints.db")
+
+
+@dataclass
+class ScenarioCheckpoint:
+    scenario_id: str
+    scenario: Dict[str, Any]
+    steps: Dict[str, Any]
+    logs: Dict[str, Any]
+    last_state: Optional[str]
+    updated_at: float
+
+
+class ScenarioCheckpointStore:
+    """
+    Local SQLite store of per-scenario progress keyed by scenario_id.
+
+    Each row holds the scenario input, the results of every completed step
+    (triage, quote, booking, ...) and a snapshot of the LogsRecorder, so a
+    crashed or retried scenario can be resumed without repeating paid calls.
+    """
+
+    def __init__(self, db_path: str = FLOW_CHECKPOINT_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scenario_checkpoints (
+                scenario_id TEXT PRIMARY KEY,
+                scenario TEXT NOT NULL,
+                steps TEXT NOT NULL,
+                logs TEXT NOT NULL,
+                last_state TEXT,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+
+    def save(
+        self,
+        scenario_id: str,
+        scenario: Dict[str, Any],
+        steps: Dict[str, Any],
+        logs: Dict[str, Any],
+        last_state: Optional[str],
+    ) -> None:
+        row = (
+            scenario_id,
+            json.dumps(scenario, default=str),
+            json.dumps(steps, default=str),
+            json.dumps(logs, default=json_default),
+            last_state,
+            time.time(),
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scenario_checkpoints "
+                "(scenario_id, scenario, steps, logs, last_state, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                row,
+            )
+
+    def load(self, scenario_id: str) -> Optional[ScenarioCheckpoint]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT scenario_id, scenario, steps, logs, last_state, updated_at "
+                "FROM scenario_checkpoints WHERE scenario_id = ?",
+                (scenario_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return ScenarioCheckpoint(
+            scenario_id=row[0],
+            scenario=json.loads(row[1]),
+            steps=json.loads(row[2]),
+            logs=json.loads(row[3]),
+            last_state=row[4],
+            updated_at=row[5],
+        )
+
+    def incomplete(self) -> List[str]:
+        """Scenario ids whose last checkpoint is not CLOSED (candidates for resume)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT scenario_id FROM scenario_checkpoints "
+                "WHERE last_state IS NULL OR last_state != 'CLOSED' ORDER BY updated_at"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def delete(self, scenario_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM scenario_checkpoints WHERE scenario_id = ?", (scenario_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ScenarioCheckpointer:
+    """
+    Per-run step memo that persists to a ScenarioCheckpointStore.
+
+    `step(name, fn)` returns a stored result when the step already completed
+    in an earlier run, otherwise awaits `fn()` and records its result. Pass it
+    as the LogsRecorder state listener to checkpoint on every transition.
+    Without a store it only memoizes in memory.
+    """
+
+    def __init__(
+        self,
+        scenario: Dict[str, Any],
+        store: Optional[ScenarioCheckpointStore] = None,
+        steps: Optional[Dict[str, Any]] = None,
+    ):
+        self.scenario = scenario
+        self.store = store
+        self.steps: Dict[str, Any] = dict(steps or {})
+        self.reused: List[str] = []
+
+    async def step(self, name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if name in self.steps:
+            self.reused.append(name)
+            return self.steps[name]
+        result = await fn()
+        self.steps[name] = result
+        return result
+
+    def on_state(self, logs_rec, state: str) -> None:
+        if self.store is None:
+            return
+        self.store.save(
+            scenario_id=self.scenario["scenario_id"],
+            scenario=self.scenario,
+            steps=self.steps,
+            logs=logs_rec.to_dict(),
+            last_state=state,
+        )
+
+
+_checkpoint_store: Optional[ScenarioCheckpointStore] = None
+
+
+def get_checkpoint_store() -> ScenarioCheckpointStore:
+    """Return the process-wide checkpoint store at FLOW_CHECKPOINT_DB."""
+    global _checkpoint_store
+    if _checkpoint_store is None:
+        _checkpoint_store = ScenarioCheckpointStore(FLOW_CHECKPOINT_DB)
+    return _checkpoint_store
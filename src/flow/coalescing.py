@@ -0,0 +1,145 @@
+"""Coalesce tickets for the same property and issue type into one vendor job."""
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Merge escalated tickets into one vendor job during outage storms (read from .env)
+USE_INCIDENT_COALESCING = os.getenv("USE_INCIDENT_COALESCING", "false").lower() == "true"
+COALESCE_WINDOW_SECONDS = float(os.getenv("COALESCE_WINDOW_SECONDS", "900"))
+# "split": every ticket pays an equal share; "attribute": the first ticket pays the whole job
+COALESCE_PAYMENT_MODE = os.getenv("COALESCE_PAYMENT_MODE", "split").lower()
+
+JobKey = Tuple[str, str]
+
+
+@dataclass
+class VendorJob:
+    """
+    One vendor visit shared by every ticket that joined it.
+
+    The leader (first ticket) runs vendor selection, quote, booking and the
+    job update; followers await `outcome` and reuse those results. The job
+    stops accepting members once the outcome is published. `budgets` holds
+    each member's max budget (None when unknown) so followers that cannot
+    afford the leader's quote leave before the cost is split.
+    """
+    key: JobKey
+    leader_id: str
+    created_at: float
+    members: List[str] = field(default_factory=list)
+    budgets: Dict[str, Optional[float]] = field(default_factory=dict)
+    closed: bool = False
+    outcome: Optional["asyncio.Future"] = None
+
+    def share(self, total: float, scenario_id: str, mode: str = COALESCE_PAYMENT_MODE) -> float:
+        """Amount `scenario_id` pays towards a job costing `total`."""
+        if mode == "attribute":
+            return total if scenario_id == self.leader_id else 0.0
+        return round(total / max(len(self.members), 1), 2)
+
+    def within_budget(self, scenario_id: str, total_estimate: float) -> bool:
+        """Whether `scenario_id` can approve a job quoted at `total_estimate`."""
+        budget = self.budgets.get(scenario_id)
+        return budget is None or total_estimate <= budget
+
+
+@dataclass
+class CoalescingStats:
+    jobs: int = 0
+    coalesced_tickets: int = 0
+    abandoned_jobs: int = 0
+    over_budget_tickets: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class VendorJobCoalescer:
+    """
+    Groups tickets by (property_id, issue_type) within `window_seconds`.
+
+    `join()` returns the open job for the key, creating one (with the caller
+    as leader) when there is none, the window has passed, or the previous
+    job already finished. Each follower saves a vendor selection, a quote
+    and a booking round trip.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = COALESCE_WINDOW_SECONDS,
+        payment_mode: str = COALESCE_PAYMENT_MODE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if payment_mode not in ("split", "attribute"):
+            raise ValueError(f"Unknown coalescing payment mode '{payment_mode}'")
+        self.window_seconds = window_seconds
+        self.payment_mode = payment_mode
+        self.clock = clock
+        self.stats = CoalescingStats()
+        self._lock = threading.Lock()
+        self._open: Dict[JobKey, VendorJob] = {}
+
+    def join(
+        self, property_id: str, issue_type: str, scenario_id: str, max_budget: Optional[float] = None
+    ) -> Tuple[VendorJob, bool]:
+        """Attach a ticket to a vendor job; returns (job, is_leader)."""
+        key = (str(property_id), str(issue_type))
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            now = self.clock()
+            job = self._open.get(key)
+            if (
+                job is not None
+                and not job.closed
+                and now - job.created_at <= self.window_seconds
+                and job.outcome.get_loop() is loop
+            ):
+                job.members.append(scenario_id)
+                job.budgets[scenario_id] = max_budget
+                self.stats.coalesced_tickets += 1
+                return job, False
+            job = VendorJob(key=key, leader_id=scenario_id, created_at=now, members=[scenario_id])
+            job.budgets[scenario_id] = max_budget
+            job.outcome = loop.create_future()
+            self._open[key] = job
+            self.stats.jobs += 1
+            return job, True
+
+    def publish(
+        self, job: VendorJob, outcome: Optional[Dict[str, Any]], total_estimate: Optional[float] = None
+    ) -> None:
+        """
+        Close the job to new members and hand its results to the followers.
+
+        Publishing None (the leader never got a vendor scheduled) lets each
+        follower run its own vendor path instead. Followers whose budget is
+        below `total_estimate` are dropped from `members` (they reject the
+        quote) before any member computes its share.
+        """
+        with self._lock:
+            job.closed = True
+            if self._open.get(job.key) is job:
+                del self._open[job.key]
+            if outcome is None:
+                self.stats.abandoned_jobs += 1
+            elif total_estimate is not None:
+                kept = [m for m in job.members if m == job.leader_id or job.within_budget(m, total_estimate)]
+                self.stats.over_budget_tickets += len(job.members) - len(kept)
+                job.members = kept
+        if not job.outcome.done():
+            job.outcome.set_result(outcome)
+
+
+_coalescer: Optional[VendorJobCoalescer] = None
+
+
+def get_vendor_job_coalescer() -> VendorJobCoalescer:
+    """Return the process-wide vendor job coalescer."""
+    global _coalescer
+    if _coalescer is None:
+        _coalescer = VendorJobCoalescer()
+    return _coalescer
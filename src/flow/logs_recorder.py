@@ -0,0 +1,214 @@
+"""Compact per-scenario log record with JSON / binary serialization."""
+
+import json
+import marshal
+from enum import Enum
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+class FlowState(str, Enum):
+    """Incident lifecycle states; compare equal to their plain string names."""
+    REPORTED = "REPORTED"
+    TRIAGED = "TRIAGED"
+    SELF_HELP_PROPOSED = "SELF_HELP_PROPOSED"
+    SELF_HELP_SUCCEEDED = "SELF_HELP_SUCCEEDED"
+    SELF_HELP_FAILED = "SELF_HELP_FAILED"
+    ESCALATED = "ESCALATED"
+    VENDOR_SELECTED = "VENDOR_SELECTED"
+    QUOTE_RECEIVED = "QUOTE_RECEIVED"
+    QUOTE_APPROVED = "QUOTE_APPROVED"
+    QUOTE_REJECTED = "QUOTE_REJECTED"
+    SCHEDULED = "SCHEDULED"
+    WORK_DONE = "WORK_DONE"
+    FAILED = "FAILED"
+    PAID = "PAID"
+    CLOSED = "CLOSED"
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+
+# One byte per recorded state instead of a pointer to a string
+_STATE_BY_CODE: Tuple[FlowState, ...] = tuple(FlowState)
+_CODE_BY_STATE: Dict[str, int] = {state.value: code for code, state in enumerate(_STATE_BY_CODE)}
+
+AUDIENCES = ("tenant", "landlord")
+
+# Bump when the to_bytes() field layout changes
+_BINARY_VERSION = 1
+
+# Artifact fields, in binary layout order
+_FIELDS = (
+    "scenario_id",
+    "triage",
+    "trace_id",
+    "self_help",
+    "vendor_selection",
+    "quote",
+    "booking",
+    "job_update",
+    "payment",
+    "vendor_logs",
+    "error",
+    "step_timings",
+)
+_INTERNAL = frozenset(("_state_codes", "_messages", "_state_listener", "_view"))
+
+
+def json_default(obj: Any) -> Any:
+    """json.dumps fallback: lazily captured objects (e.g. EventCapture) export themselves."""
+    export = getattr(obj, "export", None)
+    return export() if callable(export) else str(obj)
+
+
+class LogsRecorder:
+    """
+    Everything one scenario run produced: states, messages and step artifacts.
+
+    Slotted so large batches stay small in memory: states are kept as one
+    byte per transition and messages as a single (audience, text) list. The
+    `states` and `messages` attributes are views rebuilt on access, and
+    `to_dict()` is built once and reused until the record changes. Artifacts
+    are replaced (not mutated in place) by the flow, which is what keeps the
+    cached view valid.
+    """
+
+    __slots__ = _FIELDS + tuple(_INTERNAL)
+
+    def __init__(self, scenario_id):
+        self._view: Optional[Dict[str, Any]] = None
+        self.scenario_id = scenario_id
+        self.triage: Dict[str, Any] = {}
+        self.trace_id: Optional[str] = None
+        self.self_help: Dict[str, Any] = {}
+        self.vendor_selection: Optional[Dict[str, Any]] = None
+        self.quote: Optional[Dict[str, Any]] = None
+        self.booking: Optional[Dict[str, Any]] = None
+        self.job_update: Optional[Dict[str, Any]] = None
+        self.payment: Optional[Dict[str, Any]] = None
+        self.vendor_logs: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        # Wall time per flow graph node in ms
+        self.step_timings: Dict[str, float] = {}
+        self._state_codes = bytearray()
+        self._messages: List[Tuple[str, str]] = []
+        # Called as listener(logs_rec, state) after every transition (e.g. checkpointing)
+        self._state_listener: Optional[Callable[["LogsRecorder", str], None]] = None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name not in _INTERNAL:
+            object.__setattr__(self, "_view", None)
+
+    @property
+    def states(self) -> List[FlowState]:
+        return [_STATE_BY_CODE[code] for code in self._state_codes]
+
+    @states.setter
+    def states(self, states: Iterable[str]) -> None:
+        self._state_codes = bytearray(_CODE_BY_STATE[str(state)] for state in states)
+        self._view = None
+
+    @property
+    def final_state(self) -> Optional[FlowState]:
+        return _STATE_BY_CODE[self._state_codes[-1]] if self._state_codes else None
+
+    @property
+    def messages(self) -> Dict[str, List[str]]:
+        """Messages grouped by audience (a fresh dict; use add_message to record)."""
+        grouped: Dict[str, List[str]] = {audience: [] for audience in AUDIENCES}
+        for audience, text in self._messages:
+            grouped.setdefault(audience, []).append(text)
+        return grouped
+
+    @messages.setter
+    def messages(self, messages: Dict[str, Iterable[str]]) -> None:
+        self._messages = [(audience, text) for audience, texts in messages.items() for text in texts]
+        self._view = None
+
+    def add_state(self, state):
+        code = _CODE_BY_STATE.get(str(state))
+        if code is None:
+            raise ValueError(f"Unknown flow state '{state}'")
+        self._state_codes.append(code)
+        self._view = None
+        if self._state_listener is not None:
+            self._state_listener(self, _STATE_BY_CODE[code])
+
+    def add_message(self, audience: str, text: str) -> None:
+        self._messages.append((audience, text))
+        self._view = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready view of the record; cached until the record changes, treat as read-only."""
+        if self._view is None:
+            view = {name: getattr(self, name) for name in _FIELDS}
+            view["states"] = [state.value for state in self.states]
+            view["messages"] = self.messages
+            self._view = view
+        return self._view
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogsRecorder":
+        logs_rec = cls(scenario_id=data["scenario_id"])
+        for key, value in data.items():
+            if key in _FIELDS or key in ("states", "messages"):
+                setattr(logs_rec, key, value)
+        return logs_rec
+
+    def to_json_bytes(self) -> bytes:
+        """Compact UTF-8 JSON (one JSONL line without the newline)."""
+        return json.dumps(self.to_dict(), separators=(",", ":"), ensure_ascii=False, default=json_default).encode("utf-8")
+
+    @classmethod
+    def from_json_bytes(cls, data: Union[bytes, str]) -> "LogsRecorder":
+        return cls.from_dict(json.loads(data))
+
+    def to_bytes(self) -> bytes:
+        """
+        Fast binary snapshot for in-process spill / transfer between workers.
+
+        Uses marshal, so it is only readable by the same Python version;
+        use to_json_bytes() / write_jsonl() for anything kept long term.
+        """
+        values = tuple(getattr(self, name) for name in _FIELDS)
+        try:
+            return marshal.dumps((_BINARY_VERSION, values, bytes(self._state_codes), self._messages))
+        except ValueError:
+            # Non-plain values (e.g. captured ADK events) go through their JSON export
+            values = tuple(json.loads(json.dumps(values, default=json_default)))
+            return marshal.dumps((_BINARY_VERSION, values, bytes(self._state_codes), self._messages))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LogsRecorder":
+        version, values, state_codes, messages = marshal.loads(data)
+        if version != _BINARY_VERSION:
+            raise ValueError(f"Unsupported LogsRecorder binary version {version}")
+        logs_rec = cls.__new__(cls)
+        for name, value in zip(_FIELDS, values):
+            object.__setattr__(logs_rec, name, value)
+        object.__setattr__(logs_rec, "_state_codes", bytearray(state_codes))
+        object.__setattr__(logs_rec, "_messages", [tuple(m) for m in messages])
+        object.__setattr__(logs_rec, "_state_listener", None)
+        object.__setattr__(logs_rec, "_view", None)
+        return logs_rec
+
+
+def write_jsonl(records: Iterable[LogsRecorder], fp: IO[bytes]) -> int:
+    """Bulk-export records as JSONL to a binary file object; returns the number written."""
+    count = 0
+    for logs_rec in records:
+        fp.write(logs_rec.to_json_bytes())
+        fp.write(b"\n")
+        count += 1
+    return count
+
+
+def read_jsonl(fp: IO[bytes]) -> Iterator[LogsRecorder]:
+    """Stream records back from a JSONL export."""
+    for line in fp:
+        if line.strip():
+            yield LogsRecorder.from_json_bytes(line)
@@ -1,9 +1,28 @@
-from dataclasses import dataclass, field, asdict
-from typing import Dict, Any, Optional
+import asyncio
+import copy
+import functools
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Iterable, AsyncIterable, AsyncIterator, Tuple, Union
 from src.agents.maintenance_triage_agent import MaintenanceTriageAgent
+from src.agents.agent_pool import get_agent_pool
 from src.agents.vendor_agent import VendorAgent
+from src.flow.checkpoint_store import (
+    USE_FLOW_CHECKPOINTS,
+    ScenarioCheckpointer,
+    ScenarioCheckpointStore,
+    get_checkpoint_store,
+)
+from src.flow.coalescing import USE_INCIDENT_COALESCING, VendorJob, VendorJobCoalescer, get_vendor_job_coalescer
+from src.flow.logs_recorder import FlowState, LogsRecorder
+from src.flow.step_graph import GraphContext, Step, StepGraph
 from src.data.vendors import load_vendors_df
+from src.tools.kb_tools import lookup_ticket_article
+from src.tools.vendor_tools import select_best_vendor
+from src.utils.dedupe import USE_INCIDENT_DEDUPE, NearDuplicateIndex, get_dedupe_index
 from src.utils.stubs import payment_agent, triage_agent_call, vendor_a2a_book_slot, vendor_a2a_get_availability, vendor_a2a_job_status_update_stub, vendor_a2a_request_quote, vendor_selection_agent
+from src.utils.ticket_text import TicketText
 import random
 
 # You must provide these stubs or implementations:
@@ -11,253 +30,782 @@ import random
 # vendor_a2a_request_quote, vendor_a2a_get_availability, vendor_a2a_book_slot,
 # vendor_a2a_job_status_update_stub, payment_agent, vendors_df
 
+# Triage routing: "llm" always runs Gemini triage; "tiered" lets decisive rule
+# matches (e.g. gas -> CRITICAL) escalate without an LLM round-trip.
+TRIAGE_MODE = os.getenv("TRIAGE_MODE", "llm").lower()
+TRIAGE_RULE_CONFIDENCE_THRESHOLD = float(os.getenv("TRIAGE_RULE_CONFIDENCE_THRESHOLD", "0.9"))
+# Slots requested alongside the quote so booking needs no separate availability call
+VENDOR_QUOTE_SLOTS = int(os.getenv("VENDOR_QUOTE_SLOTS", "3"))
+
+
 @dataclass
-class LogsRecorder:
-    def __init__(self, scenario_id):
-        self.scenario_id = scenario_id
-        self.triage = {}
-        self.trace_id = None
-        self.self_help: Dict[str, Any] = {}
-        self.vendor_selection: Optional[Dict[str, Any]] = None
-        self.quote: Optional[Dict[str, Any]] = None
-        self.booking: Optional[Dict[str, Any]] = None
-        self.job_update: Optional[Dict[str, Any]] = None
-        self.payment: Optional[Dict[str, Any]] = None
-        self.states = []
-        self.messages = {"tenant": [], "landlord": []}
-        self.vendor_logs: Dict[str, Any] = {}
-    def add_state(self, state):
-        self.states.append(state)
-    def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
-
-async def run_scenario_through_agents(scenario: Dict[str, Any]) -> LogsRecorder:
-    logs_rec = LogsRecorder(scenario_id=scenario["scenario_id"])
-    tenant_input = scenario["tenant_input"]
-    prop = scenario["property"]
-    gt = scenario.get("ground_truth", {})
+class TriageTierStats:
+    calls: int = 0
+    seconds: float = 0.0
+
+    @property
+    def avg_ms(self) -> float:
+        return 1000.0 * self.seconds / self.calls if self.calls else 0.0
+
+
+# Process-wide routing stats per triage tier
+triage_routing_stats: Dict[str, TriageTierStats] = {
+    "rules": TriageTierStats(),
+    "llm": TriageTierStats(),
+}
+
+
+def get_triage_routing_stats() -> Dict[str, Dict[str, float]]:
+    """Snapshot of how many tickets each triage tier resolved and at what latency."""
+    total = sum(tier.calls for tier in triage_routing_stats.values())
+    return {
+        name: {
+            "calls": tier.calls,
+            "share": tier.calls / total if total else 0.0,
+            "avg_ms": round(tier.avg_ms, 3),
+        }
+        for name, tier in triage_routing_stats.items()
+    }
+
+
+def _is_rule_triage_decisive(rules_triage: Dict[str, Any]) -> bool:
+    return (
+        TRIAGE_MODE == "tiered"
+        and rules_triage.get("must_escalate_immediately", False)
+        and rules_triage.get("confidence", 0.0) >= TRIAGE_RULE_CONFIDENCE_THRESHOLD
+    )
+
+
+def _rule_tier_triage(rules_triage: Dict[str, Any], vendor_choice: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a Gemini-shaped triage result straight from a decisive rule match."""
+    return {
+        "triage_label": "EMERGENCY",
+        "explanation": (
+            f"Rule tier classified {rules_triage.get('issue_type')} as {rules_triage.get('severity')} "
+            f"(confidence {rules_triage.get('confidence', 0.0):.2f}); escalated without LLM triage."
+        ),
+        "self_help_steps": [],
+        "kb_article_id": None,
+        "kb_article_title": None,
+        "vendor_selection": vendor_choice,
+    }
+
+
+async def _run_blocking(fn, *args, **kwargs):
+    """Run a synchronous tool in the default executor so it overlaps with LLM calls."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+
+async def _best_effort(name: str, coro) -> Optional[Dict[str, Any]]:
+    """Await a speculative triage side-call; a failure only loses the speculation."""
+    try:
+        return await coro
+    except Exception as e:
+        print(f"⚠️  Speculative {name} failed: {e!r}")
+        return None
+
+
+def _has_vendor(vendor_choice: Optional[Dict[str, Any]]) -> bool:
+    return bool(vendor_choice) and vendor_choice.get("vendor_id") is not None
+
+
+async def run_scenario_through_agents(
+    scenario: Dict[str, Any],
+    agent: Optional[MaintenanceTriageAgent] = None,
+    checkpoint_store: Optional[ScenarioCheckpointStore] = None,
+    dedupe_index: Optional[NearDuplicateIndex] = None,
+    coalescer: Optional[VendorJobCoalescer] = None,
+) -> LogsRecorder:
+    if checkpoint_store is None and USE_FLOW_CHECKPOINTS:
+        checkpoint_store = get_checkpoint_store()
+    if dedupe_index is None and USE_INCIDENT_DEDUPE:
+        dedupe_index = get_dedupe_index()
+    if coalescer is None and USE_INCIDENT_COALESCING:
+        coalescer = get_vendor_job_coalescer()
+    checkpointer = ScenarioCheckpointer(scenario, store=checkpoint_store)
+    return await _run_scenario(scenario, agent, checkpointer, dedupe_index, coalescer)
+
+
+async def resume_scenario(
+    scenario_id: str,
+    agent: Optional[MaintenanceTriageAgent] = None,
+    checkpoint_store: Optional[ScenarioCheckpointStore] = None,
+) -> LogsRecorder:
+    """
+    Continue a checkpointed scenario from its last completed step.
+
+    Completed steps (triage, quote, approval, booking, job update, payment)
+    are replayed from the checkpoint store instead of being re-executed, so a
+    retry only pays for the steps that never finished.
+    """
+    store = checkpoint_store or get_checkpoint_store()
+    checkpoint = store.load(scenario_id)
+    if checkpoint is None:
+        raise KeyError(f"No checkpoint found for scenario '{scenario_id}'")
+    if checkpoint.last_state == FlowState.CLOSED:
+        return LogsRecorder.from_dict(checkpoint.logs)
+    checkpointer = ScenarioCheckpointer(checkpoint.scenario, store=store, steps=checkpoint.steps)
+    return await _run_scenario(checkpoint.scenario, agent, checkpointer)
+
+
+# Allowed state transitions; ScenarioContext.enter rejects anything else
+FLOW_TRANSITIONS: Dict[Optional[str], Tuple[str, ...]] = {
+    None: ("REPORTED",),
+    "REPORTED": ("TRIAGED",),
+    "TRIAGED": ("SELF_HELP_PROPOSED", "ESCALATED"),
+    "SELF_HELP_PROPOSED": ("SELF_HELP_SUCCEEDED", "SELF_HELP_FAILED"),
+    "SELF_HELP_SUCCEEDED": ("CLOSED",),
+    "SELF_HELP_FAILED": ("ESCALATED",),
+    "ESCALATED": ("VENDOR_SELECTED", "CLOSED"),
+    "VENDOR_SELECTED": ("QUOTE_RECEIVED",),
+    "QUOTE_RECEIVED": ("QUOTE_APPROVED", "QUOTE_REJECTED"),
+    "QUOTE_REJECTED": ("CLOSED",),
+    "QUOTE_APPROVED": ("SCHEDULED",),
+    "SCHEDULED": ("WORK_DONE", "FAILED"),
+    "FAILED": ("CLOSED",),
+    "WORK_DONE": ("PAID", "CLOSED"),
+    "PAID": ("CLOSED",),
+}
+
+
+@dataclass
+class ScenarioContext(GraphContext):
+    """Per-scenario state threaded through the flow graph nodes."""
+    scenario: Dict[str, Any] = field(default_factory=dict)
+    agent: Any = None
+    checkpointer: Optional[ScenarioCheckpointer] = None
+    logs_rec: Optional[LogsRecorder] = None
+    adk_logs: Dict[str, Any] = field(default_factory=dict)
+    vendor_logs: Dict[str, Any] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+    dedupe_index: Optional[NearDuplicateIndex] = None
+    # Resolved with this ticket's triage step results for near-duplicates waiting on it
+    triage_shared: Optional["asyncio.Future"] = None
+    coalescer: Optional[VendorJobCoalescer] = None
+    vendor_job: Optional[VendorJob] = None
+    job_leader: bool = False
+    _ticket: Optional[TicketText] = field(default=None, repr=False)
+
+    @property
+    def job_follower(self) -> bool:
+        return self.vendor_job is not None and not self.job_leader
+
+    @property
+    def tenant_input(self) -> Dict[str, Any]:
+        return self.scenario["tenant_input"]
+
+    @property
+    def ticket(self) -> TicketText:
+        """Text features of the tenant input, shared by the dedupe, rules and KB steps."""
+        if self._ticket is None:
+            self._ticket = TicketText.from_input(self.tenant_input)
+        return self._ticket
+
+    @property
+    def prop(self) -> Dict[str, Any]:
+        return self.scenario["property"]
+
+    @property
+    def gt(self) -> Dict[str, Any]:
+        return self.scenario.get("ground_truth", {})
+
+    def on_state(self, state: str) -> None:
+        self.logs_rec.add_state(state)
 
-    logs_rec.add_state("REPORTED")
+    def tell(self, audience: str, message: str) -> None:
+        self.logs_rec.add_message(audience, message)
 
-    # 1) TRIAGE (Gemini via ADK) + rule-based hybrid
-    adk_logs: Dict[str, Any] = {}
+
+async def _report_node(ctx: ScenarioContext) -> None:
+    ctx.enter("REPORTED")
+
+
+# Step results a near-duplicate ticket reuses instead of re-running triage
+TRIAGE_STEP_NAMES = ("rules", "kb", "vendor_speculative", "llm_triage")
+
+
+async def _dedupe_node(ctx: ScenarioContext) -> Optional[str]:
+    """Attach to a live near-duplicate ticket's triage by seeding its step results."""
+    index = ctx.dedupe_index
+    if index is None or any(name in ctx.checkpointer.steps for name in TRIAGE_STEP_NAMES):
+        return None
+    loop = asyncio.get_running_loop()
+    shared = loop.create_future()
+    match = index.find_or_add(
+        ctx.scenario["scenario_id"],
+        ctx.prop.get("property_id", "UNKNOWN"),
+        ctx.prop.get("zip", "00000"),
+        ctx.ticket,
+        payload=shared,
+    )
+    if match is None:
+        ctx.triage_shared = shared
+        return None
+    triage_steps = match.payload
+    if isinstance(triage_steps, asyncio.Future):
+        if triage_steps.get_loop() is not loop:
+            return None
+        # The original ticket is still being triaged; wait for it rather than repeat it
+        triage_steps = await asyncio.shield(triage_steps)
+    if not triage_steps:
+        return None
+    ctx.checkpointer.steps.update(copy.deepcopy(triage_steps))
+    print(
+        f"[DEDUPE] {ctx.scenario['scenario_id']} attached to {match.ticket_id} "
+        f"(similarity {match.similarity:.2f}, {match.age_seconds:.1f}s old)"
+    )
+    return match.ticket_id
+
+
+def _share_triage(ctx: ScenarioContext) -> None:
+    if ctx.triage_shared is None or ctx.triage_shared.done():
+        return
+    triage_steps = {name: ctx.checkpointer.steps[name] for name in TRIAGE_STEP_NAMES if name in ctx.checkpointer.steps}
+    ctx.triage_shared.set_result(triage_steps)
+    ctx.dedupe_index.update_payload(ctx.scenario["scenario_id"], triage_steps)
+
+
+async def _rules_node(ctx: ScenarioContext) -> Dict[str, Any]:
+    return await ctx.checkpointer.step("rules", lambda: _run_blocking(triage_agent_call, ctx.tenant_input, ctx.prop, ctx.ticket))
+
+
+async def _kb_node(ctx: ScenarioContext) -> Optional[Dict[str, Any]]:
+    return await ctx.checkpointer.step("kb", lambda: _best_effort("KB lookup", _run_blocking(lookup_ticket_article, ctx.ticket)))
+
+
+async def _vendor_speculative_node(ctx: ScenarioContext) -> Optional[Dict[str, Any]]:
+    # Keyed on the rule issue_type so it overlaps with Gemini triage
+    rules = ctx.results["rules"]
+    return await ctx.checkpointer.step("vendor_speculative", lambda: _best_effort("vendor selection", _run_blocking(
+        select_best_vendor,
+        issue_type=rules.get("issue_type", "OTHER"),
+        property_zip=ctx.prop.get("zip", "00000"),
+        severity=rules.get("severity", "MEDIUM"),
+    )))
+
+
+async def _llm_triage_node(ctx: ScenarioContext) -> Dict[str, Any]:
     adk_request = {
-        "ticket_id": scenario["scenario_id"],
-        "property_id": prop.get("property_id", "UNKNOWN"),
-        "property_zip": prop.get("zip", "00000"),
-        "title": tenant_input.get("title", ""),
-        "description": tenant_input.get("description", ""),
-        "priority": tenant_input.get("priority_hint", "MEDIUM"),
+        "ticket_id": ctx.scenario["scenario_id"],
+        "property_id": ctx.prop.get("property_id", "UNKNOWN"),
+        "property_zip": ctx.prop.get("zip", "00000"),
+        "title": ctx.tenant_input.get("title", ""),
+        "description": ctx.tenant_input.get("description", ""),
+        "priority": ctx.tenant_input.get("priority_hint", "MEDIUM"),
     }
-    
-    # Initialize maintenance agent (includes vendor sub-agent)
-    agent = MaintenanceTriageAgent()
-    
-    gemini_triage = await agent.triage_issue(adk_request, adk_logs)
-    rules_triage = triage_agent_call(tenant_input, prop)
-    triage_label = gemini_triage.get("triage_label", "VENDOR_REQUIRED")
 
-    if triage_label == "SELF_HELP_OK":
-        propose_self_help_flag = True
-        must_escalate_immediately = False
-    elif triage_label == "EMERGENCY":
-        propose_self_help_flag = False
-        must_escalate_immediately = True
+    async def run_llm() -> Dict[str, Any]:
+        result = await ctx.agent.triage_issue(adk_request, ctx.adk_logs)
+        return {"result": result, "trace_id": ctx.adk_logs.get("adk_session_id")}
+
+    return await ctx.checkpointer.step("llm_triage", run_llm)
+
+
+def _needs_llm_triage(ctx: ScenarioContext) -> bool:
+    return not _is_rule_triage_decisive(ctx.results["rules"])
+
+
+async def _triage_node(ctx: ScenarioContext) -> Dict[str, Any]:
+    rules_triage = ctx.results["rules"]
+    llm = ctx.results.get("llm_triage")
+    if llm is None:
+        tier, trace_id = "rules", None
+        gemini_triage = _rule_tier_triage(rules_triage, ctx.results["vendor_speculative"])
     else:
-        propose_self_help_flag = False
-        must_escalate_immediately = True
+        tier, trace_id = "llm", llm["trace_id"]
+        gemini_triage = copy.deepcopy(llm["result"])
+    if "rules" not in ctx.checkpointer.reused:
+        triage_routing_stats[tier].calls += 1
+        triage_routing_stats[tier].seconds += time.perf_counter() - ctx.started
 
-    logs_rec.triage = {
+    triage_label = gemini_triage.get("triage_label", "VENDOR_REQUIRED")
+    propose_self_help = triage_label == "SELF_HELP_OK"
+    ctx.logs_rec.triage = {
         "issue_type": rules_triage.get("issue_type"),
         "severity": rules_triage.get("severity"),
-        "propose_self_help": propose_self_help_flag,
-        "must_escalate_immediately": must_escalate_immediately,
+        "propose_self_help": propose_self_help,
+        "must_escalate_immediately": not propose_self_help,
         "triage_label": triage_label,
         "explanation": gemini_triage.get("explanation"),
         "kb_article_id": gemini_triage.get("kb_article_id"),
         "kb_article_title": gemini_triage.get("kb_article_title"),
+        "triage_tier": tier,
+        "rule_confidence": rules_triage.get("confidence"),
+        "duplicate_of": ctx.results.get("dedupe"),
     }
-    logs_rec.trace_id = adk_logs.get("adk_session_id")
-    logs_rec.add_state("TRIAGED")
-    logs_rec.messages["tenant"].append(
-        f"We've received your request: '{tenant_input['title']}'. We are analyzing the issue."
-    )
+    _share_triage(ctx)
+    ctx.logs_rec.trace_id = trace_id
+    ctx.enter("TRIAGED")
+    ctx.tell("tenant", f"We've received your request: '{ctx.tenant_input['title']}'. We are analyzing the issue.")
+    return gemini_triage
 
-    # 2) SELF-HELP path (Gemini steps with fallback)
-    if propose_self_help_flag and not must_escalate_immediately:
-        logs_rec.add_state("SELF_HELP_PROPOSED")
-        gemini_steps = gemini_triage.get("self_help_steps") or []
-        if gemini_steps:
-            self_help_plan = {
-                "strategy": "gemini_v1",
-                "issue_type": rules_triage.get("issue_type"),
-                "steps": gemini_steps,
-                "kb_article_id": gemini_triage.get("kb_article_id"),
-                "kb_article_title": gemini_triage.get("kb_article_title"),
-                "explanation": gemini_triage.get("explanation"),
-            }
-        logs_rec.self_help = self_help_plan
-        logs_rec.messages["tenant"].append(
-            "Here are some safe steps you can try while we monitor the issue."
-        )
-        if gt.get("self_help_should_succeed", False):
-            logs_rec.add_state("SELF_HELP_SUCCEEDED")
-            logs_rec.messages["tenant"].append(
-                "Glad to hear the issue is resolved with those steps. We are closing the ticket."
-            )
-            logs_rec.add_state("CLOSED")
-            return logs_rec
-        else:
-            logs_rec.add_state("SELF_HELP_FAILED")
-            logs_rec.messages["tenant"].append(
-                "Looks like the steps did not fully resolve the issue. We will arrange a vendor visit."
-            )
-            logs_rec.add_state("ESCALATED")
-            
-            # Re-select vendor after self-help fails if not already selected
-            if not gemini_triage.get("vendor_selection") or gemini_triage.get("vendor_selection", {}).get("vendor_id") is None:
-                # Call vendor selection tool, calling through the agent is unnecessary at this stage
-                from src.tools.vendor_tools import select_best_vendor
-                vendor_choice = select_best_vendor(
-                    issue_type=rules_triage.get("issue_type", "APPLIANCE"),
-                    property_zip=prop.get("zip", "00000"),
-                    severity=rules_triage.get("severity", "MEDIUM")
-                )
-                gemini_triage["vendor_selection"] = vendor_choice
+
+async def _self_help_node(ctx: ScenarioContext) -> None:
+    gemini_triage = ctx.results["triage"]
+    issue_type = ctx.results["rules"].get("issue_type")
+    ctx.enter("SELF_HELP_PROPOSED")
+    gemini_steps = gemini_triage.get("self_help_steps") or []
+    if gemini_steps:
+        self_help_plan = {
+            "strategy": "gemini_v1",
+            "issue_type": issue_type,
+            "steps": gemini_steps,
+            "kb_article_id": gemini_triage.get("kb_article_id"),
+            "kb_article_title": gemini_triage.get("kb_article_title"),
+            "explanation": gemini_triage.get("explanation"),
+        }
     else:
-        # If not self-help, escalate immediately
-        logs_rec.add_state("ESCALATED")
+        # Fall back to the KB article fetched concurrently during triage
+        kb_result = ctx.results["kb"] or {}
+        self_help_plan = {
+            "strategy": "kb_v1",
+            "issue_type": issue_type,
+            "steps": kb_result.get("suggested_steps", []),
+            "kb_article_id": kb_result.get("article_id"),
+            "kb_article_title": kb_result.get("article_title"),
+            "explanation": gemini_triage.get("explanation"),
+        }
+    ctx.logs_rec.self_help = self_help_plan
+    ctx.tell("tenant", "Here are some safe steps you can try while we monitor the issue.")
+    if ctx.gt.get("self_help_should_succeed", False):
+        ctx.enter("SELF_HELP_SUCCEEDED")
+        ctx.tell("tenant", "Glad to hear the issue is resolved with those steps. We are closing the ticket.")
+        ctx.halt()
+    else:
+        ctx.enter("SELF_HELP_FAILED")
+        ctx.tell("tenant", "Looks like the steps did not fully resolve the issue. We will arrange a vendor visit.")
 
-    # 3) ESCALATION to vendor path
-    if gt.get("expected_vendor_service_type", None) is None:
-        logs_rec.messages["tenant"].append(
-            "The issue is minor and will be monitored. No vendor visit is required."
-        )
-        logs_rec.add_state("CLOSED")
-        return logs_rec
-
-    # 3a) Vendor selection
-    vendor_choice = gemini_triage.get("vendor_selection")
-    logs_rec.vendor_selection = vendor_choice
-    if not vendor_choice or vendor_choice.get("vendor_id") is None:
-        logs_rec.messages["landlord"].append(
-            "No suitable vendor found for this issue type and location."
-        )
-        logs_rec.add_state("CLOSED")
-        return logs_rec
-    logs_rec.add_state("VENDOR_SELECTED")
-    logs_rec.messages["landlord"].append(
-        f"Selected vendor {vendor_choice['vendor_name']} ({vendor_choice['vendor_id']}) "
-        f"for property {prop['property_id']} and issue '{tenant_input['title']}'.",
+
+async def _escalate_node(ctx: ScenarioContext) -> None:
+    ctx.enter("ESCALATED")
+    if ctx.gt.get("expected_vendor_service_type", None) is None:
+        ctx.tell("tenant", "The issue is minor and will be monitored. No vendor visit is required.")
+        ctx.halt()
+
+
+async def _coalesce_node(ctx: ScenarioContext) -> Optional[Dict[str, Any]]:
+    """Join an open vendor job for the same property and issue type, or open one as leader."""
+    if ctx.coalescer is None or "quote" in ctx.checkpointer.steps:
+        return None
+    scenario_id = ctx.scenario["scenario_id"]
+    job, ctx.job_leader = ctx.coalescer.join(
+        ctx.prop.get("property_id", "UNKNOWN"),
+        ctx.results["rules"].get("issue_type", "OTHER"),
+        scenario_id,
+        ctx.gt.get("max_budget"),
     )
-    logs_rec.messages["tenant"].append(
-        f"We have selected vendor {vendor_choice['vendor_name']} to handle your issue."
+    ctx.vendor_job = job
+    if ctx.job_leader:
+        return None
+    outcome = await asyncio.shield(job.outcome)
+    if outcome is None:
+        ctx.vendor_job = None
+        return None
+    for name in ("quote", "booking", "job_update"):
+        ctx.checkpointer.steps[name] = copy.deepcopy(outcome[name])
+    print(f"[COALESCE] {scenario_id} joined vendor job of {job.leader_id} ({len(job.members)} tickets)")
+    return outcome
+
+
+async def _vendor_select_node(ctx: ScenarioContext) -> Optional[Dict[str, Any]]:
+    # The shared job's vendor, else Gemini's tool call, else the speculative selection from triage
+    if ctx.results.get("coalesce"):
+        vendor_choice = ctx.results["coalesce"]["vendor_choice"]
+    else:
+        vendor_choice = ctx.results["triage"].get("vendor_selection")
+    if not _has_vendor(vendor_choice):
+        vendor_choice = ctx.results["vendor_speculative"]
+    ctx.logs_rec.vendor_selection = vendor_choice
+    if not _has_vendor(vendor_choice):
+        ctx.tell("landlord", "No suitable vendor found for this issue type and location.")
+        ctx.halt()
+        return vendor_choice
+    ctx.enter("VENDOR_SELECTED")
+    ctx.tell(
+        "landlord",
+        f"Selected vendor {vendor_choice['vendor_name']} ({vendor_choice['vendor_id']}) "
+        f"for property {ctx.prop['property_id']} and issue '{ctx.tenant_input['title']}'.",
     )
+    ctx.tell("tenant", f"We have selected vendor {vendor_choice['vendor_name']} to handle your issue.")
+    return vendor_choice
 
-    # 3b) Request quote via A2A (through maintenance agent's sub-agent)
-    vendor_logs: Dict[str, Any] = {}
-    quote = await agent.request_vendor_quote(
+
+async def _quote_node(ctx: ScenarioContext) -> Dict[str, Any]:
+    # Quote + first slots in one A2A round trip (through maintenance agent's sub-agent)
+    vendor_choice = ctx.results["vendor_select"]
+    quote_bundle = await ctx.checkpointer.step("quote", lambda: ctx.agent.request_vendor_quote_with_availability(
         service_type=vendor_choice.get("service_type", "HVAC"),
-        issue_description=tenant_input["description"],
-        property_zip=prop["zip"],
-        severity=gt.get("severity", "MEDIUM"),
-        logs=vendor_logs
-    )
-    logs_rec.quote = quote
-    logs_rec.vendor_logs = vendor_logs
-    logs_rec.add_state("QUOTE_RECEIVED")
-    
-    total_estimate = quote.get("estimate", {}).get("total_estimate", 0)
-    max_budget = gt.get("max_budget")
+        issue_description=ctx.tenant_input["description"],
+        property_zip=ctx.prop["zip"],
+        severity=ctx.gt.get("severity", "MEDIUM"),
+        logs=ctx.vendor_logs,
+        max_slots=VENDOR_QUOTE_SLOTS
+    ))
+    quote = quote_bundle.get("quote") or quote_bundle
+    ctx.logs_rec.quote = quote
+    ctx.logs_rec.vendor_logs = ctx.vendor_logs
+    ctx.enter("QUOTE_RECEIVED")
+    return {"quote": quote, "availability": quote_bundle.get("availability") or {}}
+
+
+async def _approve_node(ctx: ScenarioContext) -> None:
+    vendor_name = ctx.results["vendor_select"]["vendor_name"]
+    total_estimate = ctx.results["quote"]["quote"].get("estimate", {}).get("total_estimate", 0)
+    max_budget = ctx.gt.get("max_budget")
+    if ctx.job_follower:
+        # The leader's quote was approved against the leader's budget, not this ticket's
+        if not ctx.vendor_job.within_budget(ctx.scenario["scenario_id"], total_estimate):
+            ctx.tell(
+                "landlord",
+                f"Vendor job {ctx.vendor_job.leader_id} quote ${total_estimate:.2f} exceeds budget "
+                f"(max ${max_budget:.2f}) for {ctx.scenario['scenario_id']}. Quote rejected."
+            )
+            ctx.enter("QUOTE_REJECTED")
+            ctx.halt()
+            return
+        ctx.tell(
+            "landlord",
+            f"Joined vendor job {ctx.vendor_job.leader_id} already approved at ${total_estimate:.2f} "
+            f"with {vendor_name}."
+        )
+        ctx.enter("QUOTE_APPROVED")
+        return
     # If ground_truth is missing, randomly approve or reject quote
     if max_budget is None:
         approve_chance = 0.7 if total_estimate < 500 else 0.3
-        approved = random.random() < approve_chance
-        logs_rec.messages["landlord"].append(
-            f"Quote of ${total_estimate:.2f} from {vendor_choice['vendor_name']} " +
+
+        async def draw_approval() -> bool:
+            return random.random() < approve_chance
+
+        approved = await ctx.checkpointer.step("approval", draw_approval)
+        ctx.tell(
+            "landlord",
+            f"Quote of ${total_estimate:.2f} from {vendor_name} " +
             ("has been auto-approved for evaluation (no budget info)." if approved else "has been rejected (no budget info).")
         )
-        if approved:
-            logs_rec.add_state("QUOTE_APPROVED")
-        else:
-            logs_rec.add_state("QUOTE_REJECTED")
-            logs_rec.add_state("CLOSED")
-            return logs_rec
     else:
-        if total_estimate <= max_budget:
-            logs_rec.messages["landlord"].append(
-                f"Quote of ${total_estimate:.2f} from {vendor_choice['vendor_name']} is within budget "
+        approved = total_estimate <= max_budget
+        if approved:
+            ctx.tell(
+                "landlord",
+                f"Quote of ${total_estimate:.2f} from {vendor_name} is within budget "
                 f"(max ${max_budget:.2f}) and has been auto-approved for evaluation."
             )
-            logs_rec.add_state("QUOTE_APPROVED")
         else:
-            logs_rec.messages["landlord"].append(
-                f"Quote of ${total_estimate:.2f} from {vendor_choice['vendor_name']} exceeds budget "
+            ctx.tell(
+                "landlord",
+                f"Quote of ${total_estimate:.2f} from {vendor_name} exceeds budget "
                 f"(max ${max_budget:.2f}). It has been rejected."
             )
-            logs_rec.add_state("QUOTE_REJECTED")
-            logs_rec.add_state("CLOSED")
-            return logs_rec
+    if approved:
+        ctx.enter("QUOTE_APPROVED")
+    else:
+        ctx.enter("QUOTE_REJECTED")
+        ctx.halt()
+
+
+async def _schedule_node(ctx: ScenarioContext) -> Dict[str, Any]:
+    vendor_choice = ctx.results["vendor_select"]
+    quote = ctx.results["quote"]["quote"]
+    availability = ctx.results["quote"]["availability"]
+    # Availability is only re-fetched if the combined call returned no slots
+    if not availability.get("options"):
+        availability = await ctx.checkpointer.step("availability", lambda: ctx.agent.check_vendor_availability(
+            service_type=vendor_choice.get("service_type", "HVAC"),
+            quote_id=quote.get("quote_id", ""),
+            logs=ctx.vendor_logs
+        ))
 
-    # 3c) Availability + booking via A2A
-    availability = await agent.check_vendor_availability(
-        service_type=vendor_choice.get("service_type", "HVAC"),
-        quote_id=quote.get("quote_id", ""),
-        logs=vendor_logs
-    )
-    
     chosen_slot = availability.get("options", [{}])[0]
-    booking = await agent.book_vendor_slot(
+    booking = await ctx.checkpointer.step("booking", lambda: ctx.agent.book_vendor_slot(
         quote_id=quote.get("quote_id", ""),
         slot_id=chosen_slot.get("slot_id", ""),
         tenant_name="Test Tenant",
         tenant_phone="000-000-0000",
         special_instructions="",
-        logs=vendor_logs
-    )
-    logs_rec.booking = booking
-    logs_rec.add_state("SCHEDULED")
-    logs_rec.messages["tenant"].append(
+        logs=ctx.vendor_logs
+    ))
+    ctx.logs_rec.booking = booking
+    ctx.enter("SCHEDULED")
+    ctx.tell(
+        "tenant",
         f"Your appointment is scheduled on {chosen_slot.get('date', 'TBD')} "
         f"from {chosen_slot.get('from', 'TBD')} to {chosen_slot.get('to', 'TBD')}."
     )
+    ctx.logs_rec.vendor_logs = ctx.vendor_logs
+    return booking
+
 
-    logs_rec.vendor_logs = vendor_logs # Update vendor logs
+async def _work_node(ctx: ScenarioContext) -> Dict[str, Any]:
+    # Job status update via stub (for now)
+    quote = ctx.results["quote"]["quote"]
 
-    # 3d) Job status update via stub (for now)
-    job_update = vendor_a2a_job_status_update_stub(booking, scenario, quote)
-    job_update["final_amount"] = total_estimate
-    logs_rec.job_update = job_update
+    async def run_job_update() -> Dict[str, Any]:
+        update = vendor_a2a_job_status_update_stub(ctx.results["schedule"], ctx.scenario, quote)
+        update["final_amount"] = quote.get("estimate", {}).get("total_estimate", 0)
+        return update
+
+    job_update = await ctx.checkpointer.step("job_update", run_job_update)
+    ctx.logs_rec.job_update = job_update
     if job_update["status"] == "DONE":
-        logs_rec.add_state("WORK_DONE")
-        logs_rec.messages["tenant"].append(
-            "The vendor has marked the work as completed. Please confirm if everything looks good."
-        )
+        ctx.enter("WORK_DONE")
+        ctx.tell("tenant", "The vendor has marked the work as completed. Please confirm if everything looks good.")
     else:
-        logs_rec.add_state("FAILED")
-        logs_rec.messages["landlord"].append(
-            f"Vendor reported job status {job_update['status']} for {scenario['scenario_id']}."
-        )
-        logs_rec.add_state("CLOSED")
-        return logs_rec
+        ctx.enter("FAILED")
+        ctx.tell("landlord", f"Vendor reported job status {job_update['status']} for {ctx.scenario['scenario_id']}.")
+        ctx.halt()
+    return job_update
+
+
+async def _share_job_node(ctx: ScenarioContext) -> None:
+    """Leader publishes the finished vendor job to the tickets coalesced into it."""
+    if not ctx.job_leader:
+        return
+    outcome, total_estimate = None, None
+    if "work" in ctx.results:
+        outcome = {
+            "vendor_choice": ctx.results["vendor_select"],
+            "quote": ctx.checkpointer.steps["quote"],
+            "booking": ctx.results["schedule"],
+            "job_update": ctx.results["work"],
+        }
+        total_estimate = ctx.results["quote"]["quote"].get("estimate", {}).get("total_estimate", 0)
+    ctx.coalescer.publish(ctx.vendor_job, outcome, total_estimate)
+
+
+def _coalesced_payment(ctx: ScenarioContext, vendor_choice: Dict[str, Any]) -> Dict[str, Any]:
+    job = ctx.vendor_job
+    job_update = dict(ctx.results["work"])
+    share = job.share(float(job_update["final_amount"]), ctx.scenario["scenario_id"], ctx.coalescer.payment_mode)
+    if share > 0:
+        job_update["final_amount"] = share
+        pay_result = payment_agent(ctx.scenario, vendor_choice, ctx.results["quote"]["quote"], job_update)
+    else:
+        pay_result = {"paid": False, "reason": [f"job cost attributed to {job.leader_id}"]}
+    pay_result["vendor_job"] = {"leader": job.leader_id, "members": list(job.members), "share": share}
+    return pay_result
+
+
+async def _pay_node(ctx: ScenarioContext) -> Dict[str, Any]:
+    vendor_choice = ctx.results["vendor_select"]
+
+    async def run_payment() -> Dict[str, Any]:
+        if ctx.vendor_job is not None:
+            return _coalesced_payment(ctx, vendor_choice)
+        return payment_agent(ctx.scenario, vendor_choice, ctx.results["quote"]["quote"], ctx.results["work"])
 
-    # 4) PAYMENT via Payment Agent
-    pay_result = payment_agent(scenario, vendor_choice, quote, job_update)
-    logs_rec.payment = pay_result
+    pay_result = await ctx.checkpointer.step("payment", run_payment)
+    ctx.logs_rec.payment = pay_result
     if pay_result.get("paid", False):
-        logs_rec.add_state("PAID")
+        ctx.enter("PAID")
         amt = pay_result["payment"]["amount"]
-        logs_rec.messages["landlord"].append(
-            f"Payment of ${amt:.2f} has been processed to vendor {vendor_choice['vendor_name']}."
-        )
-        logs_rec.messages["tenant"].append(
-            "Payment to the vendor has been processed by your landlord. Thank you!"
-        )
+        ctx.tell("landlord", f"Payment of ${amt:.2f} has been processed to vendor {vendor_choice['vendor_name']}.")
+        ctx.tell("tenant", "Payment to the vendor has been processed by your landlord. Thank you!")
     else:
-        logs_rec.messages["landlord"].append(
-            f"Payment was NOT processed automatically due to: {pay_result.get('reason', [])}."
-        )
+        ctx.tell("landlord", f"Payment was NOT processed automatically due to: {pay_result.get('reason', [])}.")
+    return pay_result
+
+
+async def _close_node(ctx: ScenarioContext) -> None:
+    ctx.enter("CLOSED")
+
+
+@functools.lru_cache(maxsize=None)
+def build_flow_graph(triage_mode: str) -> StepGraph:
+    """
+    Maintenance flow as a step graph (built once per triage mode).
+
+    report first checks for a near-duplicate ticket whose triage can be
+    reused, then fans out to rules, KB lookup and Gemini triage; the speculative
+    vendor selection follows rules. They all join at `triage`, after which
+    the vendor path runs in sequence, optionally sharing one vendor job
+    with other tickets for the same property and issue type (`coalesce` /
+    `share_job`). Branches that end the incident early
+    halt the graph so only `close` still runs. In tiered mode Gemini triage
+    waits for rules and is skipped when the rule match is decisive.
+    """
+    if triage_mode == "tiered":
+        llm_triage = Step("llm_triage", _llm_triage_node, after=("rules",), when=_needs_llm_triage)
+    else:
+        llm_triage = Step("llm_triage", _llm_triage_node, after=("dedupe",))
+    return StepGraph(
+        [
+            Step("report", _report_node),
+            Step("dedupe", _dedupe_node, after=("report",)),
+            Step("rules", _rules_node, after=("dedupe",)),
+            Step("kb", _kb_node, after=("dedupe",)),
+            Step("vendor_speculative", _vendor_speculative_node, after=("rules",)),
+            llm_triage,
+            Step("triage", _triage_node, after=("rules", "kb", "vendor_speculative", "llm_triage")),
+            Step("self_help", _self_help_node, after=("triage",),
+                 when=lambda ctx: ctx.logs_rec.triage["propose_self_help"]),
+            Step("escalate", _escalate_node, after=("self_help",)),
+            Step("coalesce", _coalesce_node, after=("escalate",)),
+            Step("vendor_select", _vendor_select_node, after=("coalesce",)),
+            Step("quote", _quote_node, after=("vendor_select",)),
+            Step("approve", _approve_node, after=("quote",)),
+            Step("schedule", _schedule_node, after=("approve",)),
+            Step("work", _work_node, after=("schedule",)),
+            Step("share_job", _share_job_node, after=("work",), always=True),
+            Step("pay", _pay_node, after=("share_job",)),
+            Step("close", _close_node, after=("pay",), always=True),
+        ],
+        transitions=FLOW_TRANSITIONS,
+    )
+
+
+async def _run_scenario(
+    scenario: Dict[str, Any],
+    agent: Optional[MaintenanceTriageAgent],
+    checkpointer: ScenarioCheckpointer,
+    dedupe_index: Optional[NearDuplicateIndex] = None,
+    coalescer: Optional[VendorJobCoalescer] = None,
+) -> LogsRecorder:
+    # Borrow a warm agent (runner + session service) unless the caller supplied one
+    if agent is None:
+        with get_agent_pool().acquire() as pooled_agent:
+            return await _run_scenario(scenario, pooled_agent, checkpointer, dedupe_index, coalescer)
+
+    logs_rec = LogsRecorder(scenario_id=scenario["scenario_id"])
+    logs_rec._state_listener = checkpointer.on_state
+    ctx = ScenarioContext(
+        scenario=scenario,
+        agent=agent,
+        checkpointer=checkpointer,
+        logs_rec=logs_rec,
+        dedupe_index=dedupe_index,
+        coalescer=coalescer,
+    )
+    try:
+        await build_flow_graph(TRIAGE_MODE).run(ctx)
+    finally:
+        logs_rec.step_timings = dict(ctx.timings)
+        if ctx.triage_shared is not None and not ctx.triage_shared.done():
+            # Triage never finished: release waiting duplicates and stop matching this ticket
+            ctx.triage_shared.set_result(None)
+            ctx.dedupe_index.remove(scenario["scenario_id"])
+        if ctx.job_leader and not ctx.vendor_job.outcome.done():
+            # Followers fall back to their own vendor path
+            ctx.coalescer.publish(ctx.vendor_job, None)
+    return logs_rec
+
+
+# Upper bound on scenarios in flight for run_scenarios (override via .env)
+MAX_CONCURRENT_SCENARIOS = int(os.getenv("MAX_CONCURRENT_SCENARIOS", "8"))
+
+
+@dataclass
+class BatchSummary:
+    """Aggregate outcome of a run_scenarios batch, complete once iteration ends."""
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+    final_states: Dict[str, int] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def scenarios_per_second(self) -> float:
+        return self.total / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+async def _aiter_scenarios(
+    scenarios: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+) -> AsyncIterator[Dict[str, Any]]:
+    if hasattr(scenarios, "__aiter__"):
+        async for scenario in scenarios:
+            yield scenario
+    else:
+        for scenario in scenarios:
+            yield scenario
+
+
+class ScenarioBatch:
+    """
+    Async iterator that runs many scenarios on one event loop.
+
+    Scenarios are pulled lazily from the source, so at most `max_concurrency`
+    are in flight at any time. Results are yielded in completion order; a
+    scenario that raises is yielded as a LogsRecorder with `error` set instead
+    of aborting the batch. `summary` is final once iteration is exhausted.
+    """
+
+    def __init__(
+        self,
+        scenarios: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        max_concurrency: int = MAX_CONCURRENT_SCENARIOS,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.scenarios = scenarios
+        self.max_concurrency = max_concurrency
+        self.summary = BatchSummary()
+
+    def __aiter__(self) -> AsyncIterator[LogsRecorder]:
+        return self._run()
+
+    async def _run_one(self, scenario: Dict[str, Any]) -> LogsRecorder:
+        try:
+            return await run_scenario_through_agents(scenario)
+        except Exception as e:
+            print(f"⚠️  Scenario {scenario.get('scenario_id')} failed: {e!r}")
+            logs_rec = LogsRecorder(scenario_id=scenario.get("scenario_id"))
+            logs_rec.error = repr(e)
+            return logs_rec
+
+    def _record(self, logs_rec: LogsRecorder) -> None:
+        self.summary.total += 1
+        if logs_rec.error is not None:
+            self.summary.failed += 1
+            self.summary.errors[logs_rec.scenario_id] = logs_rec.error
+            return
+        self.summary.succeeded += 1
+        final_state = logs_rec.final_state.value if logs_rec.final_state else "NONE"
+        self.summary.final_states[final_state] = self.summary.final_states.get(final_state, 0) + 1
+
+    async def _run(self) -> AsyncIterator[LogsRecorder]:
+        started = time.perf_counter()
+        source = _aiter_scenarios(self.scenarios)
+        pending: set = set()
+        exhausted = False
+        try:
+            while True:
+                # Top up in-flight work from the (possibly unbounded) source
+                while not exhausted and len(pending) < self.max_concurrency:
+                    try:
+                        scenario = await anext(source)
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.create_task(self._run_one(scenario)))
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    logs_rec = task.result()
+                    self._record(logs_rec)
+                    self.summary.elapsed_seconds = time.perf_counter() - started
+                    yield logs_rec
+        finally:
+            for task in pending:
+                task.cancel()
+            self.summary.elapsed_seconds = time.perf_counter() - started
+
+
+def run_scenarios(
+    scenarios: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+    max_concurrency: int = MAX_CONCURRENT_SCENARIOS,
+) -> ScenarioBatch:
+    """
+    Run many scenarios concurrently through run_scenario_through_agents.
 
-    # 5) Close incident
-    logs_rec.add_state("CLOSED")
-    return logs_rec
\ No newline at end of file
+    Usage:
+        batch = run_scenarios(load_golden_incidents(), max_concurrency=4)
+        async for logs_rec in batch:
+            print(logs_rec.scenario_id, logs_rec.states[-1])
+        print(batch.summary)
+    """
+    return ScenarioBatch(scenarios, max_concurrency=max_concurrency)
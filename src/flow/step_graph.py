@@ -0,0 +1,143 @@
+"""Declarative step-graph executor for the maintenance flow."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+
+class InvalidTransitionError(RuntimeError):
+    """Raised when a step tries to move the flow into a state not allowed from the current one."""
+
+
+@dataclass
+class GraphContext:
+    """
+    Mutable state shared by the steps of one graph run.
+
+    Steps read each other's outputs from `results`, move the flow through
+    `enter(state)` (validated against the graph's transition table) and call
+    `halt()` to skip every remaining step that is not marked `always`.
+    """
+    results: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    state: Optional[str] = None
+    halted: bool = False
+    transitions: FrozenSet[Tuple[Optional[str], str]] = frozenset()
+
+    def enter(self, state: str) -> None:
+        if self.transitions and (self.state, state) not in self.transitions:
+            raise InvalidTransitionError(f"Invalid flow transition {self.state} -> {state}")
+        self.state = state
+        self.on_state(state)
+
+    def on_state(self, state: str) -> None:
+        """Hook for subclasses to record a state once it has been validated."""
+
+    def halt(self) -> None:
+        self.halted = True
+
+
+@dataclass(frozen=True)
+class Step:
+    """
+    A node in the flow graph.
+
+    Args:
+        name: Unique step name; its return value is stored in ctx.results[name].
+        run: Coroutine function taking the GraphContext.
+        after: Steps that must finish (or be skipped) before this one starts.
+        when: Optional guard evaluated once dependencies are done; False skips the step.
+        always: Run even after the flow has been halted (e.g. closing the incident).
+    """
+    name: str
+    run: Callable[[Any], Awaitable[Any]]
+    after: Tuple[str, ...] = ()
+    when: Optional[Callable[[Any], bool]] = None
+    always: bool = False
+
+
+def build_transition_table(transitions: Mapping[Optional[str], Iterable[str]]) -> FrozenSet[Tuple[Optional[str], str]]:
+    """Flatten {state: next_states} into a frozenset of allowed (from, to) pairs."""
+    return frozenset((src, dst) for src, dsts in transitions.items() for dst in dsts)
+
+
+class StepGraph:
+    """
+    Executes Steps as soon as their dependencies are done.
+
+    Independent steps run concurrently on the event loop, so adding a step
+    only adds latency when it is declared `after` a slow one. The topological
+    order and transition table are computed once at construction; each run
+    records per-step wall time in milliseconds in ctx.timings.
+    """
+
+    def __init__(
+        self,
+        steps: Iterable[Step],
+        transitions: Optional[Mapping[Optional[str], Iterable[str]]] = None,
+    ):
+        self.steps: Dict[str, Step] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Duplicate step name '{step.name}'")
+            self.steps[step.name] = step
+        for step in self.steps.values():
+            missing = [dep for dep in step.after if dep not in self.steps]
+            if missing:
+                raise ValueError(f"Step '{step.name}' depends on unknown steps {missing}")
+        self.order: List[str] = self._topological_order()
+        self.transitions = build_transition_table(transitions or {})
+
+    def _topological_order(self) -> List[str]:
+        remaining = {name: set(step.after) for name, step in self.steps.items()}
+        order: List[str] = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Cycle detected among steps {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    async def _run_step(self, step: Step, ctx: GraphContext) -> None:
+        started = time.perf_counter()
+        try:
+            ctx.results[step.name] = await step.run(ctx)
+        finally:
+            ctx.timings[step.name] = round((time.perf_counter() - started) * 1000, 3)
+
+    async def run(self, ctx: GraphContext) -> GraphContext:
+        ctx.transitions = self.transitions
+        done: Set[str] = set()
+        started: Set[str] = set()
+        running: Dict[asyncio.Task, str] = {}
+        try:
+            while len(done) < len(self.steps):
+                progressed = False
+                for name in self.order:
+                    step = self.steps[name]
+                    if name in started or not all(dep in done for dep in step.after):
+                        continue
+                    started.add(name)
+                    if (ctx.halted and not step.always) or (step.when is not None and not step.when(ctx)):
+                        ctx.skipped.append(name)
+                        done.add(name)
+                        progressed = True
+                        continue
+                    running[asyncio.create_task(self._run_step(step, ctx))] = name
+                if progressed:
+                    # Skipping may have unblocked later steps; rescan before waiting
+                    continue
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    done.add(running.pop(task))
+                    task.result()
+        finally:
+            for task in running:
+                task.cancel()
+        return ctx
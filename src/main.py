@@ -1,13 +1,144 @@
-"""Main entry point for the maintenance triage application."""
+"""Main entry point for the maintenance triage application.
 
+Usage:
+    python -m src.main                                    # run the built-in demo scenario
+    python -m src.main --input incidents.jsonl --output results.jsonl --max-concurrency 16
+    cat incidents.jsonl | python -m src.main --input - --output -
+    python -m src.main --input incidents.jsonl --output results.jsonl --resume
+"""
+
+import argparse
 import asyncio
+import contextlib
+import json
+import sys
+from typing import IO, AsyncIterator, Dict, Any, Iterable, Optional, Set
 from dotenv import load_dotenv
 load_dotenv()
 
-from src.flow.main_flow import run_scenario_through_agents
+from src.flow.main_flow import MAX_CONCURRENT_SCENARIOS, BatchSummary, run_scenario_through_agents, run_scenarios
+from src.utils.metrics import METRICS_SNAPSHOT_PATH, write_metrics_snapshot
+
+# Bytes of input read per executor hop when streaming
+READ_CHUNK_BYTES = 64 * 1024
+
+
+async def _read_incidents(
+    input_fp: IO[bytes],
+    offset: int = 0,
+    done_ids: Optional[Set[str]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Lazily parse incidents from a JSONL stream without blocking the event loop.
+
+    The first `offset` incidents and any scenario_id in `done_ids` are
+    skipped. Malformed lines are reported on stderr and skipped.
+    """
+    loop = asyncio.get_running_loop()
+    lineno = 0
+    index = 0
+    while True:
+        lines = await loop.run_in_executor(None, input_fp.readlines, READ_CHUNK_BYTES)
+        if not lines:
+            return
+        for line in lines:
+            lineno += 1
+            if not line.strip():
+                continue
+            index += 1
+            if index <= offset:
+                continue
+            try:
+                scenario = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠️  [STREAM] Skipping malformed line {lineno}: {e}", file=sys.stderr)
+                continue
+            scenario.setdefault("scenario_id", f"line-{lineno}")
+            if done_ids and scenario["scenario_id"] in done_ids:
+                continue
+            yield scenario
+
+
+def completed_scenario_ids(lines: Iterable[bytes]) -> Set[str]:
+    """Scenario ids that already have a successful result line in an output JSONL."""
+    done: Set[str] = set()
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            result = json.loads(line)
+        except json.JSONDecodeError:
+            # A partially written last line from an interrupted run
+            continue
+        if result.get("error") is None:
+            done.add(result["scenario_id"])
+        else:
+            done.discard(result["scenario_id"])
+    return done
+
+
+async def stream_incidents(
+    input_fp: IO[bytes],
+    output_fp: IO[bytes],
+    max_concurrency: int = MAX_CONCURRENT_SCENARIOS,
+    offset: int = 0,
+    done_ids: Optional[Set[str]] = None,
+) -> BatchSummary:
+    """
+    Push a JSONL stream of incidents through the flow.
 
+    At most `max_concurrency` incidents are in flight; each result is written
+    as one JSONL line (LogsRecorder.to_json_bytes) as soon as it finishes, so
+    output order is completion order.
+    """
+    batch = run_scenarios(_read_incidents(input_fp, offset, done_ids), max_concurrency=max_concurrency)
+    async for logs_rec in batch:
+        output_fp.write(logs_rec.to_json_bytes())
+        output_fp.write(b"\n")
+        output_fp.flush()
+    return batch.summary
 
-async def main():
+
+def _parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run maintenance incidents through the agent flow.")
+    parser.add_argument("--input", help="Incident JSONL file, or '-' for stdin. Omit to run the demo scenario.")
+    parser.add_argument("--output", default="-", help="Result JSONL file, or '-' for stdout (default).")
+    parser.add_argument("--max-concurrency", type=int, default=MAX_CONCURRENT_SCENARIOS,
+                        help=f"Incidents in flight at once (default {MAX_CONCURRENT_SCENARIOS}).")
+    parser.add_argument("--offset", type=int, default=0, help="Skip the first N incidents of the input.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Append to --output and skip incidents that already have a successful result there.")
+    parser.add_argument("--metrics-out", default=METRICS_SNAPSHOT_PATH or None,
+                        help="Write a metrics snapshot here when done (.prom = Prometheus text, else JSON).")
+    return parser.parse_args(argv)
+
+
+async def run_stream(args: argparse.Namespace) -> BatchSummary:
+    done_ids: Set[str] = set()
+    if args.resume and args.output != "-":
+        with contextlib.suppress(FileNotFoundError), open(args.output, "rb") as existing:
+            done_ids = completed_scenario_ids(existing)
+        print(f"[STREAM] Resuming; {len(done_ids)} incidents already completed", file=sys.stderr)
+
+    with contextlib.ExitStack() as stack:
+        input_fp = sys.stdin.buffer if args.input == "-" else stack.enter_context(open(args.input, "rb"))
+        if args.output == "-":
+            output_fp = sys.stdout.buffer
+            # Keep agent progress prints out of the result stream
+            stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        else:
+            output_fp = stack.enter_context(open(args.output, "ab" if args.resume else "wb"))
+        summary = await stream_incidents(input_fp, output_fp, args.max_concurrency, args.offset, done_ids)
+
+    print(
+        f"[STREAM] {summary.succeeded}/{summary.total} succeeded, {summary.failed} failed "
+        f"in {summary.elapsed_seconds:.1f}s ({summary.scenarios_per_second:.2f} incidents/s)",
+        file=sys.stderr,
+    )
+    return summary
+
+
+async def run_demo():
     scenario = {
         "scenario_id": "T001",
         "tenant_input": {
@@ -42,5 +173,18 @@ async def main():
         print(msg)
 
 
+async def main(argv: Optional[list] = None):
+    args = _parse_args(argv)
+    try:
+        if args.input is None:
+            await run_demo()
+        else:
+            await run_stream(args)
+    finally:
+        if args.metrics_out:
+            write_metrics_snapshot(args.metrics_out)
+            print(f"[METRICS] Snapshot written to {args.metrics_out}", file=sys.stderr)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""Typed response schemas matching the JSON contracts in system_prompts.py / vendor_prompts.py."""
+
+from typing import List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class VendorSelection(BaseModel):
+    vendor_id: Optional[str] = None
+    vendor_name: Optional[str] = None
+    service_type: Optional[str] = None
+    explanation: str = ""
+
+
+class TriageResult(BaseModel):
+    """Triage JSON contract of MAINTENANCE_TRIAGE_PROMPT (also the ADK output_schema)."""
+    triage_label: Literal["SELF_HELP_OK", "VENDOR_REQUIRED", "EMERGENCY"]
+    explanation: str
+    self_help_steps: List[str] = []
+    kb_article_id: Optional[str] = None
+    kb_article_title: Optional[str] = None
+    vendor_selection: Optional[VendorSelection] = None
+
+
+class VendorEstimate(BaseModel):
+    labor: float
+    parts: float
+    travel: float
+    total_estimate: float
+
+
+class VendorQuote(BaseModel):
+    quote_id: str
+    service_type: str
+    estimate: VendorEstimate
+    valid_until: str
+    conditions: List[str] = []
+    response_time: Optional[str] = None
+
+
+class VendorSlot(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    date: str
+    from_: str = Field(alias="from")
+    to: str
+    slot_id: str
+
+
+class VendorAvailability(BaseModel):
+    quote_id: str
+    service_type: str
+    options: List[VendorSlot]
+    booking_deadline: Optional[str] = None
+
+
+class VendorQuoteWithAvailability(BaseModel):
+    quote: VendorQuote
+    availability: VendorAvailability
+
+
+class VendorTechnician(BaseModel):
+    name: str
+    phone: str
+    rating: float
+
+
+class TenantContact(BaseModel):
+    name: str
+    phone: str
+
+
+class VendorBooking(BaseModel):
+    booking_id: str
+    quote_id: str
+    slot_id: str
+    status: str
+    technician: Optional[VendorTechnician] = None
+    tenant_contact: Optional[TenantContact] = None
+    special_instructions: str = ""
+    confirmation_code: Optional[str] = None
+    estimated_duration: Optional[str] = None
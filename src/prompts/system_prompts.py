@@ -33,6 +33,7 @@ You MUST follow this protocol:
 5. For vendor operations (after vendor selection):
    - Use the `vendor_service_agent` sub-agent for:
      * Requesting quotes: Pass service_type, issue_description, property_zip, severity
+     * Requesting a quote together with availability: Pass service_type, issue_description, property_zip, severity, max_slots
      * Checking availability: Pass service_type, quote_id
      * Booking appointments: Pass quote_id, slot_id, tenant_name, tenant_phone
    - The vendor_service_agent will handle all vendor communication via A2A protocol
@@ -127,6 +128,57 @@ Return JSON ONLY in this exact schema. Your output MUST be valid JSON and match
 """
 
 
+def format_vendor_quote_with_availability_request(
+    service_type: str,
+    issue_description: str,
+    property_zip: str,
+    severity: str,
+    max_slots: int = 3
+) -> str:
+    """Format a combined vendor quote + availability request (one vendor round trip)."""
+    return f"""
+Please request a quote AND the first available time slots from the vendor with these details:
+- Service type: {service_type}
+- Issue description: {issue_description}
+- Property ZIP: {property_zip}
+- Severity: {severity}
+- Max slots: {max_slots}
+
+Use the vendor_service_agent's request_quote_with_availability capability in a single request.
+
+Return JSON ONLY in this exact schema. Your output MUST be valid JSON and match this format exactly:
+
+{{
+  "quote": {{
+    "quote_id": "string",
+    "service_type": "string",
+    "estimate": {{
+      "labor": float,
+      "parts": float,
+      "travel": float,
+      "total_estimate": float
+    }},
+    "valid_until": "string",
+    "conditions": ["string"],
+    "response_time": "string"
+  }},
+  "availability": {{
+    "quote_id": "string",
+    "service_type": "string",
+    "options": [
+      {{
+        "date": "string",
+        "from": "string",
+        "to": "string",
+        "slot_id": "string"
+      }}
+    ],
+    "booking_deadline": "string"
+  }}
+}}
+"""
+
+
 def format_vendor_availability_request(
     service_type: str,
     quote_id: str
@@ -0,0 +1,255 @@
+"""File-backed troubleshooting KB: a JSONL corpus indexed into SQLite FTS5, reindexed when the file changes."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.tools.kb_tools import TOKENIZER_VERSION, tokenize
+
+# JSONL corpus, one article per line ({"id", "title", "keywords", "steps"}); empty = built-in kb_articles (read from .env)
+KB_CORPUS_PATH = os.getenv("KB_CORPUS_PATH", "")
+# SQLite file holding the FTS5 index; kept between runs so an unchanged corpus is never re-read
+KB_INDEX_DB = os.getenv("KB_INDEX_DB", "kb_index.db")
+# Minimum seconds between checks of the corpus file's mtime/size (0 = check on every lookup)
+KB_RELOAD_CHECK_SECONDS = float(os.getenv("KB_RELOAD_CHECK_SECONDS", "2"))
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS kb_articles (
+        doc_id INTEGER PRIMARY KEY,
+        article_id TEXT NOT NULL UNIQUE,
+        content_hash TEXT NOT NULL,
+        title TEXT NOT NULL,
+        keywords TEXT NOT NULL,
+        steps TEXT NOT NULL
+    )
+    """,
+    # Terms are pre-stemmed with kb_tools.tokenize so FTS and KbIndex agree on what matches
+    "CREATE VIRTUAL TABLE IF NOT EXISTS kb_fts USING fts5(terms, tokenize='unicode61')",
+    "CREATE TABLE IF NOT EXISTS kb_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+)
+
+
+def write_kb_jsonl(articles: Iterable[Dict[str, Any]], path: str) -> None:
+    """Write articles as a KB_CORPUS_PATH file (e.g. to seed it from the built-in list)."""
+    with open(path, "w", encoding="utf-8") as fp:
+        for art in articles:
+            fp.write(json.dumps(art, ensure_ascii=False) + "\n")
+
+
+def _read_corpus(path: str) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """Stream (article, content hash) pairs; malformed lines are reported and skipped."""
+    with open(path, "r", encoding="utf-8") as fp:
+        for line_no, line in enumerate(fp, start=1):
+            if not line.strip():
+                continue
+            try:
+                art = json.loads(line)
+                if not isinstance(art, dict) or not art.get("id") or not art.get("title"):
+                    raise ValueError("article needs 'id' and 'title'")
+            except ValueError as e:
+                print(f"⚠️ [KB_STORE] Skipping {path}:{line_no}: {e}")
+                continue
+            yield art, hashlib.sha1(line.strip().encode("utf-8")).hexdigest()
+
+
+class FtsKbStore:
+    """
+    Troubleshooting articles served from an SQLite FTS5 index of a JSONL file.
+
+    Nothing is read until the first lookup. The index lives in `db_path`
+    together with the corpus file's mtime and size; when those change, the
+    file is streamed once and only added, edited or removed articles are
+    rewritten. Lookups rank with FTS5's BM25 and fetch just the top hits, so
+    article bodies stay on disk.
+    """
+
+    def __init__(
+        self,
+        corpus_path: str,
+        db_path: str = KB_INDEX_DB,
+        reload_check_seconds: float = KB_RELOAD_CHECK_SECONDS,
+    ):
+        self.corpus_path = corpus_path
+        self.db_path = db_path
+        self.reload_check_seconds = reload_check_seconds
+        self.reindexes = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._next_check = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            if self.db_path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._conn = conn
+        return self._conn
+
+    def _meta(self, conn: sqlite3.Connection) -> Dict[str, str]:
+        return dict(conn.execute("SELECT key, value FROM kb_meta").fetchall())
+
+    def refresh(self, force: bool = False) -> Dict[str, int]:
+        """Reindex if the corpus file changed since the last build. Returns change counts."""
+        with self._lock:
+            return self._refresh(force)
+
+    def _refresh(self, force: bool) -> Dict[str, int]:
+        conn = self._connect()
+        self._next_check = time.monotonic() + self.reload_check_seconds
+        try:
+            st = os.stat(self.corpus_path)
+        except OSError as e:
+            # Keep serving the last good index if the file is briefly missing (e.g. mid-deploy)
+            print(f"⚠️ [KB_STORE] Corpus unavailable ({e}); keeping the current index.")
+            return {"added": 0, "updated": 0, "removed": 0}
+        signature = {
+            "source": os.path.abspath(self.corpus_path), "mtime_ns": str(st.st_mtime_ns), "size": str(st.st_size),
+            "tokenizer": TOKENIZER_VERSION,
+        }
+        meta = self._meta(conn)
+        if not force and all(meta.get(key) == value for key, value in signature.items()):
+            return {"added": 0, "updated": 0, "removed": 0}
+        started = time.perf_counter()
+        # Stored terms are only reusable if they came from this file and this tokenizer
+        same_source = all(meta.get(key) == signature[key] for key in ("source", "tokenizer"))
+        changes = self._reindex(conn, same_source=same_source, signature=signature)
+        self.reindexes += 1
+        print(
+            f"📚 [KB_STORE] Reindexed {self.corpus_path} in {(time.perf_counter() - started) * 1000:.0f} ms: "
+            f"{changes['added']} added, {changes['updated']} updated, {changes['removed']} removed"
+        )
+        return changes
+
+    def _reindex(self, conn: sqlite3.Connection, same_source: bool, signature: Dict[str, str]) -> Dict[str, int]:
+        changes = {"added": 0, "updated": 0, "removed": 0}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if not same_source:
+                conn.execute("DELETE FROM kb_articles")
+                conn.execute("DELETE FROM kb_fts")
+            # Only ids and hashes are held in memory, never article bodies
+            known = {
+                article_id: (doc_id, content_hash)
+                for doc_id, article_id, content_hash in conn.execute(
+                    "SELECT doc_id, article_id, content_hash FROM kb_articles"
+                )
+            }
+            seen = set()
+            for art, content_hash in _read_corpus(self.corpus_path):
+                article_id = str(art["id"])
+                if article_id in seen:
+                    print(f"⚠️ [KB_STORE] Duplicate article id '{article_id}'; keeping the first one.")
+                    continue
+                seen.add(article_id)
+                previous = known.get(article_id)
+                if previous is not None and previous[1] == content_hash:
+                    continue
+                keywords = list(art.get("keywords") or [])
+                row = (
+                    content_hash, art["title"],
+                    json.dumps(keywords, ensure_ascii=False), json.dumps(list(art.get("steps") or []), ensure_ascii=False),
+                )
+                terms = " ".join(tokenize(" ".join([art["title"], *keywords])))
+                if previous is None:
+                    doc_id = conn.execute(
+                        "INSERT INTO kb_articles (content_hash, title, keywords, steps, article_id) VALUES (?, ?, ?, ?, ?)",
+                        row + (article_id,),
+                    ).lastrowid
+                    changes["added"] += 1
+                else:
+                    doc_id = previous[0]
+                    conn.execute(
+                        "UPDATE kb_articles SET content_hash = ?, title = ?, keywords = ?, steps = ? WHERE doc_id = ?",
+                        row + (doc_id,),
+                    )
+                    conn.execute("DELETE FROM kb_fts WHERE rowid = ?", (doc_id,))
+                    changes["updated"] += 1
+                conn.execute("INSERT INTO kb_fts (rowid, terms) VALUES (?, ?)", (doc_id, terms))
+
+            for article_id, (doc_id, _) in known.items():
+                if article_id not in seen:
+                    conn.execute("DELETE FROM kb_articles WHERE doc_id = ?", (doc_id,))
+                    conn.execute("DELETE FROM kb_fts WHERE rowid = ?", (doc_id,))
+                    changes["removed"] += 1
+            conn.executemany("INSERT OR REPLACE INTO kb_meta (key, value) VALUES (?, ?)", signature.items())
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return changes
+
+    def search(self, text: str, top_k: int = 3) -> List[Tuple[Dict[str, Any], float]]:
+        """Best `top_k` (article, score) pairs, same shape as KbIndex.search; ties go to the article indexed first."""
+        return self.search_terms(tokenize(text), top_k)
+
+    def search_terms(self, terms: Iterable[str], top_k: int = 3) -> List[Tuple[Dict[str, Any], float]]:
+        """search() for text already tokenized (e.g. TicketText.kb_terms)."""
+        terms = sorted(set(terms))
+        with self._lock:
+            if self._conn is None or time.monotonic() >= self._next_check:
+                self._refresh(force=False)
+            if not terms:
+                return []
+            # Quoted terms are plain tokens to FTS5 (no operators / column filters from tenant text)
+            query = " OR ".join(f'"{term}"' for term in terms)
+            # Rank inside FTS5 first so only the top rows are joined to their article bodies
+            rows = self._conn.execute(
+                "SELECT a.article_id, a.title, a.keywords, a.steps, hits.score FROM ("
+                "  SELECT rowid AS doc_id, -bm25(kb_fts) AS score FROM kb_fts"
+                "  WHERE kb_fts MATCH ? ORDER BY bm25(kb_fts), rowid LIMIT ?"
+                ") AS hits JOIN kb_articles a USING (doc_id) ORDER BY hits.score DESC, a.doc_id",
+                (query, top_k),
+            ).fetchall()
+        return [
+            ({"id": article_id, "title": title, "keywords": json.loads(keywords), "steps": json.loads(steps)}, score)
+            for article_id, title, keywords, steps, score in rows
+        ]
+
+    def iter_articles(self) -> Iterator[Dict[str, Any]]:
+        """Ids, titles and keywords of every indexed article (no steps), for building other indexes."""
+        with self._lock:
+            if self._conn is None:
+                self._refresh(force=False)
+            rows = self._conn.execute("SELECT article_id, title, keywords FROM kb_articles ORDER BY doc_id").fetchall()
+        for article_id, title, keywords in rows:
+            yield {"id": article_id, "title": title, "keywords": json.loads(keywords)}
+
+    def signature(self) -> Dict[str, str]:
+        """Corpus path, mtime, size and tokenizer version of the current index."""
+        with self._lock:
+            if self._conn is None or time.monotonic() >= self._next_check:
+                self._refresh(force=False)
+            return self._meta(self._conn)
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._conn is None:
+                self._refresh(force=False)
+            return self._conn.execute("SELECT COUNT(*) FROM kb_articles").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_kb_store: Optional[FtsKbStore] = None
+_kb_store_lock = threading.Lock()
+
+
+def get_kb_store() -> Optional[FtsKbStore]:
+    """The process-wide file-backed KB, or None when KB_CORPUS_PATH is unset."""
+    global _kb_store
+    if _kb_store is None and KB_CORPUS_PATH:
+        with _kb_store_lock:
+            if _kb_store is None:
+                _kb_store = FtsKbStore(KB_CORPUS_PATH)
+    return _kb_store
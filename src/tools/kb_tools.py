@@ -1,6 +1,18 @@
 """Knowledge Base tools for maintenance troubleshooting."""
 
-from typing import List, Dict
+import functools
+import math
+import re
+import threading
+from typing import Any, List, Dict, Iterable, Optional, Sequence, Tuple
+import numpy as np
+from src.utils.metrics import instrument_tool
+from src.utils.ticket_text import TicketText
+
+try:  # Optional: sparse matrix product for batch lookups (NumPy postings expansion otherwise)
+    from scipy import sparse
+except ImportError:
+    sparse = None
 
 kb_articles = [
     {
@@ -49,37 +61,283 @@ kb_articles = [
 ]
 
 
-def _simple_kb_score(text: str, keywords: List[str]) -> int:
-    """Calculate simple keyword match score."""
-    text_l = text.lower()
-    return sum(1 for kw in keywords if kw in text_l)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "has", "have", "i", "in", "is",
+    "it", "its", "just", "my", "no", "not", "of", "on", "or", "so", "that", "the", "there", "this", "to",
+    "was", "with",
+))
+_UNDOUBLE_KEEP = frozenset("lsz")
 
 
-def lookup_troubleshooting_article(
-    title: str,
-    description: str,
-) -> Dict:
+# Bump when stem()/tokenize() output changes: persisted indexes (kb_store) rebuild on a new value
+TOKENIZER_VERSION = "2"
+
+
+@functools.lru_cache(maxsize=1 << 16)  # tenant text repeats the same few thousand words
+def stem(token: str) -> str:
     """
-    Looks up a troubleshooting article from the maintenance KB.
+    Light suffix stripper: leaking/leaks/leaked -> leak, tripped -> trip, batteries -> battery.
+
+    Plurals go first, then -ing/-ed, then a silent final e (as Porter steps
+    1a, 1b and 5 do), so base words and their inflections share a stem:
+    smoke/smoked/smoking -> smok, fuse/fuses -> fus, freeze/freezing -> freez.
+    """
+    if len(token) <= 3:
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith("es") and token[-3] in "sxz" or token.endswith(("ches", "shes")):
+        token = token[:-2]
+    elif token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        token = token[:-1]
+    if not token.endswith("eed"):  # speed, need stay whole
+        for suffix in ("ing", "ed"):
+            if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+                token = token[:-len(suffix)]
+                if token[-1] == token[-2] and token[-1] not in _UNDOUBLE_KEEP and token[-1] not in "aeiou":
+                    token = token[:-1]
+                break
+    if token.endswith("e") and len(token) > 3 and token[-2] != "e":
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [stem(token) for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+class KbIndex:
+    """
+    BM25 inverted index over article titles and keywords.
+
+    Built once; each posting stores its precomputed BM25 weight, so a lookup
+    only sums the postings of the query's distinct terms and its cost
+    depends on the query, not on the number of articles.
+    """
+
+    def __init__(self, articles: Iterable[Dict[str, Any]], k1: float = 1.2, b: float = 0.75):
+        self.articles: List[Dict[str, Any]] = list(articles)
+        docs = [tokenize(" ".join([art["title"], *art.get("keywords", [])])) for art in self.articles]
+        avg_len = (sum(len(doc) for doc in docs) / len(docs)) if docs else 0.0
+        term_freqs: Dict[str, Dict[int, int]] = {}
+        for doc_id, doc in enumerate(docs):
+            for term in doc:
+                counts = term_freqs.setdefault(term, {})
+                counts[doc_id] = counts.get(doc_id, 0) + 1
+        n_docs = len(docs)
+        # term -> (article ids, BM25 weights) as arrays
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, counts in term_freqs.items():
+            idf = math.log(1 + (n_docs - len(counts) + 0.5) / (len(counts) + 0.5))
+            doc_ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            tfs = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            lengths = np.fromiter((len(docs[doc_id]) for doc_id in counts), dtype=np.float64, count=len(counts))
+            weights = idf * tfs * (k1 + 1) / (tfs + k1 * (1 - b + b * lengths / avg_len))
+            self.postings[term] = (doc_ids, weights)
+
+    def search(self, text: str, top_k: int = 3) -> List[Tuple[Dict[str, Any], float]]:
+        """Best `top_k` (article, score) pairs; ties go to the article listed first."""
+        return self.search_terms(tokenize(text), top_k)
+
+    def search_terms(self, terms: Iterable[str], top_k: int = 3) -> List[Tuple[Dict[str, Any], float]]:
+        """search() for text already tokenized (e.g. TicketText.kb_terms)."""
+        hits = [self.postings[term] for term in set(terms) if term in self.postings]
+        if not hits:
+            return []
+        doc_ids = np.concatenate([ids for ids, _ in hits])
+        weights = np.concatenate([w for _, w in hits])
+        # Sum per article over the matched postings only
+        candidates, slots = np.unique(doc_ids, return_inverse=True)
+        scores = np.bincount(slots, weights=weights)
+        best = np.lexsort((candidates, -scores))[:top_k]
+        return [(self.articles[candidates[i]], float(scores[i])) for i in best]
+
+
+class KbTfidfMatrix:
+    """
+    L2-normalized TF-IDF article x term matrix for scoring many tickets at once.
+
+    Tickets become a sparse query matrix, so a batch is scored against the
+    whole KB with one sparse product (cosine similarity). Scores are
+    computed `max_score_cells` (tickets x articles) at a time to bound memory.
+    """
+
+    def __init__(self, articles: Iterable[Dict[str, Any]], max_score_cells: int = 1 << 22):
+        self.article_ids: List[str] = []
+        self.vocab: Dict[str, int] = {}
+        self.max_score_cells = max_score_cells
+        rows: List[Dict[int, int]] = []
+        for art in articles:
+            counts: Dict[int, int] = {}
+            for term in tokenize(" ".join([art["title"], *art.get("keywords", [])])):
+                term_id = self.vocab.setdefault(term, len(self.vocab))
+                counts[term_id] = counts.get(term_id, 0) + 1
+            self.article_ids.append(art["id"])
+            rows.append(counts)
+
+        n_docs = len(rows)
+        doc_freq = np.zeros(len(self.vocab), dtype=np.float64)
+        for counts in rows:
+            doc_freq[list(counts)] += 1
+        self.idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1  # smoothed, never zero
+
+        # Term-major postings: articles of term t are term_docs[term_ptr[t]:term_ptr[t + 1]]
+        by_term: List[List[Tuple[int, float]]] = [[] for _ in self.vocab]
+        for doc_id, counts in enumerate(rows):
+            weights = {term_id: tf * self.idf[term_id] for term_id, tf in counts.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term_id, weight in weights.items():
+                by_term[term_id].append((doc_id, weight / norm))
+        self.term_ptr = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        self.term_ptr[1:] = np.cumsum([len(postings) for postings in by_term])
+        self.term_docs = np.fromiter((d for postings in by_term for d, _ in postings), dtype=np.int64, count=self.term_ptr[-1])
+        self.term_weights = np.fromiter((w for postings in by_term for _, w in postings), dtype=np.float64, count=self.term_ptr[-1])
+        self._term_article = None
+        if sparse is not None:
+            self._term_article = sparse.csr_matrix(
+                (self.term_weights, self.term_docs, self.term_ptr), shape=(len(self.vocab), n_docs)
+            )
+
+    def _query_matrix(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """CSR arrays (indptr, term ids, weights) of the L2-normalized query vectors."""
+        vocab_get = self.vocab.get
+        row_ids: List[int] = []
+        term_ids: List[int] = []
+        for row, text in enumerate(texts):
+            known = [term_id for term_id in map(vocab_get, tokenize(text)) if term_id is not None]
+            term_ids.extend(known)
+            row_ids.extend([row] * len(known))
+        # (row, term) pairs sorted by row then term; counts are the term frequencies
+        cells, tfs = np.unique(
+            np.asarray(row_ids, dtype=np.int64) * len(self.vocab) + np.asarray(term_ids, dtype=np.int64),
+            return_counts=True,
+        )
+        rows, terms = np.divmod(cells, len(self.vocab))
+        weights = tfs * self.idf[terms]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=len(texts)))
+        weights /= norms[rows]
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(rows, minlength=len(texts)))
+        return indptr, terms, weights
+
+    def scores(self, texts: Sequence[str]) -> np.ndarray:
+        """Dense (len(texts), n_articles) cosine similarities."""
+        indptr, term_ids, weights = self._query_matrix(texts)
+        n_rows, n_docs = len(texts), len(self.article_ids)
+        if self._term_article is not None:
+            queries = sparse.csr_matrix((weights, term_ids, indptr), shape=(n_rows, len(self.vocab)))
+            return (queries @ self._term_article).toarray()
+        # Sparse x sparse by hand: expand each query term into its postings and sum per (ticket, article)
+        lengths = self.term_ptr[term_ids + 1] - self.term_ptr[term_ids]
+        rows = np.repeat(np.repeat(np.arange(n_rows), np.diff(indptr)), lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        postings = np.repeat(self.term_ptr[term_ids], lengths) + offsets
+        products = np.repeat(weights, lengths) * self.term_weights[postings]
+        flat = np.bincount(rows * n_docs + self.term_docs[postings], weights=products, minlength=n_rows * n_docs)
+        return flat.reshape(n_rows, n_docs)
+
+    def top_k(self, texts: Sequence[str], k: int = 3) -> List[List[Tuple[int, float]]]:
+        """Best k (article index, score) pairs per text, best first; zero scores are dropped."""
+        n_docs = len(self.article_ids)
+        k = min(k, n_docs)
+        if k <= 0:
+            return [[] for _ in texts]
+        chunk = max(1, self.max_score_cells // n_docs)
+        results: List[List[Tuple[int, float]]] = []
+        for start in range(0, len(texts), chunk):
+            scores = self.scores(texts[start:start + chunk])
+            rows = np.arange(len(scores))
+            # k argmax passes: best first, and argmax returns the earliest article on equal scores
+            best = np.empty((len(scores), k), dtype=np.int64)
+            best_scores = np.zeros((len(scores), k))
+            for rank in range(k):
+                best[:, rank] = scores.argmax(axis=1)
+                best_scores[:, rank] = scores[rows, best[:, rank]]
+                if not best_scores[:, rank].any():
+                    break
+                scores[rows, best[:, rank]] = -np.inf
+            for doc_ids, row_scores in zip(best.tolist(), best_scores.tolist()):
+                results.append([(doc_id, score) for doc_id, score in zip(doc_ids, row_scores) if score > 0])
+        return results
+
+
+_kb_index = KbIndex(kb_articles)
+_kb_tfidf: Optional[Tuple[Any, KbTfidfMatrix]] = None
+_kb_tfidf_lock = threading.Lock()
+
+
+def get_kb_index() -> KbIndex:
+    return _kb_index
+
+
+def get_kb_tfidf() -> KbTfidfMatrix:
+    """TF-IDF matrix of the active corpus (file-backed KB when KB_CORPUS_PATH is set), rebuilt after a reindex."""
+    global _kb_tfidf
+    from src.tools.kb_store import get_kb_store
+    store = get_kb_store()
+    if store is not None:
+        store.refresh()
+        version = (id(store), store.reindexes)
+    else:
+        version = None
+    with _kb_tfidf_lock:
+        if _kb_tfidf is None or _kb_tfidf[0] != version:
+            articles = store.iter_articles() if store is not None else _kb_index.articles
+            _kb_tfidf = (version, KbTfidfMatrix(articles))
+        return _kb_tfidf[1]
+
+
+def _search_kb(terms: List[str], top_k: int) -> List[Tuple[Dict[str, Any], float]]:
+    """The file-backed FTS5 KB when KB_CORPUS_PATH is set, else the built-in articles."""
+    from src.tools.kb_store import get_kb_store
+    store = get_kb_store()
+    if store is not None:
+        return store.search_terms(terms, top_k)
+    return _kb_index.search_terms(terms, top_k)
+
+
+def search_troubleshooting_articles(title: str, description: str, top_k: int = 3) -> List[Dict[str, Any]]:
+    """Top-k KB matches with their BM25 scores (best first)."""
+    return [
+        {"article_id": art["id"], "article_title": art["title"], "score": round(score, 4), "suggested_steps": art["steps"]}
+        for art, score in _search_kb(TicketText(title, description).kb_terms, top_k)
+    ]
+
+
+def lookup_troubleshooting_articles_batch(
+    titles: Sequence[str],
+    descriptions: Sequence[str],
+    k: int = 3,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Top-k KB matches for many tickets at once, for backfills and evaluations.
+
+    Scores every ticket against the KB by TF-IDF cosine similarity in a
+    few sparse matrix products instead of one lookup call per ticket.
 
     Args:
-      title: Short problem title from the tenant.
-      description: Longer free-text description.
+      titles: Ticket titles.
+      descriptions: Ticket descriptions, aligned with `titles`.
+      k: Matches to return per ticket.
 
     Returns:
-      dict with keys: article_id, article_title, suggested_steps (List[str]).
-      If no good match, returns an empty result with suggested_steps = [].
+      One list per ticket of {"article_id", "score"} dicts, best first;
+      empty when nothing in the KB matches.
     """
-    print(f"[KB_TOOL] lookup_troubleshooting_article called with title='{title}' description='{description}'")
-    full_text = f"{title}\n{description}".lower()
-    best = None
-    best_score = 0
-    
-    for art in kb_articles:
-        score = _simple_kb_score(full_text, art["keywords"])
-        if score > best_score:
-            best_score = score
-            best = art
+    if len(titles) != len(descriptions):
+        raise ValueError(f"Got {len(titles)} titles but {len(descriptions)} descriptions")
+    matrix = get_kb_tfidf()
+    texts = [f"{title}\n{description}" for title, description in zip(titles, descriptions)]
+    return [
+        [{"article_id": matrix.article_ids[doc_id], "score": round(score, 4)} for doc_id, score in matches]
+        for matches in matrix.top_k(texts, k)
+    ]
+
+
+def _best_article(ticket: TicketText) -> Dict:
+    matches = _search_kb(ticket.kb_terms, top_k=1)
+    best, best_score = matches[0] if matches else (None, 0.0)
 
     if not best or best_score == 0:
         print("[KB_TOOL] No matching article found.")
@@ -94,4 +352,31 @@ def lookup_troubleshooting_article(
         "article_id": best["id"],
         "article_title": best["title"],
         "suggested_steps": best["steps"],
-    }
\ No newline at end of file
+    }
+
+
+@instrument_tool
+def lookup_troubleshooting_article(
+    title: str,
+    description: str,
+) -> Dict:
+    """
+    Looks up a troubleshooting article from the maintenance KB.
+
+    Args:
+      title: Short problem title from the tenant.
+      description: Longer free-text description.
+
+    Returns:
+      dict with keys: article_id, article_title, suggested_steps (List[str]).
+      If no good match, returns an empty result with suggested_steps = [].
+    """
+    print(f"[KB_TOOL] lookup_troubleshooting_article called with title='{title}' description='{description}'")
+    return _best_article(TicketText(title, description))
+
+
+@instrument_tool
+def lookup_ticket_article(ticket: TicketText) -> Dict:
+    """lookup_troubleshooting_article for a ticket whose TicketText the flow already holds."""
+    print(f"[KB_TOOL] lookup_ticket_article called with title='{ticket.title}' description='{ticket.description}'")
+    return _best_article(ticket)
@@ -3,8 +3,24 @@
 from typing import Dict, Any
 from datetime import datetime, timedelta
 import random
+from src.utils.adk_backend import LLM_BACKEND
+from src.utils.metrics import instrument_tool
 
 
+def _rng(*call_args: Any):
+    """
+    Randomness for one tool call.
+
+    Under LLM_BACKEND=record/replay it is seeded by the call's arguments, so a
+    replayed flow gets the same quote ids, estimates and booking ids that were
+    recorded (these end up in later prompts). Otherwise the shared module RNG.
+    """
+    if LLM_BACKEND in ("record", "replay"):
+        return random.Random("|".join(map(str, call_args)))
+    return random
+
+
+@instrument_tool
 def request_quote(
     service_type: str,
     issue_description: str,
@@ -47,9 +63,10 @@ def request_quote(
     total = base * multiplier
     
     # Add some randomness
-    total = total + random.randint(-20, 50)
+    rng = _rng("quote", service_type, issue_description, property_zip, severity)
+    total = total + rng.randint(-20, 50)
     
-    quote_id = f"Q-{service_type[:4]}-{random.randint(1000, 9999)}"
+    quote_id = f"Q-{service_type[:4]}-{rng.randint(1000, 9999)}"
     valid_until = (datetime.now() + timedelta(days=7)).isoformat()
     
     return {
@@ -71,6 +88,7 @@ def request_quote(
     }
 
 
+@instrument_tool
 def get_availability(
     service_type: str,
     quote_id: str,
@@ -116,6 +134,51 @@ def get_availability(
     }
 
 
+@instrument_tool
+def request_quote_with_availability(
+    service_type: str,
+    issue_description: str,
+    property_zip: str,
+    severity: str = "MEDIUM",
+    max_slots: int = 3
+) -> Dict[str, Any]:
+    """
+    Generate a quote and return the first available time slots in one call.
+    
+    Combines request_quote and get_availability so escalated tickets need a
+    single vendor round trip before booking.
+    
+    Args:
+        service_type: Type of service (HVAC, PLUMBING, ELECTRICAL, etc.)
+        issue_description: Description of the maintenance issue
+        property_zip: Property ZIP code
+        severity: Severity level (LOW, MEDIUM, HIGH, CRITICAL)
+        max_slots: Maximum number of time slots to return (at most 5). 0 or less returns
+            the quote with no slots; fetch them later with get_availability.
+        
+    Returns:
+        dict with keys:
+            - quote: Quote information (same schema as request_quote)
+            - availability: Available time slots for the quote (same schema as get_availability)
+    """
+    print(f"[VENDOR_TOOL] request_quote_with_availability called: service_type='{service_type}', severity='{severity}', max_slots={max_slots}")
+    
+    quote = request_quote(
+        service_type=service_type,
+        issue_description=issue_description,
+        property_zip=property_zip,
+        severity=severity
+    )
+    availability = get_availability(service_type=service_type, quote_id=quote["quote_id"])
+    availability["options"] = availability["options"][:max(0, max_slots)]
+    
+    return {
+        "quote": quote,
+        "availability": availability
+    }
+
+
+@instrument_tool
 def book_slot(
     quote_id: str,
     slot_id: str,
@@ -138,7 +201,8 @@ def book_slot(
     """
     print(f"[VENDOR_TOOL] book_slot called: quote_id='{quote_id}', slot_id='{slot_id}'")
     
-    booking_id = f"BK-{random.randint(10000, 99999)}"
+    rng = _rng("booking", quote_id, slot_id, tenant_name, tenant_phone, special_instructions)
+    booking_id = f"BK-{rng.randint(10000, 99999)}"
     
     return {
         "booking_id": booking_id,
@@ -146,15 +210,15 @@ def book_slot(
         "slot_id": slot_id,
         "status": "CONFIRMED",
         "technician": {
-            "name": random.choice(["Mike Johnson", "Sarah Chen", "David Martinez", "Lisa Anderson"]),
+            "name": rng.choice(["Mike Johnson", "Sarah Chen", "David Martinez", "Lisa Anderson"]),
             "phone": "555-0100",
-            "rating": round(random.uniform(4.5, 5.0), 1)
+            "rating": round(rng.uniform(4.5, 5.0), 1)
         },
         "tenant_contact": {
             "name": tenant_name,
             "phone": tenant_phone
         },
         "special_instructions": special_instructions,
-        "confirmation_code": f"CONF-{random.randint(100000, 999999)}",
+        "confirmation_code": f"CONF-{rng.randint(100000, 999999)}",
         "estimated_duration": "2-4 hours"
     }
\ No newline at end of file
@@ -1,10 +1,90 @@
 """Vendor selection tools for maintenance escalation."""
 
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 from src.data.vendors import vendors_df
+from src.utils.metrics import instrument_tool
 
+# Map issue types to service types
+ISSUE_TO_SERVICE_TYPE = {
+    "ELECTRICAL": "ELECTRICIAN",
+    "APPLIANCE": "APPLIANCE_REPAIR",
+    "PLUMBING": "PLUMBER",
+    "GAS": "GAS_TECHNICIAN",
+    "HVAC": "HVAC",
+    "OTHER": None,
+}
 
+# Utility weights (rating, speed_score, price_band) per severity profile:
+# higher rating, faster speed, lower price is better; critical issues favour speed over price
+SEVERITY_WEIGHTS = {
+    "CRITICAL": (2.5, 2.0, 0.5),
+    "DEFAULT": (2.0, 1.5, 1.0),
+}
+
+
+def severity_profile(severity: str) -> str:
+    return "CRITICAL" if (severity or "").upper() == "CRITICAL" else "DEFAULT"
+
+
+class VendorRankingIndex:
+    """
+    Vendors pre-ranked per (service_type, severity profile), built once per vendor table.
+
+    Each ranking lists row positions by utility score, best first, with
+    ties in table order (what pandas' stable sort_values gives). A second
+    map holds the same rankings restricted to each vendor ZIP. Selection is
+    two dict lookups: the best same-ZIP vendor, otherwise the best overall.
+    """
+
+    def __init__(self, vendors: pd.DataFrame):
+        self.records: List[Dict[str, Any]] = vendors.to_dict("records")
+        self.zips: List[int] = vendors["zip"].astype(int).tolist()
+        self.rankings: Dict[Tuple[str, str], List[int]] = {}
+        self.scores: Dict[Tuple[str, str], List[float]] = {}
+        self.zip_rankings: Dict[Tuple[str, int, str], List[int]] = {}
+        for service_type, positions in vendors.groupby("service_type", sort=False).indices.items():
+            subset = vendors.iloc[positions]
+            for profile, (w_rating, w_speed, w_price) in SEVERITY_WEIGHTS.items():
+                # Same expression as the per-call pandas path, so scores are bit-identical
+                scores = (
+                    w_rating * subset["rating"] + w_speed * subset["speed_score"] - w_price * subset["price_band"]
+                ).to_numpy()
+                order = np.lexsort((positions, -scores))
+                ranked = positions[order].tolist()
+                self.rankings[(service_type, profile)] = ranked
+                self.scores[(service_type, profile)] = scores[order].tolist()
+                for position in ranked:
+                    self.zip_rankings.setdefault((service_type, self.zips[position], profile), []).append(position)
+
+    def ranked(self, service_type: str, property_zip: int, severity: str = "MEDIUM") -> Iterator[Tuple[Dict[str, Any], bool, float]]:
+        """(vendor record, zip_match, utility_score) for every candidate, in selection order."""
+        key = (service_type, severity_profile(severity))
+        candidates = list(zip(self.rankings.get(key, []), self.scores.get(key, [])))
+        for local in (True, False):
+            for position, score in candidates:
+                if (self.zips[position] == property_zip) is local:
+                    yield self.records[position], local, score
+
+    def best(self, service_type: str, property_zip: int, severity: str = "MEDIUM") -> Optional[Tuple[Dict[str, Any], bool]]:
+        """Top vendor and whether it is in the property's ZIP, or None when no vendor offers the service."""
+        profile = severity_profile(severity)
+        local = self.zip_rankings.get((service_type, property_zip, profile))
+        if local:
+            return self.records[local[0]], True
+        ranked = self.rankings.get((service_type, profile))
+        return (self.records[ranked[0]], False) if ranked else None
+
+
+_vendor_index = VendorRankingIndex(vendors_df)
+
+
+def get_vendor_index() -> VendorRankingIndex:
+    return _vendor_index
+
+
+@instrument_tool
 def select_best_vendor(
     issue_type: str,
     property_zip: str,
@@ -35,16 +115,6 @@ def select_best_vendor(
     """
     print(f"[VENDOR_TOOL] select_best_vendor called: issue_type='{issue_type}', property_zip='{property_zip}', severity='{severity}'")
     
-    # Map issue types to service types
-    ISSUE_TO_SERVICE_TYPE = {
-        "ELECTRICAL": "ELECTRICIAN",
-        "APPLIANCE": "APPLIANCE_REPAIR",
-        "PLUMBING": "PLUMBER",
-        "GAS": "GAS_TECHNICIAN",
-        "HVAC": "HVAC",
-        "OTHER": None,
-    }
-    
     service_type = ISSUE_TO_SERVICE_TYPE.get(issue_type.upper())
     
     if service_type is None:
@@ -59,10 +129,16 @@ def select_best_vendor(
             "explanation": f"No matching service type found for issue type '{issue_type}'."
         }
     
-    # Filter vendors by service type
-    candidates = vendors_df[vendors_df["service_type"] == service_type].copy()
+    # Convert property_zip to int for comparison
+    try:
+        prop_zip_int = int(property_zip)
+    except (ValueError, TypeError):
+        prop_zip_int = 0
+    
+    # Same-ZIP vendors first, then utility score (pre-ranked per service type and severity profile)
+    selection = _vendor_index.best(service_type, prop_zip_int, severity)
     
-    if candidates.empty:
+    if selection is None:
         print(f"[VENDOR_TOOL] No vendors found for service_type: {service_type}")
         return {
             "vendor_id": None,
@@ -74,41 +150,10 @@ def select_best_vendor(
             "explanation": f"No vendors available for {service_type} service."
         }
     
-    # Convert property_zip to int for comparison
-    try:
-        prop_zip_int = int(property_zip)
-    except (ValueError, TypeError):
-        prop_zip_int = 0
-    
-    # Prioritize vendors in the same ZIP code
-    candidates["zip_match"] = (candidates["zip"].astype(int) == prop_zip_int).astype(int)
-    
-    # Calculate utility score: higher rating, faster speed, lower price is better
-    # For critical issues, prioritize speed over price
-    if severity.upper() == "CRITICAL":
-        candidates["utility_score"] = (
-            2.5 * candidates["rating"] + 
-            2.0 * candidates["speed_score"] - 
-            0.5 * candidates["price_band"]
-        )
-    else:
-        candidates["utility_score"] = (
-            2.0 * candidates["rating"] + 
-            1.5 * candidates["speed_score"] - 
-            1.0 * candidates["price_band"]
-        )
-    
-    # Sort by ZIP match first, then utility score
-    candidates_sorted = candidates.sort_values(
-        by=["zip_match", "utility_score"], 
-        ascending=[False, False]
-    )
-    
-    # Select the best vendor
-    best = candidates_sorted.iloc[0]
+    best, zip_match = selection
     
     # Build explanation
-    zip_note = "in your area" if best["zip_match"] == 1 else f"near ZIP {property_zip}"
+    zip_note = "in your area" if zip_match else f"near ZIP {property_zip}"
     explanation = (
         f"Selected {best['name']} for {service_type} service {zip_note}. "
         f"They have a {best['rating']:.1f}/5.0 rating, "
@@ -0,0 +1,245 @@
+"""Pluggable LLM backend for the ADK agents: live Gemini, record to disk, or deterministic replay."""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import Field
+from .constants import MODEL_NAME
+from .metrics import InstrumentedGemini
+from .retry_config import retry_config
+
+# "gemini": live model; "record": live model + append request/response pairs; "replay": recorded answers only
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+LLM_RECORDINGS_PATH = os.getenv("LLM_RECORDINGS_PATH", "llm_recordings.jsonl")
+# Artificial delay per replayed model call (simulates model latency in load tests)
+LLM_REPLAY_LATENCY_MS = float(os.getenv("LLM_REPLAY_LATENCY_MS", "0"))
+# Also match on tool results; off by default because vendor tools return random quote/slot ids
+LLM_REPLAY_MATCH_TOOL_RESULTS = os.getenv("LLM_REPLAY_MATCH_TOOL_RESULTS", "false").lower() == "true"
+
+LLM_BACKENDS = ("gemini", "record", "replay")
+
+# Values the vendor tools derive from the clock or the random module (quote / booking /
+# confirmation ids, slot ids, dates, timestamps). They reach later prompts, so request keys
+# mask them and replayed answers get the current run's values back (see _mask_generated).
+_GENERATED_RE = re.compile(
+    r"\b(?:Q-[A-Z]{1,4}-\d{4}|BK-\d{5}|CONF-\d{6}|SLOT-\d{8}-(?:AM|PM)"
+    r"|\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}:\d{2}(?:\.\d+)?)?)\b"
+)
+
+
+class ReplayMissError(LookupError):
+    """Raised when the replay backend has no recording for a request."""
+
+
+def _normalize_part(part: types.Part, include_tool_results: bool) -> Dict[str, Any]:
+    if part.function_call is not None:
+        # Function-call ids are generated per run; name and args are what the model decided
+        return {"call": part.function_call.name, "args": part.function_call.args or {}}
+    if part.function_response is not None:
+        normalized = {"response": part.function_response.name}
+        if include_tool_results:
+            normalized["result"] = part.function_response.response
+        return normalized
+    if part.text is not None:
+        return {"text": part.text}
+    return {"other": part.model_dump(mode="json", exclude_none=True)}
+
+
+def _instruction_text(instruction: Any) -> str:
+    if instruction is None or isinstance(instruction, str):
+        return instruction or ""
+    if isinstance(instruction, types.Content):
+        return "".join(part.text or "" for part in instruction.parts or [])
+    return str(instruction)
+
+
+def _mask_generated(encoded: str) -> Tuple[str, List[str]]:
+    """Replace generated ids with <gen:N> (numbered by first appearance); also return the ids in that order."""
+    generated: Dict[str, str] = {}
+
+    def placeholder(match: "re.Match[str]") -> str:
+        return generated.setdefault(match.group(0), f"<gen:{len(generated)}>")
+
+    return _GENERATED_RE.sub(placeholder, encoded), list(generated)
+
+
+def request_key(llm_request: LlmRequest, include_tool_results: bool = LLM_REPLAY_MATCH_TOOL_RESULTS) -> str:
+    """
+    Stable hash of what determines a model answer.
+
+    Covers the model, system instruction, declared tool names and the
+    conversation contents. Function-call / function-response ids are
+    stripped (ADK generates them per run), generated quote / slot /
+    booking ids and dates are masked, and, unless asked for, tool results
+    are reduced to the tool name.
+    """
+    return _request_fingerprint(llm_request, include_tool_results)[0]
+
+
+def _request_fingerprint(
+    llm_request: LlmRequest, include_tool_results: bool = LLM_REPLAY_MATCH_TOOL_RESULTS
+) -> Tuple[str, List[str]]:
+    """(request_key, generated ids found in the request, in placeholder order)."""
+    config = llm_request.config
+    tool_names = sorted(
+        declaration.name
+        for tool in (config.tools or [])
+        for declaration in (getattr(tool, "function_declarations", None) or [])
+    )
+    payload = {
+        "model": llm_request.model,
+        "instruction": _instruction_text(config.system_instruction),
+        "tools": tool_names,
+        "schema": bool(config.response_schema),
+        "contents": [
+            {"role": content.role, "parts": [_normalize_part(part, include_tool_results) for part in content.parts or []]}
+            for content in llm_request.contents
+        ],
+    }
+    masked, generated = _mask_generated(json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str))
+    return hashlib.sha256(masked.encode("utf-8")).hexdigest(), generated
+
+
+def _rebind_generated(responses: List[Dict[str, Any]], recorded: List[str], current: List[str]) -> List[Dict[str, Any]]:
+    """Swap the recorded run's generated ids in `responses` for the current run's (same placeholder, same id)."""
+    mapping = {old: new for old, new in zip(recorded, current) if old != new}
+    if not mapping:
+        return responses
+    encoded = _GENERATED_RE.sub(lambda match: mapping.get(match.group(0), match.group(0)), json.dumps(responses))
+    return json.loads(encoded)
+
+
+def _strip_call_ids(response: Dict[str, Any]) -> Dict[str, Any]:
+    for part in (response.get("content") or {}).get("parts") or []:
+        for key in ("function_call", "function_response"):
+            if isinstance(part.get(key), dict):
+                part[key].pop("id", None)
+    return response
+
+
+class RecordingStore:
+    """
+    JSONL file of {"key", "model", "generated", "responses"} lines shared by every agent of the process.
+
+    The latest recording of a key wins on load, so re-recording a scenario
+    replaces its old answers without rewriting the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._recordings: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._recordings is None:
+            recordings: Dict[str, Dict[str, Any]] = {}
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as fp:
+                    for line in fp:
+                        if line.strip():
+                            record = json.loads(line)
+                            recordings[record["key"]] = record
+            self._recordings = recordings
+        return self._recordings
+
+    def get(self, key: str, generated: Optional[List[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """Recorded responses for `key`, with generated ids rebound to `generated` (this run's)."""
+        with self._lock:
+            record = self._load().get(key)
+        if record is None:
+            return None
+        return _rebind_generated(record["responses"], record.get("generated") or [], generated or [])
+
+    def put(self, key: str, model: str, responses: List[Dict[str, Any]], generated: Optional[List[str]] = None) -> None:
+        record = {"key": key, "model": model, "generated": generated or [], "responses": responses}
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._load()[key] = record
+            with open(self.path, "a", encoding="utf-8") as fp:
+                fp.write(line + "\n")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+
+_stores: Dict[str, RecordingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_recording_store(path: str = LLM_RECORDINGS_PATH) -> RecordingStore:
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = RecordingStore(path)
+        return store
+
+
+class RecordingLlm(BaseLlm):
+    """Delegates to a live model and appends every (request, responses) pair to the store."""
+
+    inner: BaseLlm
+    recordings_path: str = LLM_RECORDINGS_PATH
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        # Key first: the inner model adds headers / config to the request it is given
+        key, generated = _request_fingerprint(llm_request)
+        responses: List[Dict[str, Any]] = []
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            if not response.partial:
+                responses.append(_strip_call_ids(response.model_dump(mode="json", exclude_none=True)))
+            yield response
+        get_recording_store(self.recordings_path).put(key, self.model, responses, generated)
+
+
+class ReplayLlm(BaseLlm):
+    """
+    Serves recorded responses for matching requests, never calling a model.
+
+    Deterministic for a given recordings file; `latency_ms` is slept before
+    each answer so load tests can dial in model latency separately from
+    orchestration cost. Generated ids in a recorded answer (e.g. the
+    quote_id a booking call passes on) are replaced with the ids this run
+    generated in the same places of the request.
+    """
+
+    recordings_path: str = LLM_RECORDINGS_PATH
+    latency_ms: float = Field(default=LLM_REPLAY_LATENCY_MS, ge=0)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key, generated = _request_fingerprint(llm_request)
+        responses = get_recording_store(self.recordings_path).get(key, generated)
+        if responses is None:
+            raise ReplayMissError(
+                f"No recorded response for request {key[:12]} in {self.recordings_path}; "
+                f"record it first with LLM_BACKEND=record"
+            )
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000.0)
+        for response in responses:
+            yield LlmResponse.model_validate(response)
+
+
+def build_llm(model: str = MODEL_NAME, backend: Optional[str] = None) -> BaseLlm:
+    """The model object for an ADK agent, per LLM_BACKEND (or `backend`)."""
+    backend = (backend or LLM_BACKEND).lower()
+    if backend not in LLM_BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{backend}'; expected one of {LLM_BACKENDS}")
+    if backend == "replay":
+        return ReplayLlm(model=model)
+    gemini = InstrumentedGemini(model=model, retry_options=retry_config)
+    if backend == "record":
+        return RecordingLlm(model=model, inner=gemini)
+    return gemini
@@ -0,0 +1,246 @@
+"""In-process near-duplicate index for incoming tickets (MinHash + LSH buckets)."""
+
+import functools
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+if TYPE_CHECKING:
+    from src.utils.ticket_text import TicketText
+
+# Attach re-reported tickets to an earlier ticket's triage (read from .env)
+USE_INCIDENT_DEDUPE = os.getenv("USE_INCIDENT_DEDUPE", "false").lower() == "true"
+DEDUPE_WINDOW_SECONDS = float(os.getenv("DEDUPE_WINDOW_SECONDS", "1800"))
+DEDUPE_MIN_SIMILARITY = float(os.getenv("DEDUPE_MIN_SIMILARITY", "0.5"))
+
+# 16 bands x 4 rows: pairs with Jaccard ~0.5 collide in some band with high probability
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are at be but by for from has have i in is it its my of on or our so the "
+    "there this to was we were with".split()
+)
+
+
+@functools.lru_cache(maxsize=65536)
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shingles(text: str) -> Set[str]:
+    """Lowercased word tokens without stopwords."""
+    return {tok for tok in _TOKEN.findall((text or "").lower()) if tok not in _STOPWORDS}
+
+
+def shingle_hashes(tokens: Iterable[str]) -> List[int]:
+    return [_token_hash(tok) for tok in tokens]
+
+
+@dataclass
+class DuplicateMatch:
+    ticket_id: str
+    similarity: float
+    age_seconds: float
+    payload: Any
+
+
+@dataclass
+class DedupeStats:
+    lookups: int = 0
+    hits: int = 0
+    candidates_checked: int = 0
+    lookup_seconds: float = 0.0
+
+    @property
+    def avg_lookup_us(self) -> float:
+        return 1e6 * self.lookup_seconds / self.lookups if self.lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["avg_lookup_us"] = round(self.avg_lookup_us, 2)
+        return data
+
+
+@dataclass
+class _Entry:
+    ticket_id: str
+    scope: Tuple[str, str]
+    signature: Tuple[int, ...]
+    created_at: float
+    payload: Any
+
+
+class NearDuplicateIndex:
+    """
+    Finds earlier tickets with near-identical text at the same property/zip.
+
+    Each ticket's word set is reduced to a MinHash signature and split into
+    LSH bands; a lookup only compares against tickets sharing at least one
+    band bucket within the same (property_id, zip) scope, so cost does not
+    grow with the number of active tickets. Entries older than
+    `window_seconds` are evicted lazily on every call.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = DEDUPE_WINDOW_SECONDS,
+        min_similarity: float = DEDUPE_MIN_SIMILARITY,
+        num_perm: int = MINHASH_PERMUTATIONS,
+        bands: int = LSH_BANDS,
+        seed: int = 1,
+        clock: Callable[[], float] = time.time,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.window_seconds = window_seconds
+        self.min_similarity = min_similarity
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.clock = clock
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._order: Deque[str] = deque()
+        self._buckets: Dict[Tuple[Tuple[str, str], int, Tuple[int, ...]], Set[str]] = {}
+        self.stats = DedupeStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, text: Union[str, "TicketText"]) -> Tuple[int, ...]:
+        # A TicketText brings its shingle hashes already computed
+        hashes = shingle_hashes(shingles(text)) if isinstance(text, str) else text.shingle_hashes
+        if not hashes:
+            return tuple([_MERSENNE_PRIME] * self.num_perm)
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms)
+
+    def _bands(self, scope: Tuple[str, str], signature: Tuple[int, ...]):
+        rows = self.rows
+        for band in range(self.bands):
+            yield (scope, band, signature[band * rows:(band + 1) * rows])
+
+    def _similarity(self, a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+        return sum(x == y for x, y in zip(a, b)) / self.num_perm
+
+    def _evict_expired(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._order:
+            entry = self._entries.get(self._order[0])
+            if entry is not None and entry.created_at > cutoff:
+                break
+            self._order.popleft()
+            if entry is not None:
+                self._drop(entry)
+
+    def _drop(self, entry: _Entry) -> None:
+        del self._entries[entry.ticket_id]
+        for key in self._bands(entry.scope, entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry.ticket_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _find(self, scope: Tuple[str, str], signature: Tuple[int, ...], now: float) -> Optional[DuplicateMatch]:
+        candidates: Set[str] = set()
+        for key in self._bands(scope, signature):
+            candidates.update(self._buckets.get(key, ()))
+        self.stats.candidates_checked += len(candidates)
+        best: Optional[DuplicateMatch] = None
+        for ticket_id in candidates:
+            entry = self._entries[ticket_id]
+            similarity = self._similarity(signature, entry.signature)
+            if similarity < self.min_similarity:
+                continue
+            if best is None or (similarity, entry.created_at) > (best.similarity, now - best.age_seconds):
+                best = DuplicateMatch(ticket_id, similarity, now - entry.created_at, entry.payload)
+        return best
+
+    def find(self, property_id: str, zip_code: str, text: Union[str, "TicketText"]) -> Optional[DuplicateMatch]:
+        """Most similar live ticket at the same property/zip, or None."""
+        return self.find_or_add(None, property_id, zip_code, text)
+
+    def add(
+        self, ticket_id: str, property_id: str, zip_code: str, text: Union[str, "TicketText"], payload: Any = None
+    ) -> None:
+        signature = self.signature(text)
+        with self._lock:
+            self._add(ticket_id, (str(property_id), str(zip_code)), signature, payload, self.clock())
+
+    def _add(self, ticket_id: str, scope: Tuple[str, str], signature: Tuple[int, ...], payload: Any, now: float) -> None:
+        previous = self._entries.get(ticket_id)
+        if previous is not None:
+            self._drop(previous)
+        entry = _Entry(ticket_id, scope, signature, now, payload)
+        self._entries[ticket_id] = entry
+        self._order.append(ticket_id)
+        for key in self._bands(scope, signature):
+            self._buckets.setdefault(key, set()).add(ticket_id)
+
+    def find_or_add(
+        self,
+        ticket_id: Optional[str],
+        property_id: str,
+        zip_code: str,
+        text: Union[str, "TicketText"],
+        payload: Any = None,
+    ) -> Optional[DuplicateMatch]:
+        """
+        Return the best live duplicate; when there is none and `ticket_id` is
+        given, register this ticket (atomically) so later re-reports find it.
+        """
+        started = time.perf_counter()
+        signature = self.signature(text)
+        scope = (str(property_id), str(zip_code))
+        with self._lock:
+            now = self.clock()
+            self._evict_expired(now)
+            match = self._find(scope, signature, now)
+            if match is None and ticket_id is not None:
+                self._add(ticket_id, scope, signature, payload, now)
+            self.stats.lookups += 1
+            self.stats.hits += match is not None
+            self.stats.lookup_seconds += time.perf_counter() - started
+        return match
+
+    def update_payload(self, ticket_id: str, payload: Any) -> None:
+        with self._lock:
+            entry = self._entries.get(ticket_id)
+            if entry is not None:
+                entry.payload = payload
+
+    def remove(self, ticket_id: str) -> None:
+        with self._lock:
+            entry = self._entries.get(ticket_id)
+            if entry is not None:
+                self._drop(entry)
+
+    def active_ticket_ids(self) -> List[str]:
+        with self._lock:
+            self._evict_expired(self.clock())
+            return list(self._entries)
+
+
+_dedupe_index: Optional[NearDuplicateIndex] = None
+
+
+def get_dedupe_index() -> NearDuplicateIndex:
+    """Return the process-wide near-duplicate index."""
+    global _dedupe_index
+    if _dedupe_index is None:
+        _dedupe_index = NearDuplicateIndex()
+    return _dedupe_index
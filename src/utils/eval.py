@@ -6,6 +6,7 @@ from src.flow.main_flow import run_scenario_through_agents
 import pandas as pd
 
 from src.utils.stubs import vendor_utility_score
+from src.utils.text_matcher import get_matcher
 
 
 def score_triage(triage_log: Dict[str, Any], gt: Dict[str, Any]) -> int:
@@ -123,7 +124,7 @@ def score_self_help(self_help_log: Dict[str, Any], gt: Dict[str, Any]) -> int:
         "use a lighter near gas",
         "disassemble electrical panel",
     ]
-    is_safe = not any(phrase in text for phrase in dangerous_phrases)
+    is_safe = not get_matcher(dangerous_phrases, mode="inflected").search(text)
     if is_safe:
         score += 5
 
@@ -138,7 +139,8 @@ def score_self_help(self_help_log: Dict[str, Any], gt: Dict[str, Any]) -> int:
     }
     expected_keywords = issue_keywords_map.get(issue_type, [])
 
-    keyword_hits = sum(1 for kw in expected_keywords if kw in text)
+    # Word prefixes: "cool" counts "cooling", but "air" no longer counts "repair"
+    keyword_hits = get_matcher(expected_keywords, mode="prefix").count(text)
     if keyword_hits >= 2:
         score += 5
     elif keyword_hits == 1:
@@ -254,10 +256,7 @@ def score_communications(messages: Dict[str, List[str]], gt: Dict[str, Any]) ->
 
     # F1. Tenant communication (0–5)
     # Expect mention of either self-help, scheduling, or resolution.
-    tenant_hits = 0
-    for kw in ["steps", "schedule", "appointment", "resolved", "fixed", "vendor"]:
-        if kw in tenant_msgs:
-            tenant_hits += 1
+    tenant_hits = get_matcher(["steps", "schedule", "appointment", "resolved", "fixed", "vendor"], mode="prefix").count(tenant_msgs)
     if tenant_hits >= 3:
         score += 5
     elif tenant_hits >= 1:
@@ -265,10 +264,7 @@ def score_communications(messages: Dict[str, List[str]], gt: Dict[str, Any]) ->
 
     # F2. Landlord communication (0–5)
     # Expect mention of vendor, quote, and payment (for vendor scenarios).
-    landlord_hits = 0
-    for kw in ["vendor", "quote", "budget", "payment", "paid", "approved"]:
-        if kw in landlord_msgs:
-            landlord_hits += 1
+    landlord_hits = get_matcher(["vendor", "quote", "budget", "payment", "paid", "approved"], mode="prefix").count(landlord_msgs)
     if landlord_hits >= 3:
         score += 5
     elif landlord_hits >= 1:
@@ -0,0 +1,127 @@
+"""Bounded, lazily serialized capture of ADK events for run_session logs."""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, IO, Iterator, List, Optional
+
+# "none": count only; "summary": small per-event dicts; "full": keep event objects (read from .env)
+EVENT_CAPTURE_LEVEL = os.getenv("EVENT_CAPTURE_LEVEL", "summary").lower()
+# Events kept per session log; older ones are dropped (or spilled) first
+EVENT_CAPTURE_MAX_EVENTS = int(os.getenv("EVENT_CAPTURE_MAX_EVENTS", "256"))
+# Append-only JSONL receiving full events at the "full" level (unset = no spill)
+EVENT_SPILL_PATH = os.getenv("EVENT_SPILL_PATH", "")
+# Print every ADK event and model text part to stdout
+ADK_VERBOSE = os.getenv("ADK_VERBOSE", "true").lower() == "true"
+
+CAPTURE_LEVELS = ("none", "summary", "full")
+
+_spill_lock = threading.Lock()
+_spill_files: Dict[str, IO[str]] = {}
+
+
+def _spill_file(path: str) -> IO[str]:
+    fp = _spill_files.get(path)
+    if fp is None:
+        fp = _spill_files[path] = open(path, "a", encoding="utf-8")
+    return fp
+
+
+def summarize_event(event: Any) -> Dict[str, Any]:
+    """Author, role, tool names and text size of an event, without serializing its content."""
+    content = getattr(event, "content", None)
+    parts = (getattr(content, "parts", None) or []) if content is not None else []
+    summary: Dict[str, Any] = {
+        "type": event.__class__.__name__,
+        "author": getattr(event, "author", None),
+        "role": getattr(content, "role", None) if content is not None else None,
+        "timestamp": getattr(event, "timestamp", None),
+        "text_chars": sum(len(part.text) for part in parts if getattr(part, "text", None)),
+    }
+    calls = [part.function_call.name for part in parts if getattr(part, "function_call", None)]
+    responses = [part.function_response.name for part in parts if getattr(part, "function_response", None)]
+    if calls:
+        summary["function_calls"] = calls
+    if responses:
+        summary["function_responses"] = responses
+    return summary
+
+
+def serialize_event(event: Any) -> Dict[str, Any]:
+    if hasattr(event, "model_dump"):
+        return event.model_dump(mode="json", exclude_none=True)
+    return {"type": event.__class__.__name__, "repr": repr(event)}
+
+
+class EventCapture:
+    """
+    Per-session record of ADK events at a configurable level.
+
+    Events are kept in a ring buffer of `max_events`. At the "full" level the
+    buffer holds the event objects themselves and serializes them only in
+    `export()`; with a spill path, events evicted from the buffer (and the
+    rest on `flush()`) are appended to a JSONL file so nothing is lost.
+    """
+
+    def __init__(
+        self,
+        level: str = EVENT_CAPTURE_LEVEL,
+        max_events: int = EVENT_CAPTURE_MAX_EVENTS,
+        spill_path: Optional[str] = EVENT_SPILL_PATH,
+    ):
+        if level not in CAPTURE_LEVELS:
+            raise ValueError(f"Unknown event capture level '{level}'; expected one of {CAPTURE_LEVELS}")
+        self.level = level
+        self.spill_path = spill_path if level == "full" else None
+        self.count = 0
+        self.dropped = 0
+        self.spilled = 0
+        self._events: Deque[Any] = deque(maxlen=max_events)
+
+    def record(self, event: Any) -> None:
+        self.count += 1
+        if self.level == "none":
+            return
+        if len(self._events) == self._events.maxlen:
+            evicted = self._events[0]
+            if self.spill_path:
+                self._spill([evicted])
+            else:
+                self.dropped += 1
+        self._events.append(summarize_event(event) if self.level == "summary" else event)
+
+    def _spill(self, events: List[Any]) -> None:
+        lines = "".join(json.dumps(serialize_event(event), default=str) + "\n" for event in events)
+        with _spill_lock:
+            fp = _spill_file(self.spill_path)
+            fp.write(lines)
+            fp.flush()
+        self.spilled += len(events)
+
+    def flush(self) -> None:
+        """Spill the buffered events (full level with a spill path only)."""
+        if self.spill_path and self._events:
+            self._spill(list(self._events))
+            self._events.clear()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._events)
+
+    def export(self) -> List[Dict[str, Any]]:
+        """JSON-ready list of the buffered events."""
+        if self.level == "full":
+            return [serialize_event(event) for event in self._events]
+        return list(self._events)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "level": self.level,
+            "count": self.count,
+            "buffered": len(self._events),
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+        }
@@ -1,4 +1,11 @@
 import json
+from collections import Counter
+from typing import Any, Dict, Optional, Type
+from pydantic import BaseModel, ValidationError
+
+# Malformed LLM outputs per response kind (e.g. "TriageResult", "VendorQuote")
+PARSE_FAILURES: Counter = Counter()
+
 
 def extract_json_from_llm_output(text: str):
     """
@@ -12,4 +19,23 @@ def extract_json_from_llm_output(text: str):
         cleaned = cleaned[len("```"):].strip()
     if cleaned.endswith("```"):
         cleaned = cleaned[:-3].strip()
-    return json.loads(cleaned)
\ No newline at end of file
+    return json.loads(cleaned)
+
+
+def parse_llm_json(text: str, schema: Type[BaseModel], kind: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse LLM output and validate it against a response schema.
+
+    Failures are counted in PARSE_FAILURES under `kind` (defaults to the
+    schema name) and re-raised; both JSONDecodeError and pydantic's
+    ValidationError are ValueErrors.
+    """
+    try:
+        return schema.model_validate(extract_json_from_llm_output(text)).model_dump(by_alias=True)
+    except (json.JSONDecodeError, ValidationError):
+        PARSE_FAILURES[kind or schema.__name__] += 1
+        raise
+
+
+def parse_failure_counts() -> Dict[str, int]:
+    return dict(PARSE_FAILURES)
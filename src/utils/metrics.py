@@ -0,0 +1,309 @@
+"""In-process latency / token / retry histograms with JSON and Prometheus-text snapshots."""
+
+import bisect
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from google.adk.models.google_llm import Gemini
+from google.genai import Client, types
+from .constants import MODEL_NAME
+
+USE_METRICS = os.getenv("USE_METRICS", "true").lower() == "true"  # Read from .env
+# Written at the end of a CLI run; ".prom" = Prometheus text, anything else = JSON (unset = no file)
+METRICS_SNAPSHOT_PATH = os.getenv("METRICS_SNAPSHOT_PATH", "")
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+# Stage of the agent call in progress (set by instrument_agent_call, read by tools / hooks / run_session)
+_current_stage: ContextVar[str] = ContextVar("metrics_stage", default="unknown")
+
+
+def current_stage() -> str:
+    return _current_stage.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    token = _current_stage.set(name)
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative on export, like Prometheus)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate by linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return float(lower)  # beyond the last bound: report the bound
+                return lower + (self.buckets[i] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return float(self.buckets[-1])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    """Named, labelled histograms and counters shared by the whole process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, _Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, _Labels], float] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> Tuple[str, _Labels]:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS_MS, **labels: Any) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        return self._histograms.get(self._key(name, labels))
+
+    def counter(self, name: str, **labels: Any) -> float:
+        return self._counters.get(self._key(name, labels), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """JSON-ready view with p50/p90/p99 per histogram series."""
+        with self._lock:
+            histograms = [
+                {"name": name, "labels": dict(labels), **histogram.to_dict()}
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {"histograms": histograms, "counters": counters}
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (histograms + counters)."""
+        lines: List[str] = []
+        typed = set()
+        with self._lock:
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+                cumulative = 0
+                for bound, bucket_count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.3f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path: str) -> None:
+        """Write Prometheus text for *.prom paths, JSON otherwise."""
+        body = self.to_prometheus() if path.endswith(".prom") else json.dumps(self.snapshot(), indent=2)
+        with open(path, "w", encoding="utf-8") as fp:
+            fp.write(body)
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    labels = tuple(labels)
+    if not labels:
+        return ""
+    escaped = (f'{k}="{_escape_label(v)}"' for k, v in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    return _registry
+
+
+def instrument_agent_call(stage_name: str, model: str = MODEL_NAME) -> Callable:
+    """
+    Decorator for async agent methods: wall time into agent_call_ms{stage, model, status}.
+
+    The stage is visible to everything the call awaits (tools, HTTP hooks,
+    run_session token accounting) through a context variable.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if not USE_METRICS:
+                return await fn(*args, **kwargs)
+            status = "ok"
+            started = time.perf_counter()
+            with stage(stage_name):
+                try:
+                    return await fn(*args, **kwargs)
+                except BaseException:
+                    status = "error"
+                    raise
+                finally:
+                    _registry.observe(
+                        "agent_call_ms", (time.perf_counter() - started) * 1000,
+                        stage=stage_name, model=model, status=status,
+                    )
+        return wrapper
+    return decorator
+
+
+def instrument_tool(fn: Callable) -> Callable:
+    """
+    Decorator for agent tools: wall time into tool_call_ms{tool, stage}.
+
+    functools.wraps keeps the name, docstring and signature ADK builds the
+    function declaration from; sync tools stay sync.
+    """
+    def observe(started: float) -> None:
+        _registry.observe(
+            "tool_call_ms", (time.perf_counter() - started) * 1000,
+            tool=fn.__name__, stage=current_stage(),
+        )
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            if not USE_METRICS:
+                return await fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                observe(started)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not USE_METRICS:
+            return fn(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            observe(started)
+    return wrapper
+
+
+def record_usage(usage_metadata: Any, model: str = MODEL_NAME) -> None:
+    """Model tokens in/out of one response (ADK event / LlmResponse usage_metadata)."""
+    if not USE_METRICS or usage_metadata is None:
+        return
+    labels = {"stage": current_stage(), "model": model}
+    tokens_in = getattr(usage_metadata, "prompt_token_count", None) or 0
+    tokens_out = getattr(usage_metadata, "candidates_token_count", None) or 0
+    _registry.observe("model_tokens_in", tokens_in, buckets=TOKEN_BUCKETS, **labels)
+    _registry.observe("model_tokens_out", tokens_out, buckets=TOKEN_BUCKETS, **labels)
+    _registry.inc("model_tokens_total", tokens_in, direction="in", **labels)
+    _registry.inc("model_tokens_total", tokens_out, direction="out", **labels)
+
+
+def httpx_event_hooks(kind: str, retry_status_codes: Iterable[int] = ()) -> Dict[str, List[Callable]]:
+    """
+    httpx event hooks timing every request into {kind}_http_ms{stage, status}.
+
+    Responses with a status in `retry_status_codes` (the codes retry_config
+    retries on) are counted in {kind}_retries_total{stage}.
+    """
+    retry_status_codes = frozenset(retry_status_codes)
+
+    async def on_request(request) -> None:
+        request.extensions["metrics_started"] = time.perf_counter()
+
+    async def on_response(response) -> None:
+        if not USE_METRICS:
+            return
+        started = response.request.extensions.get("metrics_started")
+        labels = {"stage": current_stage()}
+        if started is not None:
+            _registry.observe(
+                f"{kind}_http_ms", (time.perf_counter() - started) * 1000,
+                status=response.status_code, **labels,
+            )
+        if response.status_code in retry_status_codes:
+            _registry.inc(f"{kind}_retries_total", **labels)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+class InstrumentedGemini(Gemini):
+    """Gemini whose HTTP client reports model_http_ms and model_retries_total (codes from retry_options)."""
+
+    @functools.cached_property
+    def api_client(self) -> Client:
+        retry_codes = (self.retry_options.http_status_codes or ()) if self.retry_options else ()
+        return Client(
+            http_options=types.HttpOptions(
+                headers=self._tracking_headers,
+                retry_options=self.retry_options,
+                async_client_args={"event_hooks": httpx_event_hooks("model", retry_codes)},
+            )
+        )
+
+
+def write_metrics_snapshot(path: Optional[str] = None) -> Optional[str]:
+    """Write the registry to `path` (defaults to METRICS_SNAPSHOT_PATH); returns the path written."""
+    path = path or METRICS_SNAPSHOT_PATH
+    if not path:
+        return None
+    _registry.write_snapshot(path)
+    return path
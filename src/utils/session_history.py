@@ -0,0 +1,41 @@
+"""History window applied to ADK model requests so context size stays bounded."""
+
+import os
+from typing import Any, List, Optional
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+# Most recent session contents sent to the model per call (read from .env; 0 disables)
+ADK_HISTORY_MAX_CONTENTS = int(os.getenv("ADK_HISTORY_MAX_CONTENTS", "24"))
+
+
+def _has_function_response(content: types.Content) -> bool:
+    return any(getattr(part, "function_response", None) for part in (content.parts or []))
+
+
+def _is_turn_start(content: types.Content) -> bool:
+    """A user message that is not a tool result, i.e. a safe place for history to begin."""
+    return content.role == "user" and not _has_function_response(content)
+
+
+def trim_history(contents: List[types.Content], max_contents: int = ADK_HISTORY_MAX_CONTENTS) -> List[types.Content]:
+    """
+    Keep at most `max_contents` trailing contents, starting at a user turn.
+
+    The cut never lands between a function_call and its function_response:
+    it moves forward to the next plain user message. When no such message
+    exists in the window the history is returned unchanged.
+    """
+    if max_contents <= 0 or len(contents) <= max_contents:
+        return contents
+    for start in range(len(contents) - max_contents, len(contents)):
+        if _is_turn_start(contents[start]):
+            return contents[start:]
+    return contents
+
+
+def history_window_callback(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[Any]:
+    """before_model_callback that trims llm_request.contents to the history window."""
+    llm_request.contents = trim_history(llm_request.contents)
+    return None
@@ -1,8 +1,13 @@
 """Session management utilities for ADK agents."""
-from typing import Dict, Any, Optional
+import time
+import uuid
+from typing import Dict, Any, Optional, Tuple
 from google.adk.runners import Runner
 from google.genai import types
 from .constants import USER_ID, MODEL_NAME
+from .event_capture import ADK_VERBOSE, EventCapture
+from .metrics import record_usage
+from .sqlite_sessions import TunedSqliteSessionService
 from google.adk.sessions import (
     InMemorySessionService,
     BaseSessionService,
@@ -14,9 +19,112 @@ from dotenv import load_dotenv
 # load_dotenv()  # Load environment variables from .env file. ALREADY CALLED IN MAIN
 
 USE_SHARED_SQLITE = os.getenv("USE_SHARED_SQLITE", "false").lower() == "true"  # Read from .env
+# WAL + pooled connections + group-committed events; false = ADK's DatabaseSessionService defaults
+SQLITE_SESSION_TUNED = os.getenv("SQLITE_SESSION_TUNED", "true").lower() == "true"
+# Idle seconds before a finished in-memory session is deleted (0 disables eviction)
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "900"))
+# Minimum seconds between eviction sweeps
+SESSION_EVICT_INTERVAL_SECONDS = float(os.getenv("SESSION_EVICT_INTERVAL_SECONDS", "60"))
+
+_SessionKey = Tuple[BaseSessionService, str, str, str]
+
+
+class SessionJanitor:
+    """
+    Tracks when each in-memory session was last used and deletes idle ones.
+
+    Sweeps run opportunistically from run_session (at most once per
+    `interval_seconds`), so a long-running process does not keep every
+    ticket's history forever. Sessions with a call in flight are never
+    evicted. Database-backed sessions are left alone: they are meant to
+    persist for `adk web`.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = SESSION_TTL_SECONDS,
+        interval_seconds: float = SESSION_EVICT_INTERVAL_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.interval_seconds = interval_seconds
+        self.clock = clock
+        self.evicted = 0
+        self._last_used: Dict[_SessionKey, float] = {}
+        self._in_flight: Dict[_SessionKey, int] = {}
+        self._last_sweep = clock()
+
+    def begin(self, session_service, app_name: str, user_id: str, session_id: str) -> Optional[_SessionKey]:
+        if self.ttl_seconds <= 0 or not isinstance(session_service, InMemorySessionService):
+            return None
+        key = (session_service, app_name, user_id, session_id)
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        self._last_used[key] = self.clock()
+        return key
+
+    def end(self, key: Optional[_SessionKey]) -> None:
+        if key is None:
+            return
+        remaining = self._in_flight.get(key, 1) - 1
+        if remaining > 0:
+            self._in_flight[key] = remaining
+        else:
+            self._in_flight.pop(key, None)
+        self._last_used[key] = self.clock()
+
+    async def evict_idle(self) -> int:
+        """Delete every idle session past the TTL; returns how many were deleted."""
+        now = self.clock()
+        self._last_sweep = now
+        expired = [
+            key for key, last_used in self._last_used.items()
+            if key not in self._in_flight and now - last_used >= self.ttl_seconds
+        ]
+        for key in expired:
+            session_service, app_name, user_id, session_id = key
+            del self._last_used[key]
+            await session_service.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        self.evicted += len(expired)
+        return len(expired)
+
+    async def maybe_evict(self) -> int:
+        if not self._last_used or self.clock() - self._last_sweep < self.interval_seconds:
+            return 0
+        return await self.evict_idle()
+
+    def stats(self) -> Dict[str, int]:
+        return {"tracked": len(self._last_used), "in_flight": len(self._in_flight), "evicted": self.evicted}
+
+
+_session_janitor: Optional[SessionJanitor] = None
+
+
+def get_session_janitor() -> SessionJanitor:
+    """Process-wide janitor shared by every run_session call."""
+    global _session_janitor
+    if _session_janitor is None:
+        _session_janitor = SessionJanitor()
+    return _session_janitor
+
+
+def ticket_session_id(logs: Dict[str, Any], prefix: str, ticket_id: Optional[str] = None) -> str:
+    """
+    Session id for one ticket's calls of a kind (e.g. "triage", "vendor").
+
+    Stored in `logs` under "<prefix>_session_id" so repeated calls for the
+    same ticket share a session while different tickets never do.
+    """
+    key = f"{prefix}_session_id"
+    session_id = logs.get(key)
+    if not session_id:
+        session_id = logs[key] = f"{prefix}-{ticket_id or 'ticket'}-{uuid.uuid4().hex[:8]}"
+    return session_id
+
 
 def build_session_service() -> BaseSessionService:
     if USE_SHARED_SQLITE:
+        if SQLITE_SESSION_TUNED:
+            return TunedSqliteSessionService()
         return DatabaseSessionService(db_url="sqlite+aiosqlite:///adk_sessions.db")
     else:
         return InMemorySessionService()
@@ -33,9 +141,12 @@ async def run_session(
     """
     if logs is None:
         logs = {}
-    print(f"\n ### Session: {session_name}")
+    if ADK_VERBOSE:
+        print(f"\n ### Session: {session_name}")
 
     app_name = runner_instance.app_name
+    model = getattr(runner_instance.agent, "model", MODEL_NAME)
+    model_name = model if isinstance(model, str) else getattr(model, "model", MODEL_NAME)
 
     # Create or get existing session
     try:
@@ -49,7 +160,8 @@ async def run_session(
     
     if logs is not None:
         logs["adk_session_id"] = session.id if session else None
-        print(f"Session ID: {logs['adk_session_id']}")
+        if ADK_VERBOSE:
+            print(f"Session ID: {logs['adk_session_id']}")
 
     if not user_queries:
         print("No queries!")
@@ -59,61 +171,64 @@ async def run_session(
         user_queries = [user_queries]
 
     full_response = ""
-    
-    # Ensure adk_events list exists
+    janitor = get_session_janitor()
+    janitor_key = janitor.begin(session_service, app_name, USER_ID, session.id)
+
+    # Bounded event capture (level / ring size / spill file configured via .env)
+    capture: Optional[EventCapture] = None
     if logs is not None:
-        logs.setdefault("adk_events", [])
+        logs["adk_final_response"] = ""
+        capture = logs.get("adk_events")
+        if not isinstance(capture, EventCapture):
+            capture = logs["adk_events"] = EventCapture()
 
-    for query in user_queries:
-        print(f"\nUser > {query}")
+    try:
+        for query in user_queries:
+            if ADK_VERBOSE:
+                print(f"\nUser > {query}")
 
-        content_msg = types.Content(
-            role="user",
-            parts=[types.Part(text=query)]
-        )
+            content_msg = types.Content(
+                role="user",
+                parts=[types.Part(text=query)]
+            )
+
+            # Stream ADK events - they are automatically stored in the session by the runner
+            async for event in runner_instance.run_async(
+                user_id=USER_ID,
+                session_id=session.id,
+                new_message=content_msg,
+            ):
+                if ADK_VERBOSE:
+                    event_type = event.__class__.__name__
+                    event_role = getattr(event.content, 'role', 'unknown') if hasattr(event, 'content') and event.content else 'no-content'
+                    print(f"[EVENT] type={event_type}, role={event_role}")
+
+                # Tokens in/out per model response, labelled with the calling stage
+                if getattr(event, "usage_metadata", None) is not None:
+                    record_usage(event.usage_metadata, model=model_name)
+
+                # Keep a reference (or summary); serialization happens only on export
+                if capture is not None:
+                    capture.record(event)
+
+                # Text of the final answer alone (full_response also holds intermediate turns)
+                if logs is not None and event.is_final_response() and event.content and event.content.parts:
+                    final_text = "".join(part.text for part in event.content.parts if part.text)
+                    if final_text:
+                        logs["adk_final_response"] = final_text
+
+                # Accumulate text response from model events
+                if hasattr(event, 'content') and event.content:
+                    if hasattr(event.content, 'parts') and event.content.parts:
+                        for part in event.content.parts:
+                            if hasattr(part, 'text') and part.text:
+                                text = part.text
+                                if text and text != "None":
+                                    if ADK_VERBOSE:
+                                        print(f"{MODEL_NAME} > {text}")
+                                    full_response += text + "\n"
+    finally:
+        janitor.end(janitor_key)
+        await janitor.maybe_evict()
 
-        # Stream ADK events - they are automatically stored in the session by the runner
-        async for event in runner_instance.run_async(
-            user_id=USER_ID,
-            session_id=session.id,
-            new_message=content_msg,
-        ):
-            # Log event details for debugging
-            event_type = event.__class__.__name__
-            event_role = getattr(event.content, 'role', 'unknown') if hasattr(event, 'content') and event.content else 'no-content'
-            print(f"[EVENT] type={event_type}, role={event_role}")
-            
-            # Store event metadata in logs
-            if logs is not None:
-                event_dict = {}
-                try:
-                    # Try to capture as much metadata as possible
-                    if hasattr(event, 'to_dict'):
-                        event_dict = event.to_dict()
-                    else:
-                        event_dict = {
-                            'type': event_type,
-                            'content': str(event.content) if hasattr(event, 'content') else None,
-                            'metadata': getattr(event, 'metadata', {}),
-                            'timestamp': getattr(event, 'timestamp', None),
-                        }
-                        # Add role if available
-                        if hasattr(event, 'content') and event.content:
-                            event_dict['role'] = getattr(event.content, 'role', None)
-                except Exception as e:
-                    print(f"[WARNING] Could not serialize event: {e}")
-                    event_dict = {"repr": repr(event), "type": event_type}
-                
-                logs["adk_events"].append(event_dict)
-
-            # Accumulate text response from model events
-            if hasattr(event, 'content') and event.content:
-                if hasattr(event.content, 'parts') and event.content.parts:
-                    for part in event.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            text = part.text
-                            if text and text != "None":
-                                print(f"{MODEL_NAME} > {text}")
-                                full_response += text + "\n"
-
-    return full_response.strip()
\ No newline at end of file
+    return full_response.strip()
@@ -0,0 +1,227 @@
+"""Tuned SQLite backend for ADK sessions: WAL, pooled connections, group-committed events."""
+
+import asyncio
+import hashlib
+import inspect
+import os
+from typing import List, Optional, Tuple
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, DatabaseSessionService, Session, _session_util
+from google.adk.sessions.database_session_service import (
+    StorageAppState,
+    StorageEvent,
+    StorageSession,
+    StorageUserState,
+)
+from sqlalchemy import event as sa_event, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# SQLite file shared with `adk web` (read from .env)
+SQLITE_SESSION_DB = os.getenv("SQLITE_SESSION_DB", "adk_sessions.db")
+# Pooled connections (readers run in parallel under WAL; writes go through one batch writer)
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+# Upper bound of events committed in one transaction
+SQLITE_BATCH_MAX_EVENTS = int(os.getenv("SQLITE_BATCH_MAX_EVENTS", "64"))
+# How long the writer waits for more events before committing a batch (only under concurrency)
+SQLITE_BATCH_WINDOW_MS = float(os.getenv("SQLITE_BATCH_WINDOW_MS", "2"))
+
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA foreign_keys=ON",
+)
+
+# get_session() filters events by (app, user, session) and orders by timestamp;
+# the events primary key starts with the event id so it cannot serve that query.
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_events_session_time ON events (app_name, user_id, session_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS ix_sessions_app_user_update ON sessions (app_name, user_id, update_time)",
+)
+
+_Pending = Tuple[Session, Event, asyncio.Future]
+
+# append_event/_commit_batch re-implement DatabaseSessionService.append_event from this ADK
+# release on top of its private storage classes. sha1 prefixes of the upstream sources they
+# mirror; tests/test_sqlite_sessions.py fails when an ADK upgrade changes any of them.
+ADK_MIRRORED_VERSION = "1.19.0"
+ADK_MIRRORED_SOURCES = {
+    "DatabaseSessionService.append_event": "f7bc5f6f66ce",
+    "DatabaseSessionService._ensure_tables_created": "bfde210cdf10",
+    "BaseSessionService.append_event": "ee3dfc55c6ad",
+    "BaseSessionService._trim_temp_delta_state": "9b22f21497be",
+    "StorageEvent": "c4ca3f0be3d0",
+    "StorageSession": "b822f57ee75d",
+    "StorageAppState": "f7d76478e621",
+    "StorageUserState": "9acf6e3b16ae",
+    "extract_state_delta": "d6e0025968d7",
+}
+
+
+def adk_source_fingerprints() -> dict:
+    """sha1 prefixes of the installed ADK sources listed in ADK_MIRRORED_SOURCES."""
+    sources = (
+        DatabaseSessionService.append_event, DatabaseSessionService._ensure_tables_created,
+        BaseSessionService.append_event, BaseSessionService._trim_temp_delta_state,
+        StorageEvent, StorageSession, StorageAppState, StorageUserState, _session_util.extract_state_delta,
+    )
+    return {obj.__qualname__: hashlib.sha1(inspect.getsource(obj).encode()).hexdigest()[:12] for obj in sources}
+
+
+def _apply_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in _PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+class TunedSqliteSessionService(DatabaseSessionService):
+    """
+    DatabaseSessionService on SQLite, tuned for many concurrent flows.
+
+    Same schema as ADK's service (so `adk web` can read the file), plus:
+
+    - WAL journal with synchronous=NORMAL on every pooled connection, so
+      readers never block the writer and commits skip the full fsync;
+    - an index on events by (app, user, session, timestamp) for get_session;
+    - append_event() calls are queued to a single writer task that commits
+      up to `batch_max_events` events per transaction (group commit).
+      Each caller still waits for its own commit, so an appended event is
+      durable when the call returns, exactly as before.
+
+    The append path mirrors DatabaseSessionService.append_event of google-adk
+    1.19.0 (ADK_MIRRORED_VERSION), including its private Storage* tables and
+    stale-session check; re-check it against upstream when upgrading ADK.
+    """
+
+    def __init__(
+        self,
+        db_path: str = SQLITE_SESSION_DB,
+        pool_size: int = SQLITE_POOL_SIZE,
+        batch_max_events: int = SQLITE_BATCH_MAX_EVENTS,
+        batch_window_ms: float = SQLITE_BATCH_WINDOW_MS,
+    ):
+        super().__init__(
+            db_url=f"sqlite+aiosqlite:///{db_path}",
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=pool_size,
+            max_overflow=pool_size,
+        )
+        sa_event.listen(self.db_engine.sync_engine, "connect", _apply_pragmas)
+        self.db_path = db_path
+        self.batch_max_events = max(1, batch_max_events)
+        self.batch_window_s = batch_window_ms / 1000.0
+        self.batches = 0
+        self.batched_events = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._last_batch_size = 0
+
+    async def _ensure_tables_created(self):
+        if self._tables_created:
+            return
+        await super()._ensure_tables_created()
+        async with self.db_engine.begin() as conn:
+            for statement in _INDEXES:
+                await conn.execute(text(statement))
+
+    def _ensure_writer(self) -> asyncio.Queue:
+        if self._writer is None or self._writer.done():
+            self._queue = asyncio.Queue()
+            self._writer = asyncio.create_task(self._write_loop(self._queue))
+        return self._queue
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        await self._ensure_tables_created()
+        if event.partial:
+            return event
+        event = self._trim_temp_delta_state(event)
+        done = asyncio.get_running_loop().create_future()
+        await self._ensure_writer().put((session, event, done))
+        await done
+        # Update the in-memory session the same way DatabaseSessionService does
+        await BaseSessionService.append_event(self, session=session, event=event)
+        return event
+
+    async def _write_loop(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch: List[_Pending] = [await queue.get()]
+            # Only linger for company when the last batch had any; a lone flow pays no delay
+            if self.batch_window_s > 0 and queue.empty() and self._last_batch_size > 1:
+                await asyncio.sleep(self.batch_window_s)
+            while len(batch) < self.batch_max_events and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await self._commit_batch(batch)
+                self._last_batch_size = len(batch)
+            except Exception as e:
+                for _, _, done in batch:
+                    if not done.done():
+                        done.set_exception(e)
+
+    async def _commit_batch(self, batch: List[_Pending]) -> None:
+        """Write every event of the batch in one transaction, then release the callers."""
+        accepted: List[Tuple[Session, StorageSession, asyncio.Future]] = []
+        async with self.database_session_factory() as sql_session:
+            for session, event, done in batch:
+                storage_session = await sql_session.get(
+                    StorageSession, (session.app_name, session.user_id, session.id)
+                )
+                if storage_session is None:
+                    done.set_exception(ValueError(f"Session {session.id} not found."))
+                    continue
+                if storage_session.update_timestamp_tz > session.last_update_time:
+                    done.set_exception(ValueError(
+                        f"The last_update_time provided in the session object {session.id} is earlier than"
+                        " the update_time in the storage_session. Please check if it is a stale session."
+                    ))
+                    continue
+                if event.actions and event.actions.state_delta:
+                    await self._apply_state_delta(sql_session, storage_session, event.actions.state_delta)
+                sql_session.add(StorageEvent.from_event(session, event))
+                accepted.append((session, storage_session, done))
+
+            await sql_session.commit()
+            for session, storage_session, _ in accepted:
+                await sql_session.refresh(storage_session)
+                session.last_update_time = storage_session.update_timestamp_tz
+        self.batches += 1
+        self.batched_events += len(accepted)
+        for _, _, done in accepted:
+            if not done.done():  # the caller may have been cancelled meanwhile
+                done.set_result(None)
+
+    @staticmethod
+    async def _apply_state_delta(sql_session, storage_session: StorageSession, state_delta: dict) -> None:
+        deltas = _session_util.extract_state_delta(state_delta)
+        # get() returns the row already loaded by an earlier event of the same batch
+        if deltas["app"]:
+            storage_app_state = await sql_session.get(StorageAppState, (storage_session.app_name))
+            storage_app_state.state = storage_app_state.state | deltas["app"]
+        if deltas["user"]:
+            storage_user_state = await sql_session.get(
+                StorageUserState, (storage_session.app_name, storage_session.user_id)
+            )
+            storage_user_state.state = storage_user_state.state | deltas["user"]
+        if deltas["session"]:
+            storage_session.state = storage_session.state | deltas["session"]
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "events": self.batched_events,
+            "events_per_batch": round(self.batched_events / self.batches, 2) if self.batches else 0.0,
+        }
+
+    async def close(self) -> None:
+        """Stop the batch writer and dispose of the connection pool."""
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        await self.db_engine.dispose()
@@ -7,50 +7,68 @@ from dataclasses import dataclass, field, asdict
 from typing import Any, Dict, List, Optional
 import pandas as pd
 from src.data.vendors import vendors_df
+from src.utils.ticket_text import TicketText
 
-def triage_agent_call(tenant_input: Dict[str, Any], prop: Dict[str, Any]) -> Dict[str, Any]:
-    title = (tenant_input.get("title") or "").lower()
-    desc = (tenant_input.get("description") or "").lower()
+# Every keyword the rules below look at; one scan of the ticket text finds them all
+_RULE_KEYWORDS = (
+    "gas", "ac", "a/c", "aircon", "air", "cool", "hot", "40c", "sink", "leak", "washer", "washing machine", "light", "bedroom",
+)
+
+def triage_agent_call(
+    tenant_input: Dict[str, Any],
+    prop: Dict[str, Any],
+    ticket: Optional[TicketText] = None,
+) -> Dict[str, Any]:
+    # The flow passes the ticket's shared TicketText; direct callers get one built here
+    ticket = ticket or TicketText.from_input(tenant_input)
 
     issue_type = "OTHER"
     severity = "MEDIUM"
     must_escalate_immediately = False
     propose_self_help = False
+    # How decisive the matched rule is (0..1); tiered triage skips the LLM above a threshold
+    confidence = 0.0
 
-    # Very simple keyword rules just to get a baseline
-    text = f"{title} {desc}"
+    # Very simple keyword rules just to get a baseline (whole words, inflections included)
+    hits = ticket.keyword_hits(_RULE_KEYWORDS, mode="inflected")
 
-    if "gas" in text:
+    if "gas" in hits:
         issue_type = "GAS"
         severity = "CRITICAL"
         must_escalate_immediately = True
         propose_self_help = False
-    elif "ac " in text or "ac" == text.strip() or "air" in text or "cooling" in text:
+        confidence = 0.95
+    elif hits & {"ac", "a/c", "aircon", "air", "cool"}:
         issue_type = "HVAC"
-        severity = "CRITICAL" if "hot" in text or "40c" in text else "HIGH"
+        severity = "CRITICAL" if "hot" in hits or "40c" in hits else "HIGH"
         must_escalate_immediately = True
         propose_self_help = False
-    elif "sink" in text or "leak" in text:
+        confidence = 0.9 if severity == "CRITICAL" else 0.7
+    elif "sink" in hits or "leak" in hits:
         issue_type = "PLUMBING"
         severity = "HIGH"
         must_escalate_immediately = False
         propose_self_help = True
-    elif "washer" in text or "washing machine" in text:
+        confidence = 0.7
+    elif "washer" in hits or "washing machine" in hits:
         issue_type = "APPLIANCE"
         severity = "HIGH"
         must_escalate_immediately = False
         propose_self_help = True
-    elif "light" in text or "lights" in text or "bedroom" in text:
+        confidence = 0.7
+    elif "light" in hits or "bedroom" in hits:
         issue_type = "ELECTRICAL"
         severity = "MEDIUM"
         must_escalate_immediately = False
         propose_self_help = True
+        confidence = 0.6
 
     return {
         "issue_type": issue_type,
         "severity": severity,
         "must_escalate_immediately": must_escalate_immediately,
         "propose_self_help": propose_self_help,
+        "confidence": confidence,
         "triage_notes": "rule_based_v1"
     }
 
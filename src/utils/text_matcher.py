@@ -0,0 +1,80 @@
+"""Compiled word-boundary keyword matcher shared by the rule triage, KB and eval scorers."""
+
+import functools
+import re
+from typing import Dict, FrozenSet, Iterable, Tuple
+
+# "word": whole words/phrases only; "inflected": also -s/-es/-ed/-ing/-er/-y/-age forms (leak -> leaking,
+# leaky, leakage; trip -> tripped); "prefix": any word starting with the pattern (cool -> cooling, coolant)
+MATCH_MODES = ("word", "inflected", "prefix")
+
+_SUFFIXES = {
+    "word": "",
+    # One optional doubled consonant before -ed/-ing/-er covers trip -> tripped, hot -> hotter
+    "inflected": r"(?:s|es|y|age|(?:[bdglmnprt]?(?:ed|ing|ers?)))?",
+    "prefix": r"\w*",
+}
+
+
+class KeywordMatcher:
+    """
+    One compiled regex for a fixed set of keywords and phrases.
+
+    `hits(text)` scans the text once and returns every pattern found as a
+    whole word (or inflected form / word prefix, per `mode`), so "ac" no
+    longer matches inside "each" and "air" not inside "repair". Spaces in a
+    phrase match any whitespace. Patterns that occur inside a longer
+    matched pattern ("washing" in "washing machine") are reported too.
+    """
+
+    def __init__(self, patterns: Iterable[str], mode: str = "word"):
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode '{mode}'; expected one of {MATCH_MODES}")
+        self.mode = mode
+        self.patterns: Tuple[str, ...] = tuple(dict.fromkeys(" ".join(p.lower().split()) for p in patterns if p.strip()))
+        self._regex = self._compile(self.patterns) if self.patterns else None
+        # pattern -> the other patterns it contains (found once here instead of on every scan)
+        self._implied: Dict[str, FrozenSet[str]] = {
+            pattern: frozenset(
+                other for other in self.patterns
+                if other != pattern and self._compile((other,)).search(pattern)
+            )
+            for pattern in self.patterns
+        }
+
+    def _compile(self, patterns: Tuple[str, ...]) -> "re.Pattern[str]":
+        # Longest first so a phrase wins over its own first word at the same position
+        alternatives = "|".join(
+            r"\s+".join(map(re.escape, pattern.split())) for pattern in sorted(patterns, key=len, reverse=True)
+        )
+        return re.compile(rf"\b({alternatives}){_SUFFIXES[self.mode]}\b")
+
+    def hits(self, text: str) -> FrozenSet[str]:
+        """Every pattern present in `text` (case-insensitive)."""
+        if self._regex is None or not text:
+            return frozenset()
+        found = set()
+        for matched in self._regex.findall(text.lower()):
+            pattern = " ".join(matched.split())
+            if pattern not in found:
+                found.add(pattern)
+                found.update(self._implied[pattern])
+        return frozenset(found)
+
+    def search(self, text: str) -> bool:
+        """True when any pattern is present; stops at the first hit."""
+        return self._regex is not None and bool(text) and self._regex.search(text.lower()) is not None
+
+    def count(self, text: str) -> int:
+        """Number of distinct patterns present."""
+        return len(self.hits(text))
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_matcher(patterns: Tuple[str, ...], mode: str) -> KeywordMatcher:
+    return KeywordMatcher(patterns, mode)
+
+
+def get_matcher(patterns: Iterable[str], mode: str = "word") -> KeywordMatcher:
+    """Process-wide matcher for a pattern set, compiled on first use."""
+    return _cached_matcher(tuple(patterns), mode)
@@ -0,0 +1,58 @@
+"""Per-ticket text features (KB terms, keyword hits, shingle hashes), computed once and shared."""
+
+from functools import cached_property
+from typing import Any, Dict, FrozenSet, Iterable, List, Set, Tuple
+from src.utils.dedupe import shingle_hashes, shingles
+from src.utils.text_matcher import get_matcher
+
+
+class TicketText:
+    """
+    A tenant ticket's title + description with lazily computed, memoized features.
+
+    Built once per incident (ScenarioContext.ticket) and handed to the rule
+    triage, KB lookup and dedupe steps, so each feature is derived at most
+    once per ticket no matter how many steps read it.
+    """
+
+    def __init__(self, title: str = "", description: str = ""):
+        self.title = title or ""
+        self.description = description or ""
+        self._keyword_hits: Dict[Tuple[Tuple[str, ...], str], FrozenSet[str]] = {}
+
+    @classmethod
+    def from_input(cls, tenant_input: Dict[str, Any]) -> "TicketText":
+        return cls(tenant_input.get("title", ""), tenant_input.get("description", ""))
+
+    @cached_property
+    def text(self) -> str:
+        """Title and description on separate lines (what the KB tool searches)."""
+        return f"{self.title}\n{self.description}"
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def kb_terms(self) -> List[str]:
+        """Stemmed, stopword-free terms for the KB indexes."""
+        from src.tools.kb_tools import tokenize
+        return tokenize(self.text)
+
+    @cached_property
+    def shingles(self) -> Set[str]:
+        """Word set used for near-duplicate detection."""
+        return shingles(self.text)
+
+    @cached_property
+    def shingle_hashes(self) -> List[int]:
+        """64-bit hashes of `shingles` (MinHash input)."""
+        return shingle_hashes(self.shingles)
+
+    def keyword_hits(self, patterns: Iterable[str], mode: str = "word") -> FrozenSet[str]:
+        """Patterns present in the ticket (see text_matcher.KeywordMatcher), memoized per pattern set."""
+        key = (tuple(patterns), mode)
+        hits = self._keyword_hits.get(key)
+        if hits is None:
+            hits = self._keyword_hits[key] = get_matcher(*key).hits(self.lower)
+        return hits
@@ -0,0 +1,288 @@
+"""Content-addressed cache for Gemini triage results (in-memory LRU + SQLite)."""
+
+import copy
+import hashlib
+import inspect
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import pandas as pd
+from src.prompts.system_prompts import MAINTENANCE_TRIAGE_PROMPT
+from src.utils.constants import MODEL_NAME
+
+# Serve repeated tickets from cache instead of calling Gemini (read from .env)
+USE_TRIAGE_CACHE = os.getenv("USE_TRIAGE_CACHE", "false").lower() == "true"
+# SQLite file for persistence across runs; empty keeps the cache in memory only
+TRIAGE_CACHE_DB = os.getenv("TRIAGE_CACHE_DB", "triage_cache.db")
+TRIAGE_CACHE_TTL_SECONDS = float(os.getenv("TRIAGE_CACHE_TTL_SECONDS", str(24 * 3600)))
+TRIAGE_CACHE_MAX_ENTRIES = int(os.getenv("TRIAGE_CACHE_MAX_ENTRIES", "1024"))
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_ticket_text(text: Optional[str]) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivial re-wordings share a key."""
+    return " ".join(_NON_WORD.sub(" ", (text or "").lower()).split())
+
+
+def triage_prompt_version(
+    prompt: str = MAINTENANCE_TRIAGE_PROMPT,
+    tools: Optional[Iterable[Callable]] = None,
+    structured_output: Optional[bool] = None,
+) -> str:
+    """
+    Hash of everything besides the ticket and the data that shapes a triage answer.
+
+    Covers the system prompt, the source of the tools the triage agent can
+    call and of format_triage_request, and whether triage runs through the
+    structured-output agent, so editing any of them moves new lookups to a
+    fresh key space.
+    """
+    if tools is None:
+        from src.prompts.system_prompts import format_triage_request
+        from src.tools.kb_tools import lookup_troubleshooting_article
+        from src.tools.vendor_tools import select_best_vendor
+        tools = (lookup_troubleshooting_article, select_best_vendor, format_triage_request)
+    if structured_output is None:
+        from src.agents.maintenance_triage_agent import USE_STRUCTURED_OUTPUT
+        structured_output = USE_STRUCTURED_OUTPUT
+    digest = hashlib.sha256(prompt.encode("utf-8"))
+    digest.update(b"\0structured=" + str(bool(structured_output)).encode("utf-8"))
+    for tool in tools:
+        try:
+            source = inspect.getsource(tool)
+        except (OSError, TypeError):
+            source = getattr(tool, "__qualname__", repr(tool))
+        digest.update(b"\0" + source.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def kb_signature() -> Optional[Dict[str, str]]:
+    """Signature of the file-backed KB index, or None when the built-in articles are used."""
+    from src.tools.kb_store import get_kb_store
+    store = get_kb_store()
+    return store.signature() if store is not None else None
+
+
+def triage_data_fingerprint(kb: Optional[Dict[str, str]] = None, vendors: Optional[pd.DataFrame] = None) -> str:
+    """
+    Hash of the KB and vendor data the triage tools answer from.
+
+    The file-backed KB is identified by its index signature (`kb`, from
+    kb_signature()); otherwise the built-in articles are hashed. `vendors`
+    defaults to the shared vendors_df.
+    """
+    if vendors is None:
+        from src.data.vendors import vendors_df as vendors
+    if kb is None:
+        from src.tools.kb_tools import kb_articles as kb
+    digest = hashlib.sha256(json.dumps(kb, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(b"\0" + json.dumps([str(c) for c in vendors.columns]).encode("utf-8"))
+    digest.update(b"\0" + pd.util.hash_pandas_object(vendors, index=True).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def triage_cache_key(request: Dict[str, Any], version: str, model_name: str = MODEL_NAME) -> str:
+    parts = (
+        model_name,
+        version,
+        str(request.get("property_zip", "")).strip(),
+        str(request.get("priority", "")).strip().upper(),
+        normalize_ticket_text(request.get("title")),
+        normalize_ticket_text(request.get("description")),
+    )
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class TriageCacheStats:
+    hits: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    stores: int = 0
+    invalidated: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_ratio"] = round(self.hit_ratio, 3)
+        return data
+
+
+class TriageCache:
+    """
+    Two-level cache of triage results keyed by triage_cache_key.
+
+    Lookups check an in-process LRU first, then SQLite (when `db_path` is
+    set); disk hits are promoted into the LRU. Entries expire after
+    `ttl_seconds`. The version combines triage_prompt_version() with
+    triage_data_fingerprint() and is recomputed when the KB index is
+    rebuilt, unless `version` pins it. Rows written under another version
+    are purged on open and by `purge_stale()`; `invalidate()` drops entries
+    explicitly.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = TRIAGE_CACHE_DB,
+        max_entries: int = TRIAGE_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = TRIAGE_CACHE_TTL_SECONDS,
+        version: Optional[str] = None,
+        model_name: str = MODEL_NAME,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._pinned_version = version
+        self._prompt_version = None if version else triage_prompt_version()
+        self._kb_signature: Optional[Dict[str, str]] = None
+        self.version: Optional[str] = None
+        self._refresh_version()
+        self.model_name = model_name
+        self.stats = TriageCacheStats()
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            if db_path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS triage_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    model_name TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            self.purge_stale()
+
+    def _refresh_version(self) -> str:
+        if self._pinned_version:
+            self.version = self._pinned_version
+            return self.version
+        # A KB reindex (file-backed corpus edited) changes what the tools answer
+        signature = kb_signature()
+        if self.version is None or signature != self._kb_signature:
+            self._kb_signature = signature
+            self.version = f"{self._prompt_version}-{triage_data_fingerprint(signature)}"
+        return self.version
+
+    def key_for(self, request: Dict[str, Any]) -> str:
+        return triage_cache_key(request, self._refresh_version(), self.model_name)
+
+    def get(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = self.key_for(request)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats.hits += 1
+                    self.stats.memory_hits += 1
+                    return copy.deepcopy(result)
+                del self._memory[key]
+                self.stats.expired += 1
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT result, expires_at FROM triage_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    result = json.loads(row[0])
+                    self._remember(key, row[1], result)
+                    self.stats.hits += 1
+                    self.stats.disk_hits += 1
+                    return copy.deepcopy(result)
+                if row is not None:
+                    self._conn.execute("DELETE FROM triage_cache WHERE cache_key = ?", (key,))
+                    self.stats.expired += 1
+
+            self.stats.misses += 1
+            return None
+
+    def put(self, request: Dict[str, Any], result: Dict[str, Any]) -> None:
+        key = self.key_for(request)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, copy.deepcopy(result))
+            self.stats.stores += 1
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO triage_cache "
+                    "(cache_key, version, model_name, result, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, self.version, self.model_name, json.dumps(result, default=str), now, expires_at),
+                )
+
+    def _remember(self, key: str, expires_at: float, result: Dict[str, Any]) -> None:
+        self._memory[key] = (expires_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def invalidate(self, request: Optional[Dict[str, Any]] = None) -> int:
+        """Drop one ticket's entry, or everything when `request` is None. Returns rows removed."""
+        with self._lock:
+            if request is None:
+                removed = len(self._memory)
+                self._memory.clear()
+                if self._conn is not None:
+                    removed = max(removed, self._conn.execute("DELETE FROM triage_cache").rowcount)
+            else:
+                key = self.key_for(request)
+                removed = 1 if self._memory.pop(key, None) is not None else 0
+                if self._conn is not None:
+                    removed = max(removed, self._conn.execute(
+                        "DELETE FROM triage_cache WHERE cache_key = ?", (key,)
+                    ).rowcount)
+            self.stats.invalidated += removed
+            return removed
+
+    def purge_stale(self) -> int:
+        """Delete persisted rows that are expired or were written for another version or model."""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM triage_cache WHERE version != ? OR model_name != ? OR expires_at <= ?",
+                (self.version, self.model_name, time.time()),
+            ).rowcount
+        if removed:
+            print(f"[TRIAGE_CACHE] Purged {removed} stale entries")
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_triage_cache: Optional[TriageCache] = None
+
+
+def get_triage_cache() -> TriageCache:
+    """Return the process-wide triage cache at TRIAGE_CACHE_DB."""
+    global _triage_cache
+    if _triage_cache is None:
+        _triage_cache = TriageCache()
+    return _triage_cache
@@ -0,0 +1,81 @@
+"""Offline stand-ins and fixtures shared by tests (triage agent, golden scenarios, vendor tables from benchmarks)."""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+from benchmarks.bench_vendor_index import (
+    VENDOR_ISSUE_TYPES, VENDOR_SEVERITIES, VENDOR_ZIPS, make_vendors, pandas_best_vendor,
+)
+from src.data.golden_incidents import load_golden_incidents
+
+
+def golden_scenario(scenario_id: str) -> Dict[str, Any]:
+    """The golden incident with this scenario_id."""
+    return next(s for s in load_golden_incidents() if s["scenario_id"] == scenario_id)
+
+
+class FakeTriageAgent:
+    """Records calls and returns canned triage / vendor results without Gemini or A2A."""
+
+    def __init__(
+        self,
+        triage_result: Optional[Dict[str, Any]] = None,
+        total_estimate: float = 200.0,
+        triage_delay: float = 0.0,
+        vendor_delay: float = 0.0,
+    ):
+        self.triage_result = triage_result or {
+            "triage_label": "VENDOR_REQUIRED",
+            "explanation": "fake triage",
+            "self_help_steps": [],
+            "kb_article_id": None,
+            "kb_article_title": None,
+            "vendor_selection": None,
+        }
+        self.total_estimate = total_estimate
+        self.triage_delay = triage_delay
+        self.vendor_delay = vendor_delay
+        self.calls: List[str] = []
+
+    def _quote(self, service_type: str) -> Dict[str, Any]:
+        return {
+            "quote_id": f"Q-{service_type[:4]}-1000",
+            "service_type": service_type,
+            "estimate": {"labor": 0.0, "parts": 0.0, "travel": 0.0, "total_estimate": self.total_estimate},
+            "valid_until": "2030-01-01T00:00:00",
+            "conditions": [],
+            "response_time": "Same day",
+        }
+
+    def _availability(self, service_type: str, quote_id: str) -> Dict[str, Any]:
+        return {
+            "quote_id": quote_id,
+            "service_type": service_type,
+            "options": [{"date": "2030-01-02", "from": "09:00", "to": "12:00", "slot_id": "SLOT-20300102-AM"}],
+            "booking_deadline": "2030-01-01T00:00:00",
+        }
+
+    async def triage_issue(self, request: Dict[str, Any], logs: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls.append("triage_issue")
+        await asyncio.sleep(self.triage_delay)
+        logs["adk_session_id"] = f"fake-{request.get('ticket_id')}"
+        return dict(self.triage_result)
+
+    async def request_vendor_quote(self, service_type, issue_description, property_zip, severity, logs):
+        self.calls.append("request_vendor_quote")
+        return self._quote(service_type)
+
+    async def request_vendor_quote_with_availability(
+        self, service_type, issue_description, property_zip, severity, logs, max_slots=3
+    ):
+        self.calls.append("request_vendor_quote_with_availability")
+        await asyncio.sleep(self.vendor_delay)
+        quote = self._quote(service_type)
+        return {"quote": quote, "availability": self._availability(service_type, quote["quote_id"])}
+
+    async def check_vendor_availability(self, service_type, quote_id, logs):
+        self.calls.append("check_vendor_availability")
+        return self._availability(service_type, quote_id)
+
+    async def book_vendor_slot(self, quote_id, slot_id, tenant_name, tenant_phone, special_instructions, logs):
+        self.calls.append("book_vendor_slot")
+        return {"booking_id": "BK-10000", "quote_id": quote_id, "slot_id": slot_id, "status": "CONFIRMED"}
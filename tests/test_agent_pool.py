@@ -0,0 +1,48 @@
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.agents.agent_pool import MaintenanceTriageAgentPool
+
+
+class _FakeAgent:
+    def __init__(self, session_service):
+        self.session_service = session_service
+
+
+def test_agent_pool_reuses_warm_instances():
+    shared_service = object()
+    pool = MaintenanceTriageAgentPool(max_idle=2, factory=_FakeAgent, session_service=shared_service)
+
+    with pool.acquire() as first:
+        pass
+    with pool.acquire() as second:
+        assert second is first
+
+    assert pool.stats.constructed == 1
+    assert pool.stats.acquisitions == 2
+    assert pool.stats.reuses == 1
+    assert first.session_service is shared_service
+
+
+def test_agent_pool_grows_under_concurrency_and_caps_idle():
+    pool = MaintenanceTriageAgentPool(max_idle=2, factory=_FakeAgent, session_service=object())
+
+    borrowed = [pool.borrow() for _ in range(3)]
+    assert len({id(agent) for agent in borrowed}) == 3
+    for agent in borrowed:
+        pool.give_back(agent)
+
+    assert pool.idle_count == 2
+    assert pool.stats.discarded == 1
+    assert pool.stats.to_dict()["constructed"] == 3
+
+
+def test_agent_pool_warm_prebuilds_agents():
+    pool = MaintenanceTriageAgentPool(max_idle=4, factory=_FakeAgent, session_service=object())
+    pool.warm(3)
+
+    assert pool.idle_count == 3
+    with pool.acquire():
+        pass
+    assert pool.stats.constructed == 3
+    assert pool.stats.reuse_ratio == 1.0
@@ -0,0 +1,93 @@
+import asyncio
+import copy
+import pytest
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.flow.coalescing import VendorJobCoalescer
+from src.flow.main_flow import run_scenario_through_agents
+from tests.fakes import FakeTriageAgent, golden_scenario
+
+
+def _storm(count):
+    base = golden_scenario("S4_KITCHEN_SINK_LEAK")
+    tickets = []
+    for i in range(count):
+        ticket = copy.deepcopy(base)
+        ticket["scenario_id"] = f"LEAK_{i}"
+        ticket["tenant_input"]["description"] += f" (unit {i})"
+        tickets.append(ticket)
+    return tickets
+
+
+def _vendor_calls(agents):
+    return [call for agent in agents for call in agent.calls if call != "triage_issue"]
+
+
+@pytest.mark.asyncio
+async def test_storm_becomes_one_vendor_job_with_split_payment():
+    tickets = _storm(3)
+    # The leader's quote is slow enough for the rest of the storm to join its job
+    agents = [FakeTriageAgent(total_estimate=300.0, vendor_delay=0.1) for _ in tickets]
+    coalescer = VendorJobCoalescer(payment_mode="split")
+
+    results = await asyncio.gather(*(
+        run_scenario_through_agents(ticket, agent=agent, coalescer=coalescer)
+        for ticket, agent in zip(tickets, agents)
+    ))
+
+    # One quote + one booking for the whole storm
+    assert _vendor_calls(agents) == ["request_vendor_quote_with_availability", "book_vendor_slot"]
+    assert coalescer.stats.to_dict() == {
+        "jobs": 1, "coalesced_tickets": 2, "abandoned_jobs": 0, "over_budget_tickets": 0,
+    }
+    for logs_rec in results:
+        assert logs_rec.states == results[0].states
+        assert logs_rec.states[-2:] == ["PAID", "CLOSED"]
+        assert logs_rec.payment["payment"]["amount"] == 100.0
+    assert len({logs_rec.booking["booking_id"] for logs_rec in results}) == 1
+    assert len({logs_rec.payment["vendor_job"]["leader"] for logs_rec in results}) == 1
+
+
+@pytest.mark.asyncio
+async def test_follower_over_its_own_budget_rejects_and_leaves_the_split():
+    tickets = _storm(3)
+    tickets[2]["ground_truth"]["max_budget"] = 200.0
+    agents = [FakeTriageAgent(total_estimate=300.0, vendor_delay=0.1) for _ in tickets]
+    coalescer = VendorJobCoalescer(payment_mode="split")
+
+    results = await asyncio.gather(*(
+        run_scenario_through_agents(ticket, agent=agent, coalescer=coalescer)
+        for ticket, agent in zip(tickets, agents)
+    ))
+
+    assert _vendor_calls(agents) == ["request_vendor_quote_with_availability", "book_vendor_slot"]
+    assert coalescer.stats.over_budget_tickets == 1
+    *approved, over_budget = results
+    assert over_budget.states[-2:] == ["QUOTE_REJECTED", "CLOSED"]
+    assert over_budget.booking is None and over_budget.payment is None
+    for logs_rec in approved:
+        assert logs_rec.states[-2:] == ["PAID", "CLOSED"]
+        assert logs_rec.payment["payment"]["amount"] == 150.0
+
+
+@pytest.mark.asyncio
+async def test_attribute_mode_and_window_expiry():
+    now = [0.0]
+    coalescer = VendorJobCoalescer(window_seconds=60, payment_mode="attribute", clock=lambda: now[0])
+    first, second, late = _storm(3)
+
+    results = await asyncio.gather(
+        run_scenario_through_agents(first, agent=FakeTriageAgent(vendor_delay=0.1), coalescer=coalescer),
+        run_scenario_through_agents(second, agent=FakeTriageAgent(vendor_delay=0.1), coalescer=coalescer),
+    )
+    leader, follower = sorted(results, key=lambda r: not r.payment["paid"])
+    assert leader.payment["paid"] is True
+    assert follower.payment["vendor_job"]["leader"] == leader.scenario_id
+    assert follower.states[-2:] == ["WORK_DONE", "CLOSED"]
+
+    now[0] += 120
+    late_agent = FakeTriageAgent()
+    await run_scenario_through_agents(late, agent=late_agent, coalescer=coalescer)
+    assert "book_vendor_slot" in late_agent.calls
+    assert coalescer.stats.jobs == 2
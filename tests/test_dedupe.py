@@ -0,0 +1,71 @@
+import asyncio
+import copy
+import random
+import pytest
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.flow.main_flow import run_scenario_through_agents
+from src.utils.dedupe import NearDuplicateIndex
+from tests.fakes import FakeTriageAgent, golden_scenario
+
+OUTAGE = "Power went out in my apartment. All lights and outlets are dead since 3pm."
+REWORDED = "Power is out in the apartment - all the lights and outlets dead since 3pm"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_reworded_ticket_matches_only_within_scope_and_window():
+    clock = FakeClock()
+    index = NearDuplicateIndex(window_seconds=600, clock=clock)
+    index.add("T1", "P1", "95054", OUTAGE, payload={"triage": "cached"})
+
+    match = index.find("P1", "95054", REWORDED)
+    assert match.ticket_id == "T1" and match.payload == {"triage": "cached"}
+    assert index.find("P2", "95054", REWORDED) is None
+    assert index.find("P1", "95054", "Kitchen sink leaking under the cabinet") is None
+
+    clock.now += 601
+    assert index.find("P1", "95054", REWORDED) is None
+    assert len(index) == 0
+
+
+def test_lookup_stays_fast_with_many_active_tickets():
+    rng = random.Random(7)
+    words = [f"w{i}" for i in range(2000)]
+    index = NearDuplicateIndex()
+    for i in range(2000):
+        index.add(f"T{i}", f"P{i % 200}", "95054", " ".join(rng.sample(words, 12)))
+
+    index.stats.lookup_seconds = 0.0
+    index.stats.lookups = 0
+    for i in range(200):
+        index.find(f"P{i}", "95054", OUTAGE)
+
+    assert index.stats.avg_lookup_us < 1000
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_reuses_original_triage():
+    original = golden_scenario("S4_KITCHEN_SINK_LEAK")
+    duplicate = copy.deepcopy(original)
+    duplicate["scenario_id"] = "S4_DUPLICATE"
+    duplicate["tenant_input"]["title"] = "kitchen sink is leaking under the cabinet!"
+
+    index = NearDuplicateIndex()
+    first, second = FakeTriageAgent(triage_delay=0.05), FakeTriageAgent()
+    logs_a, logs_b = await asyncio.gather(
+        run_scenario_through_agents(original, agent=first, dedupe_index=index),
+        run_scenario_through_agents(duplicate, agent=second, dedupe_index=index),
+    )
+
+    assert "triage_issue" in first.calls
+    assert "triage_issue" not in second.calls
+    assert logs_b.triage["duplicate_of"] == "S4_KITCHEN_SINK_LEAK"
+    assert logs_b.states == logs_a.states
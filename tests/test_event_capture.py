@@ -0,0 +1,52 @@
+import json
+import pytest
+from google.adk.events import Event
+from google.genai import types
+
+from src.flow.logs_recorder import LogsRecorder
+from src.utils.event_capture import EventCapture
+
+
+def _event(i):
+    part = types.Part(function_call=types.FunctionCall(name="select_best_vendor", args={"i": i}))
+    return Event(author="maintenance_triage_agent", invocation_id=f"inv-{i}", content=types.Content(role="model", parts=[part]))
+
+
+def test_levels_and_ring_buffer_bound():
+    events = [_event(i) for i in range(10)]
+
+    none = EventCapture(level="none", max_events=4, spill_path="")
+    summary = EventCapture(level="summary", max_events=4, spill_path="")
+    full = EventCapture(level="full", max_events=4, spill_path="")
+    for event in events:
+        for capture in (none, summary, full):
+            capture.record(event)
+
+    assert none.stats() == {"level": "none", "count": 10, "buffered": 0, "dropped": 0, "spilled": 0}
+    assert summary.export()[-1]["function_calls"] == ["select_best_vendor"]
+    assert len(summary) == 4 and summary.dropped == 6
+    # Full level keeps event objects and serializes only on export
+    assert list(full)[-1] is events[-1]
+    assert [e["invocation_id"] for e in full.export()] == ["inv-6", "inv-7", "inv-8", "inv-9"]
+
+    with pytest.raises(ValueError):
+        EventCapture(level="verbose")
+
+
+def test_full_capture_spills_evicted_events_and_exports_through_logs(tmp_path):
+    spill = tmp_path / "events.jsonl"
+    capture = EventCapture(level="full", max_events=2, spill_path=str(spill))
+    for i in range(5):
+        capture.record(_event(i))
+
+    assert capture.spilled == 3 and capture.dropped == 0
+    assert [json.loads(line)["invocation_id"] for line in spill.read_text().splitlines()] == ["inv-0", "inv-1", "inv-2"]
+
+    logs_rec = LogsRecorder(scenario_id="S1")
+    logs_rec.vendor_logs = {"adk_events": capture}
+    exported = json.loads(logs_rec.to_json_bytes())
+    assert [e["invocation_id"] for e in exported["vendor_logs"]["adk_events"]] == ["inv-3", "inv-4"]
+    assert LogsRecorder.from_bytes(logs_rec.to_bytes()).vendor_logs == exported["vendor_logs"]
+
+    capture.flush()
+    assert len(capture) == 0 and len(spill.read_text().splitlines()) == 5
@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.flow import main_flow
+from src.flow.main_flow import LogsRecorder, run_scenarios
+
+
+def _scenario(scenario_id: str, delay: float, fail: bool = False):
+    return {"scenario_id": scenario_id, "delay": delay, "fail": fail}
+
+
+@pytest.mark.asyncio
+async def test_run_scenarios_yields_in_completion_order_with_bounded_concurrency(monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def fake_run(scenario):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(scenario["delay"])
+            if scenario["fail"]:
+                raise RuntimeError("vendor down")
+            logs_rec = LogsRecorder(scenario_id=scenario["scenario_id"])
+            logs_rec.add_state("REPORTED")
+            logs_rec.add_state("CLOSED")
+            return logs_rec
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(main_flow, "run_scenario_through_agents", fake_run)
+
+    scenarios = [
+        _scenario("SLOW", 0.05),
+        _scenario("FAST", 0.01),
+        _scenario("BROKEN", 0.02, fail=True),
+        _scenario("LAST", 0.0),
+    ]
+    batch = run_scenarios(iter(scenarios), max_concurrency=2)
+    completed = [logs_rec.scenario_id async for logs_rec in batch]
+
+    assert completed[0] == "FAST"
+    assert sorted(completed) == sorted(s["scenario_id"] for s in scenarios)
+    assert peak == 2
+
+    summary = batch.summary
+    assert summary.total == 4
+    assert summary.succeeded == 3
+    assert summary.failed == 1
+    assert "vendor down" in summary.errors["BROKEN"]
+    assert summary.final_states == {"CLOSED": 3}
+    assert summary.elapsed_seconds > 0
@@ -0,0 +1,41 @@
+import pytest
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.flow.checkpoint_store import ScenarioCheckpointStore
+from src.flow.main_flow import run_scenario_through_agents, resume_scenario
+from tests.fakes import FakeTriageAgent, golden_scenario
+
+
+class CrashingBookingAgent(FakeTriageAgent):
+    async def book_vendor_slot(self, *args, **kwargs):
+        self.calls.append("book_vendor_slot")
+        raise ConnectionError("process died before SCHEDULED")
+
+
+@pytest.mark.asyncio
+async def test_resume_scenario_only_runs_remaining_steps(tmp_path):
+    store = ScenarioCheckpointStore(str(tmp_path / "checkpoints.db"))
+    scenario = golden_scenario("S3_GAS_SMELL")
+
+    with pytest.raises(ConnectionError):
+        await run_scenario_through_agents(scenario, agent=CrashingBookingAgent(), checkpoint_store=store)
+
+    checkpoint = store.load(scenario["scenario_id"])
+    assert checkpoint.last_state == "QUOTE_APPROVED"
+    assert {"rules", "llm_triage", "quote"} <= set(checkpoint.steps)
+    assert store.incomplete() == [scenario["scenario_id"]]
+
+    agent = FakeTriageAgent()
+    logs_rec = await resume_scenario(scenario["scenario_id"], agent=agent, checkpoint_store=store)
+
+    # Triage and quote come from the checkpoint; only booking onwards is executed
+    assert agent.calls == ["book_vendor_slot"]
+    assert logs_rec.states == scenario["ground_truth"]["expected_state_sequence"]
+    assert logs_rec.quote["quote_id"] == checkpoint.steps["quote"]["quote"]["quote_id"]
+    assert store.incomplete() == []
+
+    # A closed scenario resumes straight from its stored logs
+    closed = await resume_scenario(scenario["scenario_id"], agent=agent, checkpoint_store=store)
+    assert closed.states == logs_rec.states
+    assert agent.calls == ["book_vendor_slot"]
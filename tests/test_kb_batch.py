@@ -0,0 +1,43 @@
+import pytest
+
+from src.tools import kb_tools
+from src.tools.kb_tools import KbTfidfMatrix, lookup_troubleshooting_article, lookup_troubleshooting_articles_batch
+from src.data.golden_incidents import load_golden_incidents
+
+
+def _article(article_id, title, keywords):
+    return {"id": article_id, "title": title, "keywords": keywords, "steps": []}
+
+
+def test_batch_top1_agrees_with_single_lookup_on_golden_incidents():
+    inputs = [incident["tenant_input"] for incident in load_golden_incidents()]
+    titles = [ti.get("title", "") for ti in inputs] + ["Broken window"]
+    descriptions = [ti.get("description", "") for ti in inputs] + ["Glass cracked"]
+
+    batch = lookup_troubleshooting_articles_batch(titles, descriptions, k=2)
+    for title, description, matches in zip(titles, descriptions, batch):
+        expected = lookup_troubleshooting_article(title=title, description=description)["article_id"]
+        assert (matches[0]["article_id"] if matches else None) == expected
+        assert all(m["score"] > 0 for m in matches)
+        assert [m["score"] for m in matches] == sorted((m["score"] for m in matches), reverse=True)
+    assert batch[-1] == []
+
+    with pytest.raises(ValueError):
+        lookup_troubleshooting_articles_batch(["only a title"], [], k=1)
+
+
+def test_chunked_scoring_ties_and_numpy_fallback(monkeypatch):
+    articles = [
+        _article("a", "Kitchen sink", ["sink", "kitchen"]),
+        _article("b", "Sink leak", ["sink", "leak"]),
+        _article("c", "Kitchen sink", ["sink", "kitchen"]),
+        _article("d", "Garage door", ["garage", "door"]),
+    ]
+    texts = ["kitchen sink", "sink leaking", "garage door stuck", "thermostat"] * 5
+    monkeypatch.setattr(kb_tools, "sparse", None)
+    matrix = KbTfidfMatrix(articles, max_score_cells=8)  # 2 tickets per chunk
+
+    results = matrix.top_k(texts, k=3)
+    assert [[doc_id for doc_id, _ in matches] for matches in results[:4]] == [[0, 2, 1], [1, 0, 2], [3], []]
+    assert results[0][0][1] == results[0][1][1]  # equal scores, corpus order kept
+    assert results[4:] == results[:4] * 4
@@ -0,0 +1,47 @@
+from src.tools.kb_tools import KbIndex, lookup_troubleshooting_article, search_troubleshooting_articles, stem, tokenize
+
+
+def _article(article_id, title, keywords):
+    return {"id": article_id, "title": title, "keywords": keywords, "steps": [f"{article_id} step"]}
+
+
+def test_stemming_and_tokenizing():
+    assert [stem(w) for w in ("leaking", "leaks", "leaked", "tripped", "batteries", "switches", "gas", "ac")] == [
+        "leak", "leak", "leak", "trip", "battery", "switch", "gas", "ac",
+    ]
+    # Base words and their inflections share a stem (silent e dropped, "eed" kept)
+    for base, inflected in [
+        ("smoke", "smoking"), ("smoke", "smoked"), ("wire", "wiring"), ("wire", "wired"),
+        ("freeze", "freezing"), ("fuse", "fuses"), ("hose", "hoses"), ("pipe", "pipes"),
+    ]:
+        assert stem(base) == stem(inflected)
+    assert stem("speed") == "speed"
+    index = KbIndex([_article("fire", "Electrical fire", ["smoke", "wire", "fuse"])])
+    for query in ("fuses blown", "wiring sparks", "smoking outlet"):
+        assert [art["id"] for art, _ in index.search(query, top_k=1)] == ["fire"]
+    # Whole tokens only: "ac" no longer matches inside "each" / "back"
+    assert "ac" not in tokenize("Each light in the back room")
+
+
+def test_bm25_ranks_rarer_matches_higher_and_breaks_ties_by_order():
+    index = KbIndex([
+        _article("a", "Sink leak", ["sink", "leak"]),
+        _article("b", "Kitchen sink", ["sink", "kitchen"]),
+        _article("c", "Garbage disposal jammed", ["disposal", "jam"]),
+        _article("d", "Kitchen sink", ["sink", "kitchen"]),
+    ])
+    ranked = [art["id"] for art, _ in index.search("kitchen sink leaking badly", top_k=3)]
+    assert ranked[0] == "a"  # "leak" is rarer than "kitchen"
+    assert ranked[1:] == ["b", "d"]  # equal scores keep corpus order
+    assert index.search("thermostat", top_k=3) == []
+
+
+def test_lookup_output_format_is_unchanged():
+    result = lookup_troubleshooting_article(title="Sink dripping", description="Drip from the pipe under my kitchen sink")
+    assert result["article_id"] == "kb_leak_01"
+    assert set(result) == {"article_id", "article_title", "suggested_steps"}
+    assert lookup_troubleshooting_article(title="Broken window", description="Glass cracked") == {
+        "article_id": None, "article_title": None, "suggested_steps": [],
+    }
+    top = search_troubleshooting_articles("Washer not draining", "Water stays in the washing machine drum", top_k=2)
+    assert top[0]["article_id"] == "kb_appliance_01" and top[0]["score"] > 0
@@ -0,0 +1,67 @@
+import os
+
+from src.tools import kb_store
+from src.tools.kb_store import FtsKbStore, write_kb_jsonl
+from src.tools.kb_tools import kb_articles, lookup_troubleshooting_article
+
+
+def _rewrite(path, articles, bump_ns):
+    write_kb_jsonl(articles, path)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump_ns))
+
+
+def test_lazy_build_and_same_matches_as_builtin_index(tmp_path):
+    corpus = str(tmp_path / "kb.jsonl")
+    write_kb_jsonl(kb_articles, corpus)
+    store = FtsKbStore(corpus, db_path=str(tmp_path / "kb.db"), reload_check_seconds=0)
+    assert store.reindexes == 0  # nothing read until the first lookup
+
+    best, score = store.search("Kitchen sink leaking\nDrip from the pipe", top_k=1)[0]
+    assert best["id"] == "kb_leak_01" and score > 0
+    assert best["steps"] == kb_articles[1]["steps"]
+    assert store.search("Broken window glass cracked") == []
+    assert store.reindexes == 1 and len(store) == len(kb_articles)
+
+    # A new process over the same index file does not re-read an unchanged corpus
+    reopened = FtsKbStore(corpus, db_path=str(tmp_path / "kb.db"), reload_check_seconds=0)
+    assert reopened.search("washer not draining", top_k=1)[0][0]["id"] == "kb_appliance_01"
+    assert reopened.reindexes == 0
+
+
+def test_incremental_reindex_on_file_change(tmp_path):
+    corpus = str(tmp_path / "kb.jsonl")
+    write_kb_jsonl(kb_articles, corpus)
+    store = FtsKbStore(corpus, db_path=str(tmp_path / "kb.db"), reload_check_seconds=0)
+    store.search("ac not cooling")
+
+    edited = [dict(kb_articles[0], steps=["Reset the thermostat."]), *kb_articles[1:3]]
+    edited.append({"id": "kb_window_01", "title": "Cracked window", "keywords": ["window", "glass"], "steps": ["Tape it."]})
+    _rewrite(corpus, edited, bump_ns=1_000_000_000)
+    assert store.refresh() == {"added": 1, "updated": 1, "removed": 1}
+
+    assert store.search("Broken window glass", top_k=1)[0][0]["id"] == "kb_window_01"
+    assert store.search("AC not cooling", top_k=1)[0][0]["steps"] == ["Reset the thermostat."]
+    assert store.search("breaker tripped, no power") == []
+    assert store.refresh() == {"added": 0, "updated": 0, "removed": 0}
+
+
+def test_tokenizer_change_rebuilds_stored_terms(tmp_path, monkeypatch):
+    corpus = str(tmp_path / "kb.jsonl")
+    write_kb_jsonl(kb_articles, corpus)
+    FtsKbStore(corpus, db_path=str(tmp_path / "kb.db"), reload_check_seconds=0).refresh()
+
+    monkeypatch.setattr(kb_store, "TOKENIZER_VERSION", "next")
+    reopened = FtsKbStore(corpus, db_path=str(tmp_path / "kb.db"), reload_check_seconds=0)
+    assert reopened.refresh() == {"added": len(kb_articles), "updated": 0, "removed": 0}
+
+
+def test_lookup_tool_uses_file_backed_store(tmp_path, monkeypatch):
+    corpus = str(tmp_path / "kb.jsonl")
+    write_kb_jsonl([{"id": "kb_gate_01", "title": "Garage door stuck", "keywords": ["garage", "opener"], "steps": ["Pull the release cord."]}], corpus)
+    monkeypatch.setattr(kb_store, "_kb_store", FtsKbStore(corpus, db_path=str(tmp_path / "kb.db")))
+
+    assert lookup_troubleshooting_article(title="Garage door", description="The opener hums but nothing moves") == {
+        "article_id": "kb_gate_01", "article_title": "Garage door stuck", "suggested_steps": ["Pull the release cord."],
+    }
+    assert lookup_troubleshooting_article(title="Sink leak", description="Kitchen sink dripping")["article_id"] is None
@@ -0,0 +1,53 @@
+import io
+import pytest
+
+from src.flow.logs_recorder import FlowState, LogsRecorder, read_jsonl, write_jsonl
+
+
+def _recorder():
+    logs_rec = LogsRecorder(scenario_id="S9")
+    for state in ("REPORTED", "TRIAGED", FlowState.ESCALATED, "CLOSED"):
+        logs_rec.add_state(state)
+    logs_rec.triage = {"issue_type": "PLUMBING", "severity": "HIGH"}
+    logs_rec.quote = {"quote_id": "Q-1", "estimate": {"total_estimate": 180.0}}
+    logs_rec.add_message("tenant", "We've received your request.")
+    logs_rec.add_message("landlord", "Selected vendor.")
+    return logs_rec
+
+
+def test_states_compare_as_strings_and_unknown_states_are_rejected():
+    logs_rec = _recorder()
+
+    assert logs_rec.states == ["REPORTED", "TRIAGED", "ESCALATED", "CLOSED"]
+    assert logs_rec.final_state is FlowState.CLOSED
+    assert logs_rec.messages == {"tenant": ["We've received your request."], "landlord": ["Selected vendor."]}
+    assert not hasattr(logs_rec, "__dict__")
+    with pytest.raises(ValueError):
+        logs_rec.add_state("TELEPORTED")
+
+
+def test_dict_view_is_cached_until_the_record_changes():
+    logs_rec = _recorder()
+
+    view = logs_rec.to_dict()
+    assert view["states"][-1] == "CLOSED"
+    assert logs_rec.to_dict() is view
+
+    logs_rec.payment = {"paid": True}
+    assert logs_rec.to_dict() is not view
+    assert logs_rec.to_dict()["payment"] == {"paid": True}
+
+
+def test_json_binary_and_jsonl_round_trips():
+    logs_rec = _recorder()
+
+    for restored in (
+        LogsRecorder.from_json_bytes(logs_rec.to_json_bytes()),
+        LogsRecorder.from_bytes(logs_rec.to_bytes()),
+    ):
+        assert restored.to_dict() == logs_rec.to_dict()
+
+    buffer = io.BytesIO()
+    assert write_jsonl([logs_rec, _recorder()], buffer) == 2
+    buffer.seek(0)
+    assert [r.scenario_id for r in read_jsonl(buffer)] == ["S9", "S9"]
@@ -0,0 +1,82 @@
+import inspect
+import json
+import httpx
+import pytest
+from google.adk.tools import FunctionTool
+from google.genai import types
+
+from src.tools.kb_tools import lookup_troubleshooting_article
+from src.utils.metrics import (
+    Histogram,
+    get_metrics,
+    httpx_event_hooks,
+    instrument_agent_call,
+    instrument_tool,
+    record_usage,
+)
+
+
+def test_histogram_quantiles_and_prometheus_text():
+    histogram = Histogram(buckets=(10, 100, 1000))
+    for value in [5] * 90 + [50] * 9 + [5000]:
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == pytest.approx(10 * 50 / 90)
+    assert 10 < histogram.quantile(0.99) <= 100
+    assert histogram.to_dict()["count"] == 100
+
+    registry = get_metrics()
+    registry.reset()
+    registry.observe("agent_call_ms", 42, stage="triage", model="m")
+    registry.inc("model_retries_total", stage="triage")
+    text = registry.to_prometheus()
+    assert '# TYPE agent_call_ms histogram' in text
+    assert 'agent_call_ms_bucket{model="m",stage="triage",le="50"} 1' in text
+    assert 'agent_call_ms_bucket{model="m",stage="triage",le="25"} 0' in text
+    assert 'model_retries_total{stage="triage"} 1' in text
+    assert json.loads(json.dumps(registry.snapshot()))["histograms"][0]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stage_flows_from_agent_call_to_tools_and_tokens():
+    registry = get_metrics()
+    registry.reset()
+
+    @instrument_tool
+    def double(x: int) -> int:
+        """Double a number."""
+        return 2 * x
+
+    class Agent:
+        @instrument_agent_call("vendor_quote", model="m")
+        async def request_vendor_quote(self):
+            record_usage(types.GenerateContentResponseUsageMetadata(prompt_token_count=300, candidates_token_count=40), model="m")
+            return double(21)
+
+    assert await Agent().request_vendor_quote() == 42
+    assert registry.histogram("agent_call_ms", stage="vendor_quote", model="m", status="ok").count == 1
+    assert registry.histogram("tool_call_ms", tool="double", stage="vendor_quote").count == 1
+    assert registry.counter("model_tokens_total", stage="vendor_quote", model="m", direction="in") == 300
+    # Outside an agent call the stage is unknown
+    double(1)
+    assert registry.histogram("tool_call_ms", tool="double", stage="unknown").count == 1
+
+
+def test_wrapped_tools_keep_their_adk_declaration():
+    assert inspect.signature(lookup_troubleshooting_article).parameters.keys() == {"title", "description"}
+    declaration = FunctionTool(lookup_troubleshooting_article)._get_declaration()
+    assert declaration.name == "lookup_troubleshooting_article"
+    assert set(declaration.parameters.properties) == {"title", "description"}
+
+
+@pytest.mark.asyncio
+async def test_http_hooks_time_requests_and_count_retryable_statuses():
+    registry = get_metrics()
+    registry.reset()
+    statuses = iter([503, 200])
+    transport = httpx.MockTransport(lambda request: httpx.Response(next(statuses)))
+    async with httpx.AsyncClient(transport=transport, event_hooks=httpx_event_hooks("model", [429, 503])) as client:
+        await client.get("https://example.test/generate")
+        await client.get("https://example.test/generate")
+
+    assert registry.counter("model_retries_total", stage="unknown") == 1
+    assert registry.histogram("model_http_ms", stage="unknown", status="200").count == 1
@@ -0,0 +1,69 @@
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from src.utils.session_history import history_window_callback, trim_history
+from src.utils.session_manager import SessionJanitor, ticket_session_id
+
+
+def _text(role, text):
+    return types.Content(role=role, parts=[types.Part(text=text)])
+
+
+def _call(name):
+    return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args={}))])
+
+
+def _response(name):
+    return types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(name=name, response={}))])
+
+
+def test_trim_history_keeps_tail_from_a_user_turn():
+    turn = [_text("user", "ticket"), _call("select_best_vendor"), _response("select_best_vendor"), _text("model", "ok")]
+    contents = turn * 5
+
+    trimmed = trim_history(contents, max_contents=6)
+    # The cut moves forward past the tool call/response pair to the next user turn
+    assert trimmed == contents[-4:]
+    assert trim_history(contents, max_contents=0) is contents
+    assert trim_history(contents[:3], max_contents=6) == contents[:3]
+    # No plain user turn in the window: leave the history alone
+    assert trim_history(turn[1:] * 3, max_contents=2) == turn[1:] * 3
+
+    request = LlmRequest(contents=list(contents))
+    assert history_window_callback(None, request) is None
+    assert len(request.contents) <= 24
+
+
+def test_ticket_session_ids_are_stable_per_ticket():
+    logs_a, logs_b = {}, {}
+    first = ticket_session_id(logs_a, "vendor", "T1")
+    assert ticket_session_id(logs_a, "vendor", "T1") == first
+    assert ticket_session_id(logs_b, "vendor", "T1") != first
+    assert first.startswith("vendor-T1-")
+
+
+@pytest.mark.asyncio
+async def test_janitor_evicts_idle_in_memory_sessions():
+    now = [0.0]
+    service = InMemorySessionService()
+    janitor = SessionJanitor(ttl_seconds=100, interval_seconds=10, clock=lambda: now[0])
+    for session_id in ("s1", "s2"):
+        await service.create_session(app_name="app", user_id="u", session_id=session_id)
+
+    janitor.end(janitor.begin(service, "app", "u", "s1"))
+    busy = janitor.begin(service, "app", "u", "s2")
+
+    now[0] += 150
+    assert await janitor.maybe_evict() == 1
+    assert await service.get_session(app_name="app", user_id="u", session_id="s1") is None
+    # Sessions with a call in flight survive until they go idle
+    assert await service.get_session(app_name="app", user_id="u", session_id="s2") is not None
+
+    janitor.end(busy)
+    now[0] += 5
+    assert await janitor.maybe_evict() == 0  # within the sweep interval
+    now[0] += 200
+    assert await janitor.maybe_evict() == 1
+    assert janitor.stats() == {"tracked": 0, "in_flight": 0, "evicted": 2}
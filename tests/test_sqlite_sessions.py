@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from google.adk.events import Event, EventActions
+from google.genai import types
+from sqlalchemy import text
+
+from src.utils.sqlite_sessions import (
+    ADK_MIRRORED_SOURCES,
+    ADK_MIRRORED_VERSION,
+    TunedSqliteSessionService,
+    adk_source_fingerprints,
+)
+
+
+def _event(session_id, i, state_delta=None):
+    return Event(
+        author="maintenance_triage_agent",
+        invocation_id=f"{session_id}-inv-{i}",
+        content=types.Content(role="model", parts=[types.Part(text=f"turn {i}")]),
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+async def _flow(service, session_id, turns):
+    session = await service.create_session(app_name="app", user_id="u", session_id=session_id)
+    for i in range(turns):
+        await service.append_event(session, _event(session_id, i, {"turn": i, "user:last_ticket": session_id}))
+    return session
+
+
+@pytest.mark.asyncio
+async def test_concurrent_flows_are_group_committed(tmp_path):
+    service = TunedSqliteSessionService(db_path=str(tmp_path / "sessions.db"), batch_window_ms=5)
+    try:
+        await asyncio.gather(*(_flow(service, f"ticket-{n}", 4) for n in range(8)))
+
+        stats = service.stats()
+        assert stats["events"] == 32
+        assert stats["batches"] < 32
+
+        stored = await service.get_session(app_name="app", user_id="u", session_id="ticket-3")
+        assert [e.content.parts[0].text for e in stored.events] == [f"turn {i}" for i in range(4)]
+        assert stored.state["turn"] == 3
+        assert stored.state["user:last_ticket"].startswith("ticket-")
+
+        async with service.db_engine.connect() as conn:
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+            assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1  # NORMAL
+            indexes = {row[1] for row in await conn.execute(text("PRAGMA index_list(events)"))}
+        assert "ix_events_session_time" in indexes
+    finally:
+        await service.close()
+
+
+@pytest.mark.asyncio
+async def test_missing_session_fails_only_its_own_append(tmp_path):
+    service = TunedSqliteSessionService(db_path=str(tmp_path / "sessions.db"))
+    try:
+        session = await service.create_session(app_name="app", user_id="u", session_id="live")
+        ghost = session.model_copy(update={"id": "ghost"})
+        results = await asyncio.gather(
+            service.append_event(ghost, _event("ghost", 0)),
+            service.append_event(session, _event("live", 0)),
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], ValueError)
+        assert results[1].invocation_id == "live-inv-0"
+    finally:
+        await service.close()
+
+
+def test_mirrored_adk_sources_are_unchanged():
+    # append_event copies ADK internals; an upgrade that touches them must be reviewed by hand
+    changed = {
+        name for name, digest in adk_source_fingerprints().items() if ADK_MIRRORED_SOURCES.get(name) != digest
+    }
+    assert not changed, f"ADK sources changed since {ADK_MIRRORED_VERSION}: {sorted(changed)}; re-check append_event"
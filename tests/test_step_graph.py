@@ -0,0 +1,78 @@
+import asyncio
+import time
+import pytest
+
+from src.flow.step_graph import GraphContext, InvalidTransitionError, Step, StepGraph
+
+DELAY = 0.2
+
+
+def _sleeper(name):
+    async def run(ctx):
+        await asyncio.sleep(DELAY)
+        return name
+    return run
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently_and_are_timed():
+    graph = StepGraph([
+        Step("start", _sleeper("start")),
+        Step("a", _sleeper("a"), after=("start",)),
+        Step("b", _sleeper("b"), after=("start",)),
+        Step("join", _sleeper("join"), after=("a", "b")),
+    ])
+
+    started = time.perf_counter()
+    ctx = await graph.run(GraphContext())
+    elapsed = time.perf_counter() - started
+
+    # start -> (a || b) -> join is three DELAYs deep, not four
+    assert elapsed < 3.5 * DELAY
+    assert ctx.results == {"start": "start", "a": "a", "b": "b", "join": "join"}
+    assert set(ctx.timings) == {"start", "a", "b", "join"}
+    assert all(ms >= DELAY * 1000 * 0.9 for ms in ctx.timings.values())
+
+
+@pytest.mark.asyncio
+async def test_guards_and_halt_skip_steps_except_always():
+    async def stop(ctx):
+        ctx.enter("STOPPED")
+        ctx.halt()
+
+    async def noop(ctx):
+        return True
+
+    async def close(ctx):
+        ctx.enter("CLOSED")
+
+    graph = StepGraph(
+        [
+            Step("guarded", noop, when=lambda ctx: False),
+            Step("stop", stop, after=("guarded",)),
+            Step("next", noop, after=("stop",)),
+            Step("close", close, after=("next",), always=True),
+        ],
+        transitions={None: ("STOPPED",), "STOPPED": ("CLOSED",)},
+    )
+    ctx = await graph.run(GraphContext())
+
+    assert ctx.skipped == ["guarded", "next"]
+    assert ctx.state == "CLOSED"
+
+
+@pytest.mark.asyncio
+async def test_invalid_transition_is_rejected():
+    async def jump(ctx):
+        ctx.enter("PAID")
+
+    graph = StepGraph([Step("jump", jump)], transitions={None: ("REPORTED",)})
+    with pytest.raises(InvalidTransitionError):
+        await graph.run(GraphContext())
+
+
+def test_graph_validation_rejects_cycles_and_unknown_dependencies():
+    with pytest.raises(ValueError, match="Cycle"):
+        StepGraph([Step("a", _sleeper("a"), after=("b",)), Step("b", _sleeper("b"), after=("a",))])
+    with pytest.raises(ValueError, match="unknown"):
+        StepGraph([Step("a", _sleeper("a"), after=("missing",))])
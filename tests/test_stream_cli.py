@@ -0,0 +1,49 @@
+import json
+import pytest
+from dotenv import load_dotenv
+load_dotenv()
+
+from src import main as cli
+from src.agents.agent_pool import MaintenanceTriageAgentPool
+from src.data.golden_incidents import golden_incidents_jsonl, load_golden_incidents
+from src.flow import main_flow
+from tests.fakes import FakeTriageAgent
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = MaintenanceTriageAgentPool(factory=lambda service: FakeTriageAgent(), session_service=object())
+    monkeypatch.setattr(main_flow, "get_agent_pool", lambda: pool)
+    return pool
+
+
+def _results(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_stream_writes_one_result_per_incident_and_skips_bad_lines(tmp_path, fake_pool):
+    source = tmp_path / "incidents.jsonl"
+    source.write_text(golden_incidents_jsonl + "\n\n{not json}\n")
+    output = tmp_path / "results.jsonl"
+
+    await cli.main(["--input", str(source), "--output", str(output), "--max-concurrency", "2"])
+
+    results = _results(output)
+    assert sorted(r["scenario_id"] for r in results) == sorted(s["scenario_id"] for s in load_golden_incidents())
+    assert all(r["states"][-1] == "CLOSED" and r["error"] is None for r in results)
+    assert fake_pool.stats.constructed <= 2
+
+
+@pytest.mark.asyncio
+async def test_stream_offset_and_resume_skip_completed_incidents(tmp_path, fake_pool):
+    source = tmp_path / "incidents.jsonl"
+    source.write_text(golden_incidents_jsonl)
+    output = tmp_path / "results.jsonl"
+    ids = [s["scenario_id"] for s in load_golden_incidents()]
+
+    await cli.main(["--input", str(source), "--output", str(output), "--offset", "3"])
+    assert sorted(r["scenario_id"] for r in _results(output)) == sorted(ids[3:])
+
+    await cli.main(["--input", str(source), "--output", str(output), "--resume"])
+    assert sorted(r["scenario_id"] for r in _results(output)) == sorted(ids)
@@ -0,0 +1,71 @@
+import json
+import pytest
+from dotenv import load_dotenv
+load_dotenv()
+
+import src.agents.maintenance_triage_agent as triage_module
+from src.agents.maintenance_triage_agent import FALLBACK_TRIAGE, MaintenanceTriageAgent
+from src.agents.vendor_agent import VendorCallError
+from src.prompts.response_schemas import TriageResult
+from src.utils.json_utils import PARSE_FAILURES, parse_llm_json
+
+REQUEST = {"ticket_id": "T1", "property_id": "P1", "property_zip": "95054", "title": "Sink clogged", "description": "Slow drain"}
+TRIAGE = {
+    "triage_label": "SELF_HELP_OK",
+    "explanation": "Minor clog",
+    "self_help_steps": ["Use a plunger"],
+    "kb_article_id": "KB_DRAIN",
+    "kb_article_title": "Clear a slow drain",
+    "vendor_selection": None,
+}
+
+
+def _fake_run_session(final_text, intermediate="Let me look that up."):
+    async def run_session(runner_instance, session_service, user_queries, session_name, logs):
+        logs["adk_final_response"] = final_text
+        logs["runner_agent"] = runner_instance.agent.name
+        return f"{intermediate}\n{final_text}"
+    return run_session
+
+
+def test_parse_llm_json_validates_and_counts_failures():
+    fenced = "```json\n" + json.dumps({"triage_label": "EMERGENCY", "explanation": "Gas smell"}) + "\n```"
+    assert parse_llm_json(fenced, TriageResult) == {
+        "triage_label": "EMERGENCY",
+        "explanation": "Gas smell",
+        "self_help_steps": [],
+        "kb_article_id": None,
+        "kb_article_title": None,
+        "vendor_selection": None,
+    }
+
+    before = PARSE_FAILURES["TriageResult"]
+    with pytest.raises(ValueError):
+        parse_llm_json("not json", TriageResult)
+    with pytest.raises(ValueError):
+        parse_llm_json(json.dumps({"triage_label": "MAYBE", "explanation": ""}), TriageResult)
+    assert PARSE_FAILURES["TriageResult"] == before + 2
+
+
+@pytest.mark.asyncio
+async def test_triage_reads_final_structured_answer(monkeypatch):
+    monkeypatch.setattr(triage_module, "run_session", _fake_run_session(json.dumps(TRIAGE)))
+    agent = MaintenanceTriageAgent()
+
+    logs = {}
+    assert await agent.triage_issue(REQUEST, logs) == TRIAGE
+    assert logs["runner_agent"] == "maintenance_triage_structured"
+
+    monkeypatch.setattr(triage_module, "run_session", _fake_run_session('{"triage_label": '))
+    logs = {}
+    assert await agent.triage_issue(REQUEST, logs) == FALLBACK_TRIAGE
+    assert "triage_parse_error" in logs
+
+
+@pytest.mark.asyncio
+async def test_malformed_vendor_output_fails_the_call(monkeypatch):
+    monkeypatch.setattr(triage_module, "run_session", _fake_run_session("Sure, I booked it!"))
+    agent = MaintenanceTriageAgent(vendor_mode="agent")
+
+    with pytest.raises(VendorCallError):
+        await agent.book_vendor_slot("Q1", "S1", "Ana", "555-0100", "", logs={})
@@ -0,0 +1,48 @@
+import pytest
+
+from src.utils.eval import score_communications, score_self_help
+from src.utils.stubs import triage_agent_call
+from src.utils.text_matcher import KeywordMatcher, get_matcher
+
+
+def test_modes_match_whole_words_only():
+    patterns = ["ac", "air", "cool", "trip", "washing machine", "washing"]
+    assert KeywordMatcher(patterns).hits("Each chair needs repair; the ac is off") == {"ac"}
+    assert KeywordMatcher(patterns, mode="inflected").hits("Breaker TRIPPED, cooling failed") == {"trip", "cool"}
+    assert KeywordMatcher(["leak"], mode="inflected").hits("Leaky pipe, leakage everywhere") == {"leak"}
+    assert KeywordMatcher(patterns, mode="prefix").hits("Coolant low, airflow weak") == {"cool", "air"}
+    # Overlapping patterns are all reported, whitespace inside phrases is flexible
+    assert KeywordMatcher(patterns).hits("the washing\n machine stopped") == {"washing machine", "washing"}
+    assert not KeywordMatcher([]).search("anything")
+    assert get_matcher(("gas",)) is get_matcher(("gas",))
+    with pytest.raises(ValueError):
+        KeywordMatcher(patterns, mode="fuzzy")
+
+
+def test_rule_triage_no_longer_matches_inside_words():
+    # "air" inside "repair"/"chair" used to classify this as HVAC
+    result = triage_agent_call({"title": "Chair repair", "description": "Broken chair in the hallway"}, {})
+    assert result["issue_type"] == "OTHER"
+    result = triage_agent_call({"title": "AC", "description": ""}, {})
+    assert result["issue_type"] == "HVAC" and result["severity"] == "HIGH"
+    result = triage_agent_call({"title": "Sink leaking", "description": "Water leaks under the sinks"}, {})
+    assert result["issue_type"] == "PLUMBING"
+    # Tenant wordings the old substring rules caught
+    for title, issue_type in [
+        ("Leaky faucet", "PLUMBING"),
+        ("Leakage under bathroom vanity", "PLUMBING"),
+        ("Aircon broken", "HVAC"),
+        ("A/C not working", "HVAC"),
+    ]:
+        assert triage_agent_call({"title": title, "description": ""}, {})["issue_type"] == issue_type
+
+
+def test_eval_keyword_scores():
+    gt = {"self_help_allowed": True, "issue_type": "HVAC"}
+    safe = {"steps": ["Check the thermostat.", "Let the unit cool down and clean the filter."]}
+    assert score_self_help(safe, gt) == 15
+    unsafe = {"steps": ["Strike a match to check the pilot.", "Touch exposed wires to test them."]}
+    assert score_self_help(unsafe, gt) == 5  # unsafe, no relevance hits; structure still counts
+    # "unpaid" is not "paid": one landlord hit (quote), two tenant hits (appointment, schedule)
+    messages = {"tenant": ["Your appointment is scheduled."], "landlord": ["The quote is still unpaid."]}
+    assert score_communications(messages, {}) == 6
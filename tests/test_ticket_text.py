@@ -0,0 +1,47 @@
+import pytest
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.flow import main_flow
+from src.flow.main_flow import run_scenario_through_agents
+from src.tools.kb_tools import lookup_ticket_article, lookup_troubleshooting_article
+from src.utils.dedupe import NearDuplicateIndex
+from src.utils.stubs import triage_agent_call
+from src.utils.ticket_text import TicketText
+from tests.fakes import FakeTriageAgent, golden_scenario
+
+
+def test_features_are_computed_once_and_match_the_string_apis():
+    ticket = TicketText("Kitchen sink leaking", "Water drips under the sink, the pipe is wet.")
+    assert ticket.kb_terms is ticket.kb_terms
+    assert ticket.kb_terms[:3] == ["kitchen", "sink", "leak"]
+    hits = ticket.keyword_hits(("sink", "leak"), mode="inflected")
+    assert hits == {"sink", "leak"} and ticket.keyword_hits(("sink", "leak"), mode="inflected") is hits
+
+    index = NearDuplicateIndex()
+    assert index.signature(ticket) == index.signature(f"{ticket.title} {ticket.description}")
+    tenant_input = {"title": ticket.title, "description": ticket.description}
+    assert triage_agent_call(tenant_input, {}, ticket) == triage_agent_call(tenant_input, {})
+    assert lookup_ticket_article(ticket) == lookup_troubleshooting_article(ticket.title, ticket.description)
+
+
+@pytest.mark.asyncio
+async def test_flow_steps_share_one_ticket_text(monkeypatch):
+    seen = []
+
+    def rules(tenant_input, prop, ticket):
+        seen.append(ticket)
+        return triage_agent_call(tenant_input, prop, ticket)
+
+    def kb(ticket):
+        seen.append(ticket)
+        return lookup_ticket_article(ticket)
+
+    monkeypatch.setattr(main_flow, "triage_agent_call", rules)
+    monkeypatch.setattr(main_flow, "lookup_ticket_article", kb)
+    scenario = golden_scenario("S2_WASHER_NOT_DRAINING")
+    agent = FakeTriageAgent(triage_result={"triage_label": "SELF_HELP_OK", "self_help_steps": [], "vendor_selection": None})
+
+    logs_rec = await run_scenario_through_agents(scenario, agent=agent, dedupe_index=NearDuplicateIndex())
+    assert len(seen) == 2 and seen[0] is seen[1]
+    assert logs_rec.self_help["kb_article_id"] == "kb_appliance_01"
@@ -0,0 +1,99 @@
+import os
+import pytest
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.agents.maintenance_triage_agent import MaintenanceTriageAgent
+from src.data.vendors import vendors_df
+from src.tools import kb_store
+from src.tools.kb_store import FtsKbStore, write_kb_jsonl
+from src.tools.kb_tools import kb_articles, lookup_troubleshooting_article
+from src.tools.vendor_tools import select_best_vendor
+from src.utils.triage_cache import TriageCache, triage_data_fingerprint, triage_prompt_version
+
+REQUEST = {
+    "ticket_id": "T1",
+    "property_id": "P1",
+    "property_zip": "95054",
+    "title": "AC not cooling",
+    "description": "The AC runs but the room stays hot.",
+    "priority": "HIGH",
+}
+RESULT = {"triage_label": "VENDOR_REQUIRED", "explanation": "cached", "self_help_steps": [], "vendor_selection": None}
+
+
+def test_normalized_rewording_hits_and_other_zip_misses(tmp_path):
+    cache = TriageCache(db_path=str(tmp_path / "cache.db"), version="v1")
+    cache.put(REQUEST, RESULT)
+
+    reworded = dict(REQUEST, ticket_id="T2", title="  ac NOT cooling!! ", description="The AC runs, but the room stays hot")
+    assert cache.get(reworded) == RESULT
+    assert cache.get(dict(REQUEST, property_zip="10001")) is None
+    assert cache.stats.to_dict()["hits"] == 1
+    assert cache.stats.misses == 1
+
+
+def test_sqlite_persistence_ttl_and_version_invalidation(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    TriageCache(db_path=db_path, version="v1").put(REQUEST, RESULT)
+
+    reopened = TriageCache(db_path=db_path, version="v1")
+    assert reopened.get(REQUEST) == RESULT
+    assert reopened.stats.disk_hits == 1
+
+    # A prompt/tool change produces a new version; old rows are purged on open
+    assert TriageCache(db_path=db_path, version="v2").get(REQUEST) is None
+    assert TriageCache(db_path=db_path, version="v1").get(REQUEST) is None
+
+    expiring = TriageCache(db_path=None, ttl_seconds=-1, version="v1")
+    expiring.put(REQUEST, RESULT)
+    assert expiring.get(REQUEST) is None
+    assert expiring.stats.expired == 1
+
+    cache = TriageCache(db_path=db_path, version="v1")
+    cache.put(REQUEST, RESULT)
+    assert cache.invalidate(REQUEST) == 1
+    assert cache.get(REQUEST) is None
+
+
+def test_prompt_version_tracks_prompt_text():
+    assert triage_prompt_version("prompt A", tools=()) != triage_prompt_version("prompt B", tools=())
+    assert triage_prompt_version() == triage_prompt_version()
+    assert triage_prompt_version(structured_output=True) != triage_prompt_version(structured_output=False)
+    # format_triage_request shapes the question Gemini sees
+    tools_only = (lookup_troubleshooting_article, select_best_vendor)
+    assert triage_prompt_version(tools=tools_only) != triage_prompt_version()
+
+
+def test_data_fingerprint_tracks_vendors_and_kb():
+    base = triage_data_fingerprint()
+    assert triage_data_fingerprint() == base
+    cheaper = vendors_df.copy()
+    cheaper.loc[0, "base_fee"] = cheaper.loc[0, "base_fee"] - 10
+    assert triage_data_fingerprint(vendors=cheaper) != base
+    assert triage_data_fingerprint(kb={"source": "kb.jsonl", "mtime_ns": "1", "size": "10", "tokenizer": "2"}) != base
+
+
+def test_kb_reindex_moves_cache_to_new_version(tmp_path, monkeypatch):
+    corpus = str(tmp_path / "kb.jsonl")
+    write_kb_jsonl(kb_articles, corpus)
+    monkeypatch.setattr(kb_store, "_kb_store", FtsKbStore(corpus, db_path=str(tmp_path / "kb.db"), reload_check_seconds=0))
+    cache = TriageCache(db_path=str(tmp_path / "cache.db"))
+    cache.put(REQUEST, RESULT)
+    assert cache.get(REQUEST) == RESULT
+
+    write_kb_jsonl(kb_articles[1:], corpus)
+    st = os.stat(corpus)
+    os.utime(corpus, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert cache.get(REQUEST) is None
+
+
+@pytest.mark.asyncio
+async def test_triage_issue_serves_cached_result_without_gemini():
+    cache = TriageCache(db_path=None)
+    cache.put(REQUEST, RESULT)
+    agent = MaintenanceTriageAgent(triage_cache=cache)
+
+    logs = {}
+    assert await agent.triage_issue(dict(REQUEST, ticket_id="T9"), logs) == RESULT
+    assert logs["triage_cache"] == "hit"
@@ -0,0 +1,44 @@
+import time
+import pytest
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.flow import main_flow
+from src.flow.main_flow import run_scenario_through_agents
+from src.tools.kb_tools import lookup_ticket_article
+from src.tools.vendor_tools import select_best_vendor
+from tests.fakes import FakeTriageAgent, golden_scenario
+
+DELAY = 0.3
+
+
+@pytest.mark.asyncio
+async def test_triage_stage_runs_llm_kb_and_vendor_concurrently(monkeypatch):
+    def slow_kb(ticket):
+        time.sleep(DELAY)
+        return lookup_ticket_article(ticket)
+
+    def slow_vendor(**kwargs):
+        time.sleep(DELAY)
+        return select_best_vendor(**kwargs)
+
+    monkeypatch.setattr(main_flow, "lookup_ticket_article", slow_kb)
+    monkeypatch.setattr(main_flow, "select_best_vendor", slow_vendor)
+    agent = FakeTriageAgent(
+        triage_result={"triage_label": "SELF_HELP_OK", "self_help_steps": [], "vendor_selection": None},
+        triage_delay=DELAY,
+    )
+    scenario = golden_scenario("S2_WASHER_NOT_DRAINING")
+
+    started = time.perf_counter()
+    logs_rec = await run_scenario_through_agents(scenario, agent=agent)
+    elapsed = time.perf_counter() - started
+
+    # Three DELAY-long calls overlap instead of adding up
+    assert elapsed < 2 * DELAY
+    # Gemini returned no steps, so the concurrently fetched KB article is used
+    assert logs_rec.self_help["strategy"] == "kb_v1"
+    assert logs_rec.self_help["kb_article_id"] == "kb_appliance_01"
+    # Gemini returned no vendor, so the speculative selection is used
+    assert logs_rec.vendor_selection["service_type"] == "APPLIANCE_REPAIR"
+    assert logs_rec.states == scenario["ground_truth"]["expected_state_sequence"]
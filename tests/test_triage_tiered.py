@@ -0,0 +1,39 @@
+import pytest
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.flow import main_flow
+from src.flow.main_flow import run_scenario_through_agents, get_triage_routing_stats
+from tests.fakes import FakeTriageAgent, golden_scenario
+
+
+@pytest.mark.asyncio
+async def test_tiered_triage_skips_llm_for_gas_emergency(monkeypatch):
+    monkeypatch.setattr(main_flow, "TRIAGE_MODE", "tiered")
+    scenario = golden_scenario("S3_GAS_SMELL")
+    agent = FakeTriageAgent()
+    rules_before = get_triage_routing_stats()["rules"]["calls"]
+
+    logs_rec = await run_scenario_through_agents(scenario, agent=agent)
+
+    assert "triage_issue" not in agent.calls
+    # Quote and slots arrive together, so availability is never fetched separately
+    assert agent.calls == ["request_vendor_quote_with_availability", "book_vendor_slot"]
+    assert logs_rec.triage["triage_tier"] == "rules"
+    assert logs_rec.triage["triage_label"] == "EMERGENCY"
+    assert logs_rec.vendor_selection["service_type"] == "GAS_TECHNICIAN"
+    assert logs_rec.states == scenario["ground_truth"]["expected_state_sequence"]
+    assert get_triage_routing_stats()["rules"]["calls"] == rules_before + 1
+
+
+@pytest.mark.asyncio
+async def test_tiered_triage_defers_ambiguous_tickets_to_llm(monkeypatch):
+    monkeypatch.setattr(main_flow, "TRIAGE_MODE", "tiered")
+    scenario = golden_scenario("S4_KITCHEN_SINK_LEAK")
+    agent = FakeTriageAgent(triage_result={"triage_label": "VENDOR_REQUIRED", "vendor_selection": None})
+
+    logs_rec = await run_scenario_through_agents(scenario, agent=agent)
+
+    assert agent.calls[0] == "triage_issue"
+    assert logs_rec.triage["triage_tier"] == "llm"
+    assert logs_rec.triage["rule_confidence"] < main_flow.TRIAGE_RULE_CONFIDENCE_THRESHOLD
@@ -18,6 +18,7 @@ async def test_vendor_agent_card():
         skill_names = [s["name"] for s in agent_card.get("skills", [])]
         assert "request_quote" in skill_names
         assert "get_availability" in skill_names
+        assert "request_quote_with_availability" in skill_names
         assert "book_slot" in skill_names
         print("✅ Vendor agent card is valid")
         print(f"   Skills found: {skill_names}")
@@ -0,0 +1,103 @@
+import json
+import pytest
+from dotenv import load_dotenv
+load_dotenv()
+
+from a2a.types import DataPart, Message, Part, Role, Task, TaskState, TaskStatus, TextPart
+from src.agents.maintenance_triage_agent import MaintenanceTriageAgent
+from src.agents.vendor_agent import VendorAgent, VendorCallError
+from src.tools.vendor_service_tools import request_quote, book_slot
+
+
+def _vendor_with_parts(monkeypatch, parts):
+    vendor = VendorAgent(vendor_url="http://vendor.invalid")
+
+    async def fake_stream(message):
+        assert message.parts[0].root.data["operation"]
+        for part in parts:
+            yield part
+
+    monkeypatch.setattr(vendor, "_stream_parts", fake_stream)
+    return vendor
+
+
+@pytest.mark.asyncio
+async def test_direct_quote_reads_typed_tool_output(monkeypatch):
+    tool_output = request_quote("HVAC", "AC not cooling", "95054", "HIGH")
+    vendor = _vendor_with_parts(monkeypatch, [
+        DataPart(data={"id": "call-1", "name": "request_quote", "response": tool_output}),
+        TextPart(text="Here is your quote."),
+    ])
+    logs = {}
+
+    quote = await vendor.request_quote("HVAC", "AC not cooling", "95054", "HIGH", logs=logs)
+
+    assert quote["quote_id"] == tool_output["quote_id"]
+    assert quote["estimate"]["total_estimate"] == tool_output["estimate"]["total_estimate"]
+    assert logs["a2a_calls"][0]["source"] == "function_response"
+
+
+@pytest.mark.asyncio
+async def test_direct_booking_falls_back_to_final_json_text(monkeypatch):
+    booking = book_slot("Q-HVAC-1234", "SLOT-20300102-AM", "Test Tenant", "000-000-0000")
+    vendor = _vendor_with_parts(monkeypatch, [
+        TextPart(text="```json\n"),
+        TextPart(text=json.dumps(booking) + "\n```"),
+    ])
+
+    result = await vendor.book_slot("Q-HVAC-1234", "SLOT-20300102-AM", "Test Tenant", "000-000-0000")
+
+    assert result["booking_id"] == booking["booking_id"]
+    assert result["status"] == "CONFIRMED"
+
+
+@pytest.mark.asyncio
+async def test_non_streaming_server_answer_read_from_agent_messages_only(monkeypatch):
+    booking = book_slot("Q-HVAC-1234", "SLOT-20300102-AM", "Test Tenant", "000-000-0000")
+    vendor = VendorAgent(vendor_url="http://vendor.invalid")
+
+    class NonStreamingClient:
+        async def send_message(self, message):
+            # Only the final task comes back; its history starts with our own request
+            answer = Message(
+                message_id="m-2", role=Role.agent,
+                parts=[Part(root=TextPart(text="```json\n" + json.dumps(booking) + "\n```"))],
+            )
+            task = Task(id="t-1", context_id="c-1", status=TaskStatus(state=TaskState.completed), history=[message, answer])
+            yield task, None
+
+    async def ensure_client():
+        return NonStreamingClient()
+
+    monkeypatch.setattr(vendor, "_ensure_client", ensure_client)
+    logs = {}
+
+    result = await vendor.book_slot("Q-HVAC-1234", "SLOT-20300102-AM", "Test Tenant", "000-000-0000", logs=logs)
+
+    assert result["booking_id"] == booking["booking_id"]
+    assert logs["a2a_calls"][0]["source"] == "text"
+
+
+@pytest.mark.asyncio
+async def test_direct_call_rejects_malformed_payload(monkeypatch):
+    vendor = _vendor_with_parts(monkeypatch, [TextPart(text='{"quote_id": "Q-1"}')])
+
+    with pytest.raises(VendorCallError):
+        await vendor.request_quote("HVAC", "AC not cooling", "95054", "HIGH")
+
+
+@pytest.mark.asyncio
+async def test_triage_agent_direct_mode_skips_orchestrator(monkeypatch):
+    class FakeVendor:
+        async def get_availability(self, service_type, quote_id, logs=None):
+            return {"quote_id": quote_id, "service_type": service_type, "options": []}
+
+    agent = MaintenanceTriageAgent(vendor_mode="direct", vendor_client=FakeVendor())
+
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("orchestrator LLM should not be called in direct mode")
+
+    monkeypatch.setattr("src.agents.maintenance_triage_agent.run_session", no_llm)
+    result = await agent.check_vendor_availability("HVAC", "Q-HVAC-1234", logs={})
+
+    assert result["quote_id"] == "Q-HVAC-1234"
@@ -0,0 +1,29 @@
+import random
+
+from src.tools.vendor_tools import ISSUE_TO_SERVICE_TYPE, VendorRankingIndex, select_best_vendor
+from tests.fakes import VENDOR_ISSUE_TYPES, VENDOR_SEVERITIES, VENDOR_ZIPS, make_vendors, pandas_best_vendor
+
+
+def test_index_picks_what_the_pandas_sort_picked():
+    rng = random.Random(7)
+    vendors = make_vendors(300, rng)  # coarse score grids: many exact ties
+    index = VendorRankingIndex(vendors)
+    for _ in range(500):
+        issue_type, severity = rng.choice(VENDOR_ISSUE_TYPES), rng.choice(VENDOR_SEVERITIES)
+        property_zip = rng.choice(VENDOR_ZIPS + [10001])
+        service_type = ISSUE_TO_SERVICE_TYPE[issue_type]
+        best, zip_match = index.best(service_type, property_zip, severity)
+        assert best["vendor_id"] == pandas_best_vendor(vendors, issue_type, str(property_zip), severity)
+        ranked = list(index.ranked(service_type, property_zip, severity))
+        assert ranked[0][:2] == (best, zip_match)
+        assert len(ranked) == int((vendors["service_type"] == service_type).sum())
+        local = [score for _, is_local, score in ranked if is_local]
+        assert local == sorted(local, reverse=True) and zip_match == bool(local)
+
+
+def test_select_best_vendor_output():
+    result = select_best_vendor("PLUMBING", "94103", "HIGH")
+    assert result["service_type"] == "PLUMBER" and result["vendor_id"] is not None
+    assert isinstance(result["rating"], float) and isinstance(result["price_band"], int)
+    assert select_best_vendor("OTHER", "94103")["vendor_id"] is None
+    assert select_best_vendor("PLUMBING", "not-a-zip")["explanation"].endswith("pricing.")
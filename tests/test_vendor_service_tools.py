@@ -0,0 +1,31 @@
+from src.tools.vendor_service_tools import request_quote_with_availability
+
+
+def test_request_quote_with_availability_returns_quote_and_first_slots():
+    result = request_quote_with_availability(
+        service_type="HVAC",
+        issue_description="AC not cooling",
+        property_zip="95054",
+        severity="HIGH",
+        max_slots=2,
+    )
+
+    quote = result["quote"]
+    availability = result["availability"]
+    assert quote["quote_id"].startswith("Q-HVAC-")
+    assert quote["estimate"]["total_estimate"] > 0
+    assert availability["quote_id"] == quote["quote_id"]
+    assert len(availability["options"]) == 2
+    assert all(slot["slot_id"].startswith("SLOT-") for slot in availability["options"])
+
+
+def test_request_quote_with_availability_honours_zero_slots():
+    for max_slots in (0, -1):
+        result = request_quote_with_availability(
+            service_type="PLUMBING",
+            issue_description="Sink leaking",
+            property_zip="95054",
+            max_slots=max_slots,
+        )
+        assert result["quote"]["quote_id"].startswith("Q-PLUM")
+        assert result["availability"]["options"] == []